@@ -0,0 +1,170 @@
+import time
+T0 = time.perf_counter()
+
+import platform
+if platform.system() == "Windows":
+    import ctypes
+    ctypes.windll.user32.SetProcessDPIAware()
+    # High resolution timer
+    try:
+        ctypes.windll.winmm.timeBeginPeriod(1)
+    except:
+        pass
+
+# Headless runner: no QApplication, no widgets, nothing from ui/.
+#   python cli.py --profile default --duration 30 --stats
+#   python cli.py --macro farm --repeat 0 --speed 1.5
+import os
+import sys
+import json
+import argparse
+import threading
+from core.logging_setup import get_logger, setup_logging, set_levels, LEVELS_ENV
+setup_logging()
+from core.profile_manager import ProfileManager
+from core.macro_manager import MacroManager
+from core.persistence import get_writer
+from core.procinfo import startup_report, rss_bytes
+
+log = get_logger("cli")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run an autoclicker profile or macro without the GUI")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--profile", help="profile to click with")
+    target.add_argument("--macro", help="macro to play back")
+    parser.add_argument("--duration", type=float, default=0, help="stop after this many seconds (0 = no limit)")
+    parser.add_argument("--clicks", type=int, default=0, help="stop after this many clicks (overrides the profile limit)")
+    parser.add_argument("--delay-ms", type=int, default=None, help="override the profile click delay")
+    parser.add_argument("--speed", type=float, default=1.0, help="macro playback speed")
+    parser.add_argument("--repeat", type=int, default=1, help="macro repeat count (0 = loop)")
+    parser.add_argument("--no-hotkeys", action="store_true", help="don't install the kill/toggle hotkeys")
+    parser.add_argument("--profile-threads", type=float, default=0, metavar="SECONDS",
+                        help="sample the engine/player threads for SECONDS and write logs/profile-*.collapsed")
+    parser.add_argument("--trace", help="record every injected event to this ring file (see engine/trace.py)")
+    parser.add_argument("--metrics-port", type=int, default=None, help="serve Prometheus metrics on 127.0.0.1:PORT")
+    parser.add_argument("--metrics-dump", type=float, default=None, help="dump metrics JSON to logs/ every N seconds")
+    parser.add_argument("--log-levels", default="", help="e.g. WARNING or engine=ERROR,cli=INFO")
+    parser.add_argument("--stats", action="store_true", help="print run statistics as JSON on exit")
+    parser.add_argument("--startup-probe", action="store_true", help="print startup time and memory, then exit")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    # On top of AUTOCLICKER_LOG_LEVELS, not instead of it
+    set_levels(os.environ.get(LEVELS_ENV, ""), args.log_levels)
+    store = os.environ.get("AUTOCLICKER_PROFILE_STORE", "json")
+
+    if args.profile:
+        profiles = ProfileManager(backend=store)
+        if args.profile not in profiles.list_profiles():
+            log.error(f"Profile not found: {args.profile}")
+            return 2
+        profile = profiles.load(args.profile)
+        if args.delay_ms is not None:
+            profile["delay_ms"] = args.delay_ms
+        if args.clicks > 0:
+            profile["click_limit"] = {"enabled": True, "count": args.clicks}
+        if not profile.get("points"):
+            log.error(f"Profile {args.profile} has no click points")
+            return 2
+    else:
+        profile = None
+        events = MacroManager().load(args.macro)
+        if not events:
+            log.error(f"Macro not found or empty: {args.macro}")
+            return 2
+
+    # Engines are imported late so --startup-probe and bad arguments stay cheap
+    if args.profile:
+        from engine.click_engine import ClickEngine
+        runner = ClickEngine()
+    else:
+        from engine.macro_engine import MacroPlayer
+        runner = MacroPlayer()
+
+    trace = None
+    if args.trace:
+        from engine.trace import open_trace
+        trace = runner.trace = open_trace(args.trace)
+
+    startup = startup_report(T0, "cli")
+    log.info(f"CLI ready in {startup['startup_ms']} ms, RSS {startup['rss_mb']} MB")
+    if args.startup_probe:
+        print(json.dumps(startup))
+        return 0
+
+    from core.metrics import start_exporter
+    exporter = start_exporter(args.metrics_port, args.metrics_dump)
+
+    stop = threading.Event()
+    hotkeys = None
+    if not args.no_hotkeys:
+        from core.hotkeys import Hotkeys, profile_bindings
+        bindings = [(t, a, arg) for t, a, arg in profile_bindings(profile or {}) if a in ("toggle", "kill")]
+        # Either key ends the run; there is no UI to toggle back on
+        hotkeys = Hotkeys(bindings, lambda action, arg, t: stop.set())
+        hotkeys.start()
+
+    if args.profile_threads > 0:
+        from core.profiler import profile_threads
+        profile_threads(args.profile_threads)
+
+    started = time.perf_counter()
+    if args.profile:
+        runner.start(profile)
+    else:
+        runner.play(events, args.speed, args.repeat)
+
+    # Nothing here runs a Qt event loop; poll the runner instead of relying on signals
+    deadline = started + args.duration if args.duration > 0 else None
+    try:
+        while runner.running and not stop.is_set():
+            if deadline and time.perf_counter() >= deadline:
+                log.info("Duration reached")
+                break
+            stop.wait(0.05)
+    except KeyboardInterrupt:
+        log.info("Interrupted")
+
+    runner.stop()
+    elapsed = time.perf_counter() - started
+    if hotkeys:
+        from core.input_hub import get_hub
+        hotkeys.stop()
+        get_hub().stop()
+    if args.profile_threads > 0:
+        from core.profiler import stop_profiling
+        stop_profiling()
+    if exporter:
+        exporter.stop()
+    if trace:
+        # Let the player thread finish its last record before unmapping
+        for _ in range(20):
+            if not runner.running:
+                break
+            time.sleep(0.01)
+        trace.close()
+    get_writer().flush()
+
+    stats = {"startup": startup, "elapsed_s": round(elapsed, 3), "rss_mb": round(rss_bytes() / (1024 * 1024), 1)}
+    if args.profile:
+        stats["profile"] = args.profile
+        stats["clicks"] = runner.total_clicks
+        stats["avg_cps"] = round(runner.total_clicks / elapsed, 1) if elapsed > 0 else 0
+    else:
+        # The player publishes its report when its thread winds down
+        for _ in range(20):
+            if runner.last_report:
+                break
+            time.sleep(0.01)
+        stats["macro"] = args.macro
+        stats["fidelity"] = runner.last_report
+    log.info(f"Run finished after {elapsed:.1f}s")
+
+    if args.stats:
+        print(json.dumps(stats, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
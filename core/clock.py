@@ -0,0 +1,80 @@
+import datetime
+import time
+
+# Engine, player and scheduler take their time from a clock object so a dry
+# run can swap in SimulatedClock and cover hours of clicking in seconds.
+
+class Clock:
+    def perf(self):
+        return time.perf_counter()
+
+    def now(self):
+        return datetime.datetime.now()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def sleep_until(self, deadline, stopped=None):
+        # Coarse sleep, then busy-wait the last stretch for accuracy.
+        # Returns False if `stopped()` turned true before the deadline.
+        wait = deadline - time.perf_counter()
+        if wait > 0.002:
+            time.sleep(wait - 0.0015)
+        while time.perf_counter() < deadline:
+            if stopped is not None and stopped():
+                return False
+        return True
+
+    def wait(self, waitable, timeout):
+        # Event.wait / Condition.wait with a timeout (caller holds the condition)
+        return waitable.wait(timeout)
+
+REAL_CLOCK = Clock()
+
+class SimulatedClock(Clock):
+    # Time only moves when someone sleeps or waits. `speedup` > 0 also sleeps
+    # for real at that ratio (e.g. 1000 = an hour in 3.6s); 0 runs flat out.
+    def __init__(self, start=None, speedup=0, limit=None, on_limit=None):
+        self.t = 0.0
+        self.start = start or datetime.datetime.now().replace(microsecond=0)
+        self.speedup = speedup
+        # Simulated seconds after which on_limit() is called once (ends a dry run)
+        self.limit = limit
+        self.on_limit = on_limit
+
+    def perf(self):
+        return self.t
+
+    def now(self):
+        return self.start + datetime.timedelta(seconds=self.t)
+
+    def advance(self, seconds):
+        if seconds <= 0:
+            return
+        if self.speedup:
+            time.sleep(seconds / self.speedup)
+        self.t += seconds
+        if self.limit is not None and self.t >= self.limit:
+            self.t = max(self.t, self.limit)
+            self.limit = None
+            if self.on_limit:
+                self.on_limit()
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+    def sleep_until(self, deadline, stopped=None):
+        self.advance(deadline - self.t)
+        return not (stopped is not None and stopped())
+
+    def sleep_until_datetime(self, when):
+        self.advance((when - self.now()).total_seconds())
+
+    def wait(self, waitable, timeout):
+        # Nobody else can move simulated time, so waiting is just advancing
+        is_set = getattr(waitable, "is_set", None)
+        if is_set and is_set():
+            return True
+        self.advance(timeout or 0)
+        return False
@@ -1,23 +1,29 @@
 # core/controller.py
 from PySide6.QtCore import QTimer, QObject, Signal, Qt
 from PySide6.QtWidgets import QInputDialog, QMessageBox
-from engine.click_engine import ClickEngine
-from engine.macro_engine import MacroRecorder, MacroPlayer
 from core.scheduler import Scheduler
-from core.hotkeys import Hotkeys
+from core.hotkeys import Hotkeys, profile_bindings
 from core.logging_setup import get_logger
+from core.persistence import get_writer
+from core.fs_watcher import LibraryWatcher
+from core.input_hub import get_hub
+from core.metrics import get_registry
+import os
 import time
 
 log = get_logger("controller")
 
+HOTKEY_LATENCY = get_registry().histogram(
+    "autoclicker_hotkey_latency_seconds", "Hook-to-action latency of global hotkeys")
+
 class Controller(QObject):
     # Signals for thread-safe UI updates
     update_running_state_signal = Signal(bool)
     show_error_signal = Signal(str)
     close_app_signal = Signal()
 
-    # Signal to handle hotkey trigger on main thread
-    hotkey_triggered = Signal()
+    # Signal to handle hotkey trigger on main thread: (action, arg, hook timestamp)
+    hotkey_triggered = Signal(str, object, float)
 
     def __init__(self, ui, app_state, profile_manager, macro_manager):
         super().__init__()
@@ -25,39 +31,35 @@ class Controller(QObject):
         self.app_state = app_state
         self.profile_manager = profile_manager
         self.macro_manager = macro_manager
-        self.engine = ClickEngine()
+        # AUTOCLICKER_TRACE=<dir> records every injected event to ring files there
+        self._trace_dir = os.environ.get("AUTOCLICKER_TRACE")
+        self._traces = []
 
-        self.recorder = MacroRecorder()
-        self.player = MacroPlayer()
+        # Click engine and macro recorder/player are created on first use (see properties below)
+        self._engine = None
+        self._recorder = None
+        self._player = None
 
         self.scheduler = Scheduler()
         self.scheduler.job_triggered.connect(self._on_scheduled_job, Qt.QueuedConnection)
         self.scheduler.start()
+        initial = self.app_state.active_profile
+        self.scheduler.update_job(initial["name"], initial.get("schedule", {}))
 
         self.watchdog_timer = QTimer()
         self.watchdog_timer.timeout.connect(self._check_failsafe)
         self.start_time = 0
 
-        self.engine.started.connect(self._on_start, Qt.QueuedConnection)
-        self.engine.stopped.connect(self._on_stop, Qt.QueuedConnection)
-        self.engine.error.connect(self.show_error_signal, Qt.QueuedConnection)
-        self.engine.cps_updated.connect(self._on_cps_updated, Qt.QueuedConnection)
-
-        self.recorder.finished.connect(self._on_recording_finished)
-        self.player.finished.connect(self._on_playback_finished)
+        self._macro_tracks = {} # macro name -> playing track id
 
         profile = self.app_state.active_profile
 
-        self.hotkeys = Hotkeys(
-            profile["toggle_key"],
-            profile["kill_key"],
-            self._on_hotkey_toggle,
-            self.kill
-        )
+        self.hotkeys = Hotkeys(profile_bindings(profile), self._on_hotkey)
         self.hotkeys.start()
+        self.hotkey_latency = {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0}
 
         # Connect internal signal for thread safety
-        self.hotkey_triggered.connect(self.toggle, Qt.QueuedConnection)
+        self.hotkey_triggered.connect(self._dispatch_hotkey, Qt.QueuedConnection)
 
         # Connect UI update signals
         self.update_running_state_signal.connect(self._update_running_ui)
@@ -76,6 +78,16 @@ class Controller(QObject):
         if hasattr(self.ui, "config_changed"):
             self.ui.config_changed.connect(self._on_config_changed)
 
+        # Pick up changes made by other tools or instances
+        profile_dir = None if self.profile_manager.store else self.profile_manager.profile_dir
+        self.library_watcher = LibraryWatcher(profile_dir, self.macro_manager.macro_dir)
+        self.library_watcher.profile_added.connect(self._on_profile_file_added)
+        self.library_watcher.profile_removed.connect(self._on_profile_file_removed)
+        self.library_watcher.profile_changed.connect(self.profile_manager.file_changed)
+        self.library_watcher.macro_added.connect(self._on_macro_file_changed)
+        self.library_watcher.macro_changed.connect(self._on_macro_file_changed)
+        self.library_watcher.macro_removed.connect(self._on_macro_file_removed)
+
         # Macro signals
         if hasattr(self.ui, "record_macro_requested"):
             self.ui.record_macro_requested.connect(self.start_recording)
@@ -85,8 +97,61 @@ class Controller(QObject):
             self.ui.play_macro_requested.connect(self.play_macro)
         if hasattr(self.ui, "stop_macro_requested"):
             self.ui.stop_macro_requested.connect(self.stop_macro)
+        if hasattr(self.ui, "macro_speed_changed"):
+            self.ui.macro_speed_changed.connect(self.set_macro_speed)
         if hasattr(self.ui, "delete_macro_requested"):
             self.ui.delete_macro_requested.connect(self.delete_macro)
+        if hasattr(self.ui, "heatmap_toggled"):
+            self.ui.heatmap_toggled.connect(self._on_heatmap_toggled)
+        if hasattr(self.ui, "profile_requested"):
+            self.ui.profile_requested.connect(self.start_profiling)
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from engine.click_engine import ClickEngine
+            self._engine = ClickEngine()
+            self._engine.started.connect(self._on_start, Qt.QueuedConnection)
+            self._engine.stopped.connect(self._on_stop, Qt.QueuedConnection)
+            self._engine.error.connect(self.show_error_signal, Qt.QueuedConnection)
+            self._engine.cps_updated.connect(self._on_cps_updated, Qt.QueuedConnection)
+            if self._trace_dir:
+                self._engine.trace = self._open_trace("trace-engine.bin")
+        return self._engine
+
+    @property
+    def engine_running(self):
+        # Doesn't create the engine just to ask
+        return self._engine is not None and self._engine.running
+
+    @property
+    def recorder(self):
+        if self._recorder is None:
+            from engine.macro_engine import MacroRecorder
+            self._recorder = MacroRecorder()
+            self._recorder.finished.connect(self._on_recording_finished)
+        return self._recorder
+
+    @property
+    def player(self):
+        if self._player is None:
+            from engine.macro_engine import MacroPlayer
+            self._player = MacroPlayer()
+            self._player.finished.connect(self._on_playback_finished)
+            self._player.track_finished.connect(self._on_track_finished)
+            if hasattr(self.ui, "show_macro_fidelity"):
+                self._player.fidelity_report.connect(self.ui.show_macro_fidelity)
+            if self._trace_dir:
+                self._player.trace = self._open_trace("trace-macro.bin")
+        return self._player
+
+    def _open_trace(self, filename):
+        from engine.trace import open_trace
+        path = os.path.join(self._trace_dir, filename)
+        trace = open_trace(path)
+        self._traces.append(trace)
+        log.info(f"Tracing injected events to {path}")
+        return trace
 
     def _on_config_changed(self):
          if not self.app_state.unsaved_changes:
@@ -94,6 +159,24 @@ class Controller(QObject):
              if hasattr(self.ui, "set_unsaved_indicator"):
                  self.ui.set_unsaved_indicator(True)
 
+    def _on_profile_file_added(self, name):
+        if hasattr(self.ui, "add_profile_entry"):
+            self.ui.add_profile_entry(name)
+
+    def _on_profile_file_removed(self, name):
+        self.profile_manager.file_changed(name)
+        if hasattr(self.ui, "remove_profile_entry"):
+            self.ui.remove_profile_entry(name)
+
+    def _on_macro_file_changed(self, name):
+        if self.macro_manager.file_changed(name) and hasattr(self.ui, "update_macro_entry"):
+            self.ui.update_macro_entry(name)
+
+    def _on_macro_file_removed(self, name):
+        self.macro_manager.file_removed(name)
+        if hasattr(self.ui, "remove_macro_entry"):
+            self.ui.remove_macro_entry(name)
+
     def _on_cps_updated(self, cps):
         if hasattr(self.ui, "update_cps"):
             self.ui.update_cps(cps)
@@ -106,9 +189,9 @@ class Controller(QObject):
         active_index = self.ui.tabs.currentIndex()
 
         if active_index == 3: # Macro Tab
-            if self.player.running:
+            if self._player and self._player.running:
                 self.stop_macro()
-            elif self.recorder.running:
+            elif self._recorder and self._recorder.running:
                 self.stop_recording()
             else:
                 # Start playing selected macro? Or record?
@@ -123,7 +206,7 @@ class Controller(QObject):
         else:
             # Clicking Mode
             self.ui.start.setEnabled(False)
-            if self.engine.running:
+            if self.engine_running:
                 self.engine.stop()
             else:
                 self.engine.start(self.ui.get_config())
@@ -136,18 +219,73 @@ class Controller(QObject):
     def _close_app(self):
         try:
             self.hotkeys.stop()
-            self.engine.stop()
-            self.recorder.stop()
-            self.player.stop()
+            if self._engine:
+                self._engine.stop()
+            if self._recorder:
+                self._recorder.stop()
+            if self._player:
+                self._player.stop()
             self.scheduler.stop()
+            get_hub().stop()
+            from core.profiler import stop_profiling
+            stop_profiling()
+            # Engine and player stops join their threads, nothing records past here
+            for trace in self._traces:
+                trace.close()
+            # Don't exit with profile/macro writes still queued
+            get_writer().flush()
             if hasattr(self.ui, "overlay") and self.ui.overlay:
                 self.ui.overlay.close()
             self.ui.close()
         except Exception as e:
             log.error(f"Error during close: {e}")
 
-    def _on_hotkey_toggle(self):
-        self.hotkey_triggered.emit()
+    def _on_hotkey(self, action, arg, t_hook):
+        # Hook thread: hand over to the main thread right away
+        self.hotkey_triggered.emit(action, arg, t_hook)
+
+    def _dispatch_hotkey(self, action, arg, t_hook):
+        latency = time.perf_counter() - t_hook
+        stats = self.hotkey_latency
+        stats["count"] += 1
+        stats["total"] += latency
+        stats["last"] = latency
+        stats["max"] = max(stats["max"], latency)
+        HOTKEY_LATENCY.observe(latency)
+        if latency > 0.016:
+            log.warning("Hotkey %s took %.1f ms hook -> action", action, latency * 1000)
+        else:
+            log.debug("Hotkey %s latency %.2f ms", action, latency * 1000)
+
+        if action == "toggle":
+            self.toggle()
+        elif action == "kill":
+            self.kill()
+        elif action == "pause":
+            if self._engine:
+                self._engine.toggle_pause()
+        elif action == "start_profile":
+            if arg and arg != self.app_state.active_profile["name"]:
+                self.load_profile(arg)
+            if not self.engine_running:
+                self.ui.start.setEnabled(False)
+                self.engine.start(self.ui.get_config())
+        elif action == "play_macro":
+            if arg:
+                self.play_macro(arg, 1.0)
+        elif action == "stop_macro":
+            self.stop_macro()
+        elif action == "profile":
+            self.start_profiling(float(arg or 10))
+
+    def _on_heatmap_toggled(self, enabled):
+        # The engine picks the feed up on its next tick, running or not
+        self.engine.feed = self.ui.heatmap.feed if enabled else None
+
+    def start_profiling(self, seconds=10):
+        from core.profiler import profile_threads
+        if profile_threads(seconds) and hasattr(self.ui, "status"):
+            self.ui.status.setText(f"Profiling for {seconds:g}s…")
 
     def _update_running_ui(self, running):
         self.ui.set_running(running)
@@ -178,24 +316,17 @@ class Controller(QObject):
         log.info(f"Switching to profile: {name}")
 
         # Explicitly stop all engines to ensure clean state
-        if self.engine.running:
+        if self.engine_running:
             self.engine.stop()
-        if self.recorder.running:
-            self.recorder.stop()
-        if self.player.running:
-            self.player.stop()
+        if self._recorder and self._recorder.running:
+            self._recorder.stop()
+        if self._player and self._player.running:
+            self._player.stop()
 
         profile = self.profile_manager.load(name)
         self.app_state.active_profile = profile
 
-        self.hotkeys.stop()
-        self.hotkeys = Hotkeys(
-            profile["toggle_key"],
-            profile["kill_key"],
-            self.toggle,
-            self.kill
-        )
-        self.hotkeys.start()
+        self.hotkeys.bind(profile_bindings(profile))
 
         if hasattr(self.ui, "load_profile_data"):
              self.ui.load_profile_data(profile)
@@ -203,6 +334,7 @@ class Controller(QObject):
 
         if self.scheduler:
             self.scheduler.update_job(name, profile.get("schedule", {}))
+            self._update_next_run()
 
     def new_profile(self, name):
         profile = self.profile_manager.normalize(name, {})
@@ -219,6 +351,11 @@ class Controller(QObject):
              self.ui.set_unsaved_indicator(False)
 
         self.scheduler.update_job(name, data.get("schedule", {}))
+        self._update_next_run()
+
+    def _update_next_run(self):
+        if hasattr(self.ui, "set_next_run"):
+            self.ui.set_next_run(self.scheduler.next_run(self.app_state.active_profile["name"]))
 
     def save_profile_as(self, name):
         data = self.ui.get_config()
@@ -231,12 +368,16 @@ class Controller(QObject):
         self.profile_manager.save(new_name, data)
         self.profile_manager.delete(old_name)
         self.load_profile(new_name)
+        if hasattr(self.ui, "remove_profile_entry"):
+            self.ui.remove_profile_entry(old_name)
 
     def delete_profile(self, name):
         self.profile_manager.delete(name)
         current = self.app_state.active_profile["name"]
         if current == name:
             self.load_profile("default")
+        if hasattr(self.ui, "remove_profile_entry"):
+            self.ui.remove_profile_entry(name)
 
     def _handle_create_profile(self):
         name, ok = QInputDialog.getText(self.ui, "New Profile", "Profile name:")
@@ -267,7 +408,14 @@ class Controller(QObject):
 
     def _on_scheduled_job(self, job):
         log.info(f"Executing scheduled job: {job}")
-        if self.engine.running:
+        self._update_next_run()
+
+        if job.get("action") == "stop":
+            if self.engine_running and job["profile"] == self.app_state.active_profile["name"]:
+                self.engine.stop()
+            return
+
+        if self.engine_running:
             self.toggle()
             # Allow time for engine to stop via signals?
             # Toggle is async if engine running? No, engine.stop() waits for thread join.
@@ -281,32 +429,62 @@ class Controller(QObject):
     # Macro Methods
 
     def start_recording(self):
-        if self.engine.running: self.toggle()
-        if self.player.running: self.player.stop()
+        if self.engine_running: self.toggle()
+        if self._player and self._player.running: self._player.stop()
         self.recorder.start()
 
     def stop_recording(self):
         self.recorder.stop()
 
     def _on_recording_finished(self, events):
-        name, ok = QInputDialog.getText(self.ui, "Save Macro", "Macro Name:")
+        from engine.macro_optimizer import optimize_macro
+        options = self.ui.get_macro_options() if hasattr(self.ui, "get_macro_options") else None
+        events, report = optimize_macro(events, options)
+
+        saved = 0
+        if report["bytes_before"]:
+            saved = 100 - report["bytes_after"] * 100 // report["bytes_before"]
+        label = (f"Macro Name ({report['events_before']} -> {report['events_after']} events, "
+                 f"-{saved}% size):")
+
+        name, ok = QInputDialog.getText(self.ui, "Save Macro", label)
         if ok and name:
             self.macro_manager.save(name, events)
-            if hasattr(self.ui, "refresh_macro_list"):
-                self.ui.refresh_macro_list()
+            if hasattr(self.ui, "update_macro_entry"):
+                self.ui.update_macro_entry(name)
 
     def play_macro(self, name, speed):
-        if self.engine.running: self.toggle()
-        if self.recorder.running: self.stop_recording()
+        if self.engine_running: self.toggle()
+        if self._recorder and self._recorder.running: self.stop_recording()
 
         events = self.macro_manager.load(name)
         if events:
-            self.player.play(events, speed)
+            opts = self.ui.get_playback_options() if hasattr(self.ui, "get_playback_options") else {}
+            # Joins the running playback stream if other macros are already playing
+            track_id = self.player.play(events, speed, **opts)
+            if track_id is not None:
+                self._macro_tracks[name] = track_id
+
+    def set_macro_speed(self, speed):
+        # Rescale the selected macro if it is playing, otherwise everything playing
+        item = self.ui.macro_list.currentItem() if hasattr(self.ui, "macro_list") else None
+        track_id = self._macro_tracks.get(item.data(Qt.UserRole)) if item else None
+        if self._player is None:
+            return
+        self.player.set_speed(speed, track_id)
 
     def stop_macro(self):
-        self.player.stop()
+        if self._player:
+            self._player.stop()
+
+    def _on_track_finished(self, track_id):
+        for name, tid in list(self._macro_tracks.items()):
+            if tid == track_id:
+                del self._macro_tracks[name]
 
     def _on_playback_finished(self):
+        if not self.player.running:
+            self._macro_tracks.clear()
         log.info("Playback finished")
 
     def delete_macro(self, name):
@@ -314,5 +492,5 @@ class Controller(QObject):
                                    QMessageBox.Yes | QMessageBox.No)
         if ret == QMessageBox.Yes:
             self.macro_manager.delete(name)
-            if hasattr(self.ui, "refresh_macro_list"):
-                self.ui.refresh_macro_list()
+            if hasattr(self.ui, "remove_macro_entry"):
+                self.ui.remove_macro_entry(name)
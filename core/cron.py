@@ -0,0 +1,117 @@
+import datetime
+
+# Triggers compute the next fire time strictly after a given datetime.
+
+_MONTH_NAMES = {n: i for i, n in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+_DOW_NAMES = {n: i for i, n in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+
+def _parse_value(token, names):
+    token = token.strip().lower()
+    if token in names:
+        return names[token]
+    return int(token)
+
+def _parse_field(field, lo, hi, names=None):
+    names = names or {}
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_s = part.split("/", 1)
+            step = int(step_s)
+            if step <= 0:
+                raise ValueError(f"Invalid step: {step_s}")
+        if part in ("*", ""):
+            start, end = lo, hi
+        elif "-" in part:
+            a, b = part.split("-", 1)
+            start, end = _parse_value(a, names), _parse_value(b, names)
+        else:
+            start = _parse_value(part, names)
+            end = hi if step > 1 else start
+        if start < lo or end > hi or start > end:
+            raise ValueError(f"Value out of range in '{field}' ({lo}-{hi})")
+        values.update(range(start, end + 1, step))
+    return values
+
+class CronTrigger:
+    # Standard 5-field cron: minute hour day-of-month month day-of-week
+    def __init__(self, expr):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: '{expr}'")
+        self.expr = expr
+        self.minutes = _parse_field(fields[0], 0, 59)
+        self.hours = _parse_field(fields[1], 0, 23)
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12, _MONTH_NAMES)
+        dows = _parse_field(fields[4], 0, 7, _DOW_NAMES)
+        self.dows = {d % 7 for d in dows} # 7 is also Sunday
+        self._dom_any = fields[2] == "*"
+        self._dow_any = fields[4] == "*"
+
+    def _day_matches(self, t):
+        dom = t.day in self.days
+        dow = (t.weekday() + 1) % 7 in self.dows
+        if self._dom_any and self._dow_any:
+            return True
+        if self._dom_any:
+            return dow
+        if self._dow_any:
+            return dom
+        return dom or dow # cron semantics: either restricted field may match
+
+    def next_after(self, dt):
+        t = dt.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        limit = t + datetime.timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                year, month = (t.year + 1, 1) if t.month == 12 else (t.year, t.month + 1)
+                t = t.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(t):
+                t = (t + datetime.timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if t.hour not in self.hours:
+                t = (t + datetime.timedelta(hours=1)).replace(minute=0)
+                continue
+            if t.minute not in self.minutes:
+                t += datetime.timedelta(minutes=1)
+                continue
+            return t
+        return None
+
+    def __repr__(self):
+        return f"cron({self.expr})"
+
+class DailyTrigger(CronTrigger):
+    def __init__(self, hhmm):
+        hour, minute = (int(v) for v in hhmm.split(":"))
+        super().__init__(f"{minute} {hour} * * *")
+        self.time = hhmm
+
+    def __repr__(self):
+        return f"daily({self.time})"
+
+class IntervalTrigger:
+    # Fires at anchor + k * interval; the anchor comes from the scheduler's
+    # clock so simulated and real runs line up
+    def __init__(self, seconds, anchor):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.interval = datetime.timedelta(seconds=seconds)
+        self.anchor = anchor.replace(microsecond=0)
+
+    def next_after(self, dt):
+        if dt < self.anchor:
+            return self.anchor
+        periods = (dt - self.anchor) // self.interval + 1
+        return self.anchor + periods * self.interval
+
+    def __repr__(self):
+        return f"every({self.interval})"
+
+def next_time_of_day(hhmm, after):
+    # Next occurrence of HH:MM strictly after `after`
+    return DailyTrigger(hhmm).next_after(after)
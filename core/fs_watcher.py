@@ -0,0 +1,102 @@
+import os
+from PySide6.QtCore import QObject, Signal, QFileSystemWatcher, QTimer
+from core.logging_setup import get_logger
+
+log = get_logger("fs_watcher")
+
+# Directory events arrive in bursts (temp file + rename); rescan once they settle
+DEBOUNCE_MS = 150
+
+def _snapshot(directory):
+    entries = {}
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name.endswith(".json") and entry.is_file():
+                    st = entry.stat()
+                    entries[entry.name[:-5]] = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        pass
+    return entries
+
+class LibraryWatcher(QObject):
+    # Watches the profile and macro directories and reports per-entry changes,
+    # so views can be patched instead of rebuilt. Each file is watched too:
+    # on Linux a directory watch misses edits made in place.
+    profile_added = Signal(str)
+    profile_removed = Signal(str)
+    profile_changed = Signal(str)
+    macro_added = Signal(str)
+    macro_removed = Signal(str)
+    macro_changed = Signal(str)
+
+    def __init__(self, profile_dir=None, macro_dir=None):
+        super().__init__()
+        self._watcher = QFileSystemWatcher(self)
+        self._dirs = {}
+        self._timers = {}
+        self._files = {} # watched file -> its directory
+
+        if profile_dir is not None:
+            self._add(profile_dir, "profile")
+        if macro_dir is not None:
+            self._add(macro_dir, "macro")
+
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+
+    def _add(self, directory, kind):
+        path = str(directory)
+        entries = _snapshot(directory)
+        self._dirs[path] = (kind, entries)
+        self._watcher.addPath(path)
+        self._watch_files(path, entries)
+
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.setInterval(DEBOUNCE_MS)
+        timer.timeout.connect(lambda p=path: self._rescan(p))
+        self._timers[path] = timer
+        log.info(f"Watching {kind} directory: {path}")
+
+    def _watch_files(self, path, entries):
+        # Files replaced by a rename or deleted drop out of the watcher, so
+        # this runs after every rescan
+        files = {os.path.join(path, name + ".json") for name in entries}
+        gone = [f for f, d in self._files.items() if d == path and f not in files]
+        for f in gone:
+            del self._files[f]
+        if gone:
+            self._watcher.removePaths(gone)
+        active = set(self._watcher.files())
+        missing = [f for f in files if f not in active]
+        if missing:
+            self._watcher.addPaths(missing)
+        self._files.update(dict.fromkeys(files, path))
+
+    def _on_directory_changed(self, path):
+        timer = self._timers.get(path)
+        if timer:
+            timer.start()
+
+    def _on_file_changed(self, path):
+        self._on_directory_changed(self._files.get(path, os.path.dirname(path)))
+
+    def _rescan(self, path):
+        kind, old = self._dirs[path]
+        new = _snapshot(path)
+        self._dirs[path] = (kind, new)
+        self._watch_files(path, new)
+
+        added = getattr(self, f"{kind}_added")
+        removed = getattr(self, f"{kind}_removed")
+        changed = getattr(self, f"{kind}_changed")
+
+        for name in old.keys() - new.keys():
+            removed.emit(name)
+        for name, stamp in new.items():
+            prev = old.get(name)
+            if prev is None:
+                added.emit(name)
+            elif prev != stamp:
+                changed.emit(name)
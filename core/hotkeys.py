@@ -1,37 +1,169 @@
-from pynput import keyboard
+import sys
+import time
 from core.logging_setup import get_logger
+from core.input_hub import get_hub
 
 log = get_logger("hotkeys")
 
-KEY_MAP = {
-    "esc": keyboard.Key.esc,
-    "f6": keyboard.Key.f6,
-    "f7": keyboard.Key.f7,
-    "f8": keyboard.Key.f8,
+ACTIONS = ("toggle", "kill", "pause", "start_profile", "play_macro", "stop_macro", "profile")
+
+# Left/right variants collapse to one modifier name
+MODIFIERS = {
+    "ctrl": "ctrl", "ctrl_l": "ctrl", "ctrl_r": "ctrl",
+    "shift": "shift", "shift_l": "shift", "shift_r": "shift",
+    "alt": "alt", "alt_l": "alt", "alt_r": "alt", "alt_gr": "alt",
+    "cmd": "cmd", "cmd_l": "cmd", "cmd_r": "cmd",
+}
+
+ALIASES = {
+    "control": "ctrl", "win": "cmd", "super": "cmd", "meta": "cmd",
+    "escape": "esc", "return": "enter", "del": "delete", "ins": "insert",
+    "pgup": "page_up", "pgdn": "page_down", "spacebar": "space",
 }
 
+# Shifted characters back to the key that produced them (US layout), so
+# "shift+1" matches when the hook reports "!"
+UNSHIFTED = dict(zip('!@#$%^&*()_+{}|:"<>?~', "1234567890-=[]\\;',./`"))
+
+# Hook events alone can leave a modifier "held" when its release is swallowed
+# (Ctrl+Alt+Del, Win+L, UAC prompts). On Windows the real state is read on
+# each press; elsewhere a modifier not pressed/repeated for this long is dropped.
+MOD_STALE_S = 10.0
+
+if sys.platform == "win32":
+    import ctypes
+    _GetAsyncKeyState = ctypes.windll.user32.GetAsyncKeyState
+    MOD_VKS = (("ctrl", (0x11,)), ("shift", (0x10,)), ("alt", (0x12,)), ("cmd", (0x5B, 0x5C)))
+
+    def held_modifiers():
+        return frozenset(m for m, vks in MOD_VKS if any(_GetAsyncKeyState(vk) & 0x8000 for vk in vks))
+else:
+    held_modifiers = None
+
+def key_name(key):
+    # pynput Key/KeyCode -> canonical lowercase name ("f6", "a", "<65>", "ctrl").
+    # Always the unshifted key; held modifiers are tracked separately.
+    name = getattr(key, "name", None)
+    if name:
+        return name
+    char = getattr(key, "char", None)
+    vk = getattr(key, "vk", None)
+    # Windows vks for digits and letters are their ASCII codes whatever the
+    # modifiers (and ctrl turns the char into a control character)
+    if sys.platform == "win32" and vk is not None and (0x30 <= vk <= 0x39 or 0x41 <= vk <= 0x5A):
+        return chr(vk).lower()
+    if char and ord(char[0]) >= 32:
+        return UNSHIFTED.get(char, char.lower())
+    if vk is not None:
+        if 0x30 <= vk <= 0x39 or 0x41 <= vk <= 0x5A:
+            return chr(vk).lower()
+        return f"<{vk}>"
+    return str(key)
+
+def parse_hotkey(text):
+    # "ctrl+shift+f6" -> (frozenset({"ctrl", "shift"}), "f6")
+    parts = [p.strip().lower() for p in text.split("+") if p.strip()]
+    if not parts:
+        raise ValueError("Empty hotkey")
+    parts = [ALIASES.get(p, p) for p in parts]
+    *mods, key = parts
+    bad = [m for m in mods if m not in MODIFIERS]
+    if bad:
+        raise ValueError(f"Not a modifier: {', '.join(bad)}")
+    return frozenset(MODIFIERS[m] for m in mods), MODIFIERS.get(key, key)
+
+def profile_bindings(profile):
+    # [(hotkey text, action, arg)] for a profile: toggle/kill plus custom entries
+    bindings = [
+        (profile.get("toggle_key", "f6"), "toggle", None),
+        (profile.get("kill_key", "esc"), "kill", None),
+    ]
+    for b in profile.get("hotkeys", []):
+        bindings.append((b.get("keys", ""), b.get("action", ""), b.get("arg")))
+    return bindings
+
 class Hotkeys:
-    def __init__(self, toggle, kill, on_toggle, on_kill):
-        self.toggle = toggle
-        self.kill = kill
-        self.on_toggle = on_toggle
-        self.on_kill = on_kill
-        self.listener = None
+    def __init__(self, bindings, on_action):
+        self.on_action = on_action
+        self._token = None
+        self._release_token = None
+        self._held = {} # modifier -> last press time
+        self._mods = frozenset()
+        self._map = {}
+        self._kill = frozenset() # keys bound to kill, matched with any modifiers
+        self.bind(bindings)
+
+    def bind(self, bindings):
+        # Precompute (modifiers, key) -> (action, arg); a press is one dict lookup
+        table = {}
+        for text, action, arg in bindings:
+            if action not in ACTIONS:
+                log.warning(f"Unknown hotkey action '{action}' for {text}")
+                continue
+            try:
+                chord = parse_hotkey(text)
+            except ValueError as e:
+                log.warning(f"Invalid hotkey '{text}': {e}")
+                continue
+            if chord in table:
+                log.warning(f"Hotkey '{text}' bound twice, using {action}")
+            table[chord] = (action, arg)
+        self._map = table
+        self._kill = frozenset(key for (_, key), (action, _) in table.items() if action == "kill")
+        log.info(f"Hotkeys bound: {', '.join(t for t, _, _ in bindings)}")
 
     def start(self):
+        if self._token is not None:
+            return
         log.info("Hotkeys started")
+        hub = get_hub()
+        self._token = hub.subscribe("key_press", self._on_press)
+        self._release_token = hub.subscribe("key_release", self._on_release)
+
+    def _on_press(self, key):
+        t = time.perf_counter()
+        name = key_name(key)
+        mod = MODIFIERS.get(name)
+        if mod:
+            if mod not in self._held:
+                self._mods = self._mods | {mod}
+            self._held[mod] = t
+            return
+        mods = self._current_mods(t)
+        hit = self._map.get((mods, name))
+        if hit:
+            self.on_action(hit[0], hit[1], t)
+        elif name in self._kill:
+            # Kill works whatever is held, stuck modifiers included
+            self.on_action("kill", None, t)
 
-        def on_press(key):
-            if key == KEY_MAP.get(self.toggle):
-                self.on_toggle()
-            elif key == KEY_MAP.get(self.kill):
-                self.on_kill()
+    def _current_mods(self, t):
+        if held_modifiers is not None:
+            mods = held_modifiers()
+            if mods != self._mods:
+                self._held = {m: t for m in mods}
+                self._mods = mods
+            return mods
+        stale = [m for m, seen in self._held.items() if t - seen > MOD_STALE_S]
+        if stale:
+            log.debug("Dropping stale modifiers: %s", ", ".join(stale))
+            for m in stale:
+                del self._held[m]
+            self._mods = frozenset(self._held)
+        return self._mods
 
-        self.listener = keyboard.Listener(on_press=on_press)
-        self.listener.daemon = True
-        self.listener.start()
+    def _on_release(self, key):
+        mod = MODIFIERS.get(key_name(key))
+        if mod and mod in self._held:
+            del self._held[mod]
+            self._mods = frozenset(self._held)
 
     def stop(self):
         log.info("Hotkeys stopped")
-        if self.listener:
-            self.listener.stop()
+        hub = get_hub()
+        for token in (self._token, self._release_token):
+            if token is not None:
+                hub.unsubscribe(token)
+        self._token = self._release_token = None
+        self._held.clear()
+        self._mods = frozenset()
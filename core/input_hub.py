@@ -0,0 +1,123 @@
+import itertools
+import threading
+import time
+from core.logging_setup import get_logger
+from core.metrics import get_registry
+
+log = get_logger("input_hub")
+
+EVENTS = ("key_press", "key_release", "mouse_click", "mouse_scroll", "mouse_move")
+
+# Time spent in subscribers per hook event; the OS hook is blocked meanwhile.
+# One series per hook thread so each histogram keeps a single writer.
+_LATENCY_HELP = "Time spent dispatching one input hook event to subscribers"
+CALLBACK_LATENCY = {
+    hook: get_registry().histogram("autoclicker_hook_callback_seconds", _LATENCY_HELP, labels={"hook": hook})
+    for hook in ("kbd", "mouse")
+}
+
+class InputHub:
+    # Owns the one global mouse hook and the one keyboard hook. Hotkeys, the
+    # macro recorder and the point picker subscribe here instead of each
+    # installing their own listener thread; a hook is only installed while
+    # it has subscribers.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subs = {e: {} for e in EVENTS}
+        # Immutable per-event snapshots: hook threads iterate these without locking
+        self._dispatch = {e: () for e in EVENTS}
+        self._owners = {}
+        self._tokens = itertools.count(1)
+        self._m_listener = None
+        self._m_moves = False # whether the running mouse hook reports moves
+        self._k_listener = None
+
+    def _sync(self):
+        # Caller holds the lock. Each hook runs only while something listens
+        # to it, and the mouse hook only reports moves while someone wants them.
+        subs = self._subs
+        want_keys = bool(subs["key_press"] or subs["key_release"])
+        want_moves = bool(subs["mouse_move"])
+        want_mouse = want_moves or bool(subs["mouse_click"] or subs["mouse_scroll"])
+
+        if want_keys and not self._k_listener:
+            from pynput import keyboard
+            self._k_listener = keyboard.Listener(
+                on_press=lambda key: self._fire("key_press", key),
+                on_release=lambda key: self._fire("key_release", key))
+            self._k_listener.daemon = True
+            self._k_listener.start()
+            log.info("Keyboard hook installed")
+        elif not want_keys and self._k_listener:
+            self._k_listener.stop()
+            self._k_listener = None
+            log.info("Keyboard hook removed")
+
+        if self._m_listener and (not want_mouse or want_moves != self._m_moves):
+            self._m_listener.stop()
+            self._m_listener = None
+            log.info("Mouse hook removed")
+        if want_mouse and not self._m_listener:
+            from pynput import mouse
+            handlers = {
+                "on_click": lambda *a: self._fire("mouse_click", *a),
+                "on_scroll": lambda *a: self._fire("mouse_scroll", *a),
+            }
+            if want_moves:
+                handlers["on_move"] = lambda *a: self._fire("mouse_move", *a)
+            self._m_listener = mouse.Listener(**handlers)
+            self._m_listener.daemon = True
+            self._m_listener.start()
+            self._m_moves = want_moves
+            log.info("Mouse hook installed (moves %s)", "on" if want_moves else "off")
+
+    def stop(self):
+        with self._lock:
+            for listener in (self._k_listener, self._m_listener):
+                if listener:
+                    listener.stop()
+            self._k_listener = self._m_listener = None
+        log.info("Input hooks removed")
+
+    def subscribe(self, event, callback):
+        if event not in self._subs:
+            raise ValueError(f"Unknown input event: {event}")
+        token = next(self._tokens)
+        with self._lock:
+            self._subs[event][token] = callback
+            self._owners[token] = event
+            self._dispatch[event] = tuple(self._subs[event].values())
+            self._sync()
+        return token
+
+    def unsubscribe(self, token):
+        # Safe from a subscriber callback: stopping a listener from its own
+        # hook thread just ends it after the current event
+        with self._lock:
+            event = self._owners.pop(token, None)
+            if event is None:
+                return
+            self._subs[event].pop(token, None)
+            self._dispatch[event] = tuple(self._subs[event].values())
+            self._sync()
+
+    def _fire(self, event, *args):
+        # Runs on the hook thread; never return False (that would stop the listener)
+        subs = self._dispatch[event]
+        if not subs:
+            return
+        start = time.perf_counter()
+        for cb in subs:
+            try:
+                cb(*args)
+            except Exception:
+                log.exception("Input subscriber failed on %s", event)
+        CALLBACK_LATENCY["kbd" if event[0] == "k" else "mouse"].observe(time.perf_counter() - start)
+
+_hub = None
+
+def get_hub():
+    global _hub
+    if _hub is None:
+        _hub = InputHub()
+    return _hub
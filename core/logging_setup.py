@@ -1,36 +1,120 @@
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import os
+import queue
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from pathlib import Path
-import platform
 import sys
-import os
 
-# Use executable path for frozen apps or script path
-if getattr(sys, 'frozen', False):
+# Where profiles/, macros/ and logs/ live: AUTOCLICKER_HOME if set, the
+# executable's folder for frozen apps, else the project root (not argv[0],
+# which is engine/ under `python -m engine.simulator`)
+HOME_ENV = "AUTOCLICKER_HOME"
+if os.environ.get(HOME_ENV):
+    BASE_DIR = Path(os.environ[HOME_ENV])
+elif getattr(sys, 'frozen', False):
     BASE_DIR = Path(sys.executable).parent
 else:
-    BASE_DIR = Path(sys.argv[0]).parent
+    BASE_DIR = Path(__file__).resolve().parents[1]
 
 LOG_DIR = BASE_DIR / "logs"
-LOG_DIR.mkdir(exist_ok=True)
 
-handler = RotatingFileHandler(
-    LOG_DIR / "app.log",
-    maxBytes=1_000_000,
-    backupCount=5,
-    encoding="utf-8"
-)
+# Per-subsystem levels, e.g. AUTOCLICKER_LOG_LEVELS="engine=WARNING,hotkeys=DEBUG"
+LEVELS_ENV = "AUTOCLICKER_LOG_LEVELS"
+
+_configured = False
+_listener = None
+_spec_names = set() # subsystems the last set_levels call set
+
+class _DeferredQueueHandler(QueueHandler):
+    # The stock prepare() formats the message in the caller's thread. Hand the
+    # raw record over instead so the engine/hook threads only pay for an
+    # enqueue; the listener thread does all formatting and I/O.
+    def prepare(self, record):
+        return record
+
+def setup_logging(levels=None):
+    # Called once by the entry point; importing this module has no side effects
+    global _configured, _listener
+    if _configured:
+        return
+    _configured = True
+
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    file_handler = RotatingFileHandler(
+        LOG_DIR / "app.log",
+        maxBytes=1_000_000,
+        backupCount=5,
+        encoding="utf-8"
+    )
+    stream_handler = logging.StreamHandler()
+    for h in (file_handler, stream_handler):
+        h.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [_DeferredQueueHandler(log_queue)]
+    root.setLevel(logging.DEBUG)
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    handlers=[handler, logging.StreamHandler()]
-)
+    _listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    set_levels(os.environ.get(LEVELS_ENV, ""), levels or "")
+
+def shutdown_logging():
+    # Drains the queue; safe to call more than once
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+def set_level(name, level):
+    # Takes effect immediately for every logger under `name` ("" = root)
+    if isinstance(level, str):
+        level = logging.getLevelName(level.strip().upper())
+        if not isinstance(level, int):
+            raise ValueError(f"Unknown log level for {name or 'root'}")
+    logging.getLogger(name or None).setLevel(level)
+
+def set_levels(*specs):
+    # "WARNING" sets the root level, "engine=ERROR,ui=INFO" sets subsystems;
+    # later entries win. Together the specs replace the previous call's:
+    # subsystems it set that are missing now go back to NOTSET (follow root).
+    global _spec_names
+    names = set()
+    for spec in specs:
+        for part in spec.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            name, _, level = part.rpartition("=")
+            name = name.strip()
+            try:
+                set_level(name, level)
+            except ValueError as e:
+                logging.getLogger("logging").warning("Ignoring log level '%s': %s", part, e)
+                continue
+            if name:
+                names.add(name)
+    for name in _spec_names - names:
+        logging.getLogger(name).setLevel(logging.NOTSET)
+    _spec_names = names
+
+def get_levels():
+    levels = {"root": logging.getLevelName(logging.getLogger().level)}
+    for name, logger in logging.Logger.manager.loggerDict.items():
+        if isinstance(logger, logging.Logger) and logger.level != logging.NOTSET:
+            levels[name] = logging.getLevelName(logger.level)
+    return levels
+
+def log_diagnostics():
+    # Not needed to show the window; entry points run this after startup
+    import platform
+    root = get_logger("startup")
+    root.info("OS: %s", platform.platform())
+    root.info("Python: %s", sys.version)
 
 def get_logger(name):
     return logging.getLogger(name)
-
-# Startup diagnostics
-root = get_logger("startup")
-root.info(f"OS: {platform.platform()}")
-root.info(f"Python: {sys.version}")
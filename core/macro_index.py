@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from core.logging_setup import get_logger
+
+log = get_logger("macro_index")
+
+INDEX_FILE = "index.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS macros (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    event_count INTEGER NOT NULL,
+    mouse_events INTEGER NOT NULL,
+    key_events INTEGER NOT NULL,
+    scroll_events INTEGER NOT NULL,
+    checksum TEXT NOT NULL
+)
+"""
+
+_COLUMNS = ("name", "size", "mtime_ns", "duration", "event_count",
+            "mouse_events", "key_events", "scroll_events", "checksum")
+
+KINDS = ("all", "mouse", "keyboard", "mixed")
+
+_KIND_FILTERS = {
+    "all": "",
+    "mouse": " AND key_events = 0 AND mouse_events + scroll_events > 0",
+    "keyboard": " AND key_events > 0 AND mouse_events + scroll_events = 0",
+    "mixed": " AND key_events > 0 AND mouse_events + scroll_events > 0",
+}
+
+# Same filters in Python, for rows that only exist in memory
+_KIND_TESTS = {
+    "all": lambda r: True,
+    "mouse": lambda r: r["key_events"] == 0 and r["mouse_events"] + r["scroll_events"] > 0,
+    "keyboard": lambda r: r["key_events"] > 0 and r["mouse_events"] + r["scroll_events"] == 0,
+    "mixed": lambda r: r["key_events"] > 0 and r["mouse_events"] + r["scroll_events"] > 0,
+}
+
+def _like_pattern(search):
+    return "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+def checksum(raw):
+    return hashlib.sha1(raw).hexdigest()
+
+def summarize(events):
+    mouse = keys = scroll = 0
+    for e in events:
+        t = e.get("type", "")
+        if t == "mouse_click":
+            mouse += 1
+        elif t == "mouse_scroll":
+            scroll += 1
+        elif t.startswith("key_"):
+            keys += 1
+    duration = events[-1]["t"] if events else 0.0
+    return {
+        "duration": duration,
+        "event_count": len(events),
+        "mouse_events": mouse,
+        "key_events": keys,
+        "scroll_events": scroll,
+    }
+
+def pending_row(name, events):
+    # Row for a macro whose file isn't written yet; size/mtime/checksum come
+    # once it is and the real row is stored
+    return {"name": name, "size": 0, "mtime_ns": 0, **summarize(events), "checksum": ""}
+
+def row_matches(row, search="", kind="all"):
+    # LIKE is case-insensitive for ASCII, so is this
+    return search.lower() in row["name"].lower() and _KIND_TESTS.get(kind, _KIND_TESTS["all"])(row)
+
+class MacroIndex:
+    # Sidecar SQLite index of macro metadata, invalidated by file mtime/size,
+    # so the library can be listed and searched without opening macro files.
+    def __init__(self, macro_dir):
+        self.macro_dir = macro_dir
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(macro_dir / INDEX_FILE), check_same_thread=False)
+        self._db.execute(_SCHEMA)
+        self._db.commit()
+
+    def _upsert(self, name, events, size, mtime_ns, digest):
+        info = summarize(events)
+        row = (
+            name, size, mtime_ns, info["duration"], info["event_count"],
+            info["mouse_events"], info["key_events"], info["scroll_events"], digest
+        )
+        with self._lock:
+            self._db.execute(f"INSERT OR REPLACE INTO macros VALUES ({','.join('?' * len(_COLUMNS))})", row)
+            self._db.commit()
+
+    def put(self, name, events, raw, stat):
+        self._upsert(name, events, stat.st_size, stat.st_mtime_ns, checksum(raw))
+
+    def remove(self, name):
+        with self._lock:
+            self._db.execute("DELETE FROM macros WHERE name = ?", (name,))
+            self._db.commit()
+
+    def sync(self, keep=()):
+        # Stat every macro file (no reads) and re-index only the changed ones.
+        # Names in `keep` are being written right now and are left alone.
+        with self._lock:
+            known = {r[0]: (r[1], r[2]) for r in self._db.execute("SELECT name, size, mtime_ns FROM macros")}
+
+        on_disk = {}
+        with os.scandir(self.macro_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".json") and entry.is_file():
+                    on_disk[entry.name[:-5]] = entry
+
+        stale = [name for name in known if name not in on_disk and name not in keep]
+        if stale:
+            with self._lock:
+                self._db.executemany("DELETE FROM macros WHERE name = ?", [(n,) for n in stale])
+                self._db.commit()
+
+        reindexed = 0
+        for name, entry in on_disk.items():
+            if name in keep:
+                continue
+            st = entry.stat()
+            if known.get(name) == (st.st_size, st.st_mtime_ns):
+                continue
+            try:
+                with open(entry.path, "rb") as f:
+                    raw = f.read()
+                events = json.loads(raw).get("events", [])
+            except Exception as e:
+                log.warning(f"Skipping unreadable macro {name}: {e}")
+                continue
+            self.put(name, events, raw, st)
+            reindexed += 1
+
+        if reindexed or stale:
+            log.info(f"Macro index synced: {reindexed} reindexed, {len(stale)} removed")
+
+    def sync_one(self, name):
+        # Re-index a single macro if its file differs from the stored row;
+        # returns False if the file is gone
+        path = self.macro_dir / f"{name}.json"
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            self.remove(name)
+            return False
+        row = self.get(name)
+        if row and (row["size"], row["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+            return True
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+            events = json.loads(raw).get("events", [])
+        except Exception as e:
+            log.warning(f"Skipping unreadable macro {name}: {e}")
+            return False
+        self.put(name, events, raw, st)
+        return True
+
+    def matches(self, name, search="", kind="all"):
+        sql = "SELECT * FROM macros WHERE name = ? AND name LIKE ? ESCAPE '\\'" + _KIND_FILTERS.get(kind, "")
+        with self._lock:
+            row = self._db.execute(sql, (name, _like_pattern(search))).fetchone()
+        return dict(zip(_COLUMNS, row)) if row else None
+
+    def query(self, search="", kind="all"):
+        sql = "SELECT * FROM macros WHERE name LIKE ? ESCAPE '\\'" + _KIND_FILTERS.get(kind, "")
+        sql += " ORDER BY name"
+        with self._lock:
+            rows = self._db.execute(sql, (_like_pattern(search),)).fetchall()
+        return [dict(zip(_COLUMNS, r)) for r in rows]
+
+    def get(self, name):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM macros WHERE name = ?", (name,)).fetchone()
+        return dict(zip(_COLUMNS, row)) if row else None
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -1,22 +1,64 @@
 import json
 from pathlib import Path
-from core.logging_setup import get_logger
+from core.logging_setup import get_logger, BASE_DIR
+from core.macro_index import MacroIndex, pending_row, row_matches
+from core.persistence import get_writer
 
 log = get_logger("macro_manager")
 
 class MacroManager:
-    def __init__(self, macro_dir="macros"):
-        import sys
-        if getattr(sys, 'frozen', False):
-            base = Path(sys.executable).parent
-        else:
-            base = Path(sys.argv[0]).parent
+    def __init__(self, macro_dir="macros", writer=None):
+        self.macro_dir = BASE_DIR / macro_dir
+        self.macro_dir.mkdir(parents=True, exist_ok=True)
+        self.index = MacroIndex(self.macro_dir)
+        self._synced = False
+        self.writer = writer or get_writer()
+        # Saved macros whose file is still being written in the background;
+        # None for a queued delete. The index is only written by the writer
+        # thread, so these are merged into listings until it catches up.
+        self._pending = {}
 
-        self.macro_dir = base / macro_dir
-        self.macro_dir.mkdir(exist_ok=True)
+    def _ensure_synced(self):
+        if not self._synced:
+            self.index.sync(keep=set(self._pending))
+            self._synced = True
+
+    def refresh(self):
+        self._synced = False
+        self._ensure_synced()
+
+    def file_changed(self, name):
+        # Called for files added/changed/removed behind our back
+        if name in self._pending:
+            return self._pending[name] is not None
+        return self.index.sync_one(name)
+
+    def file_removed(self, name):
+        if name not in self._pending:
+            self.index.remove(name)
 
     def list_macros(self):
-        return sorted(p.stem for p in self.macro_dir.glob("*.json"))
+        return [r["name"] for r in self.search_macros()]
+
+    def search_macros(self, text="", kind="all"):
+        self._ensure_synced()
+        pending = dict(self._pending)
+        rows = [r for r in self.index.query(text, kind) if r["name"] not in pending]
+        for name, events in pending.items():
+            if events is not None:
+                row = pending_row(name, events)
+                if row_matches(row, text, kind):
+                    rows.append(row)
+        if pending:
+            rows.sort(key=lambda r: r["name"])
+        return rows
+
+    def get_info(self, name):
+        self._ensure_synced()
+        if name in self._pending:
+            events = self._pending[name]
+            return pending_row(name, events) if events is not None else None
+        return self.index.get(name)
 
     def save(self, name, events):
         path = self.macro_dir / f"{name}.json"
@@ -25,11 +67,26 @@ class MacroManager:
             "name": name,
             "events": events
         }
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-        log.info(f"Saved macro: {name}")
+        # Listed right away; the index row is stored once the file is written
+        self._pending[name] = events
+
+        written = {}
+
+        def serialize():
+            written["raw"] = json.dumps(data, indent=2).encode("utf-8")
+            return written["raw"]
+
+        def on_done(path):
+            self.index.put(name, events, written["raw"], path.stat())
+            if self._pending.get(name) is events:
+                del self._pending[name]
+            log.info(f"Saved macro: {name}")
+
+        self.writer.submit(path, serialize, on_done, delay=0)
 
     def load(self, name):
+        if name in self._pending:
+            return self._pending[name] or []
         path = self.macro_dir / f"{name}.json"
         if not path.exists():
             return []
@@ -38,7 +95,14 @@ class MacroManager:
         return data.get("events", [])
 
     def delete(self, name):
+        # Queued behind any write of the same macro still in flight
         path = self.macro_dir / f"{name}.json"
-        if path.exists():
-            path.unlink()
+        self._pending[name] = None
+
+        def on_done(path):
+            self.index.remove(name)
+            if name in self._pending and self._pending[name] is None:
+                del self._pending[name]
             log.info(f"Deleted macro: {name}")
+
+        self.writer.delete(path, on_done)
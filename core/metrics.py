@@ -0,0 +1,244 @@
+import bisect
+import json
+import os
+import threading
+import time
+from core.logging_setup import get_logger, LOG_DIR
+
+log = get_logger("metrics")
+
+# Every metric has a single writer thread (engine, player, hook, scheduler).
+# Updates are plain attribute/list increments under the GIL, so there is no
+# lock on the hot path; readers take a slightly racy snapshot, which is fine
+# for telemetry. Code fed by several threads registers one labelled series
+# per thread instead of sharing one, or locks it when off the hot path.
+
+# Seconds; covers sub-ms timing error up to a second of lateness
+TIMING_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# AUTOCLICKER_METRICS_PORT=9464 serves /metrics (Prometheus text) and /metrics.json.
+# When several instances run, the next free port in a small range is used.
+PORT_ENV = "AUTOCLICKER_METRICS_PORT"
+DUMP_ENV = "AUTOCLICKER_METRICS_DUMP_S"
+INSTANCE_ENV = "AUTOCLICKER_INSTANCE"
+PORT_TRIES = 10
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=""):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.value = 0
+
+    def inc(self, n=1):
+        self.value += n
+
+    def snapshot(self):
+        return self.value
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labels=""):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def snapshot(self):
+        return self.value
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=TIMING_BUCKETS, labels=""):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.bounds = tuple(sorted(buckets))
+        # Last slot is +Inf
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self):
+        counts = list(self.counts)
+        cumulative = []
+        total = 0
+        for c in counts:
+            total += c
+            cumulative.append(total)
+        return {
+            "buckets": dict(zip([*map(str, self.bounds), "+Inf"], cumulative)),
+            "sum": self.sum,
+            "count": total,
+        }
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self.instance = os.environ.get(INSTANCE_ENV) or str(os.getpid())
+
+    def _get(self, cls, name, help_text, labels, *args):
+        # labels: {"hook": "kbd"} -> a separate series of the same metric
+        label_text = ",".join(f'{k}="{v}"' for k, v in sorted((labels or {}).items()))
+        with self._lock:
+            for other in self._metrics.values():
+                if other.name == name and not isinstance(other, cls):
+                    raise ValueError(f"Metric {name} already registered as {other.kind}")
+            key = f"{name}{{{label_text}}}" if label_text else name
+            metric = self._metrics.get(key)
+            if metric is None:
+                metric = self._metrics[key] = cls(name, help_text, *args, labels=label_text)
+            return metric
+
+    def counter(self, name, help_text, labels=None):
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text, labels=None):
+        return self._get(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text, buckets=TIMING_BUCKETS, labels=None):
+        return self._get(Histogram, name, help_text, labels, buckets)
+
+    def snapshot(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+        return {
+            "instance": self.instance,
+            "time": time.time(),
+            "metrics": {key: m.snapshot() for key, m in metrics.items()},
+        }
+
+    def prometheus_text(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        described = set()
+        for m in sorted(metrics, key=lambda m: m.name):
+            if m.name not in described:
+                described.add(m.name)
+                lines.append(f"# HELP {m.name} {m.help}")
+                lines.append(f"# TYPE {m.name} {m.kind}")
+            inst = f'instance="{self.instance}"' + (f",{m.labels}" if m.labels else "")
+            snap = m.snapshot()
+            if m.kind == "histogram":
+                for le, count in snap["buckets"].items():
+                    lines.append(f'{m.name}_bucket{{{inst},le="{le}"}} {count}')
+                lines.append(f"{m.name}_sum{{{inst}}} {snap['sum']}")
+                lines.append(f"{m.name}_count{{{inst}}} {snap['count']}")
+            else:
+                lines.append(f"{m.name}{{{inst}}} {snap}")
+        return "\n".join(lines) + "\n"
+
+_registry = Registry()
+
+def get_registry():
+    return _registry
+
+class MetricsExporter:
+    # Localhost HTTP endpoint plus an optional periodic JSON dump to logs/
+    def __init__(self, registry, port=None, dump_s=0):
+        self.registry = registry
+        self.port = port
+        self.dump_s = dump_s
+        self.dump_path = LOG_DIR / f"metrics-{registry.instance}.json"
+        self._server = None
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        if self.port is not None:
+            self._serve()
+        if self.dump_s > 0:
+            t = threading.Thread(target=self._dump_loop, daemon=True, name="MetricsDumpThread")
+            t.start()
+            self._threads.append(t)
+
+    def _serve(self):
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith("/metrics.json"):
+                    body = json.dumps(registry.snapshot()).encode()
+                    ctype = "application/json"
+                elif self.path.startswith("/metrics"):
+                    body = registry.prometheus_text().encode()
+                    ctype = "text/plain; version=0.0.4"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                pass
+
+        for port in range(self.port, self.port + PORT_TRIES):
+            try:
+                self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+                break
+            except OSError:
+                continue
+        else:
+            log.warning("No free metrics port in %d-%d, endpoint disabled", self.port, self.port + PORT_TRIES - 1)
+            return
+
+        self.port = self._server.server_address[1]
+        t = threading.Thread(target=self._server.serve_forever, daemon=True, name="MetricsHTTPThread")
+        t.start()
+        self._threads.append(t)
+        log.info("Metrics at http://127.0.0.1:%d/metrics", self.port)
+
+    def dump(self):
+        LOG_DIR.mkdir(exist_ok=True)
+        tmp = self.dump_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.registry.snapshot(), indent=1), encoding="utf-8")
+        os.replace(tmp, self.dump_path)
+
+    def _dump_loop(self):
+        while not self._stop.wait(self.dump_s):
+            try:
+                self.dump()
+            except OSError as e:
+                log.warning("Metrics dump failed: %s", e)
+
+    def stop(self):
+        self._stop.set()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self.dump_s > 0:
+            try:
+                self.dump()
+            except OSError:
+                pass
+
+def start_exporter(port=None, dump_s=None):
+    # Falls back to the environment; returns None when both outputs are off
+    if port is None and os.environ.get(PORT_ENV):
+        port = int(os.environ[PORT_ENV])
+    if dump_s is None:
+        dump_s = float(os.environ.get(DUMP_ENV) or 0)
+    if port is None and dump_s <= 0:
+        return None
+    exporter = MetricsExporter(_registry, port, dump_s)
+    exporter.start()
+    return exporter
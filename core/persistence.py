@@ -0,0 +1,130 @@
+import functools
+import os
+import threading
+import time
+from core.logging_setup import get_logger
+
+log = get_logger("persistence")
+
+COALESCE_WINDOW_S = 0.5
+
+def durable_write(path, payload):
+    # Write to a temp file, fsync it, then rename over the target so a crash
+    # or power loss leaves either the old or the new file, never an empty one.
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+    if os.name == "posix":
+        # Persist the rename itself
+        fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+def _write_job(serialize, path):
+    payload = serialize()
+    durable_write(path, payload)
+    log.debug(f"Written: {path.name} ({len(payload)} bytes)")
+
+def _delete_job(path):
+    try:
+        path.unlink()
+        log.debug(f"Deleted: {path.name}")
+    except FileNotFoundError:
+        pass
+
+class WriteBehindQueue:
+    # Single background writer. Jobs are keyed by path: resubmitting a path
+    # that is still pending replaces its payload but keeps its deadline, so
+    # bursts of saves collapse into one write. Deletes and other blocking I/O
+    # go through the same thread so they stay ordered with the writes.
+    def __init__(self, coalesce_s=COALESCE_WINDOW_S):
+        self.coalesce_s = coalesce_s
+        self._cond = threading.Condition()
+        self._jobs = {}
+        self._busy = 0
+        self._thread = None
+
+    def submit(self, path, serialize, on_done=None, delay=None):
+        self._queue(path, functools.partial(_write_job, serialize), on_done, delay)
+
+    def delete(self, path, on_done=None):
+        # Replaces a queued write and runs after one already in flight, so
+        # that write's rename can't bring the file back
+        self._queue(path, _delete_job, on_done, 0)
+
+    def call(self, key, fn, on_done=None, delay=0):
+        # Any other blocking I/O (SQLite commits); a pending call with the
+        # same key is replaced
+        self._queue(key, lambda key: fn(), on_done, delay)
+
+    def _queue(self, key, action, on_done, delay):
+        delay = self.coalesce_s if delay is None else delay
+        with self._cond:
+            due = time.monotonic() + delay
+            prev = self._jobs.get(key)
+            if prev:
+                due = min(prev[0], due)
+            self._jobs[key] = (due, action, on_done)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True, name="PersistenceThread")
+                self._thread.start()
+            self._cond.notify()
+
+    def pending(self, path):
+        with self._cond:
+            return path in self._jobs
+
+    def flush(self, timeout=5.0):
+        # Barrier: make everything due now and wait until it is on disk
+        end = time.monotonic() + timeout
+        with self._cond:
+            self._jobs = {p: (0, s, cb) for p, (_, s, cb) in self._jobs.items()}
+            self._cond.notify_all()
+            while self._jobs or self._busy:
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    log.warning(f"Flush timed out with {len(self._jobs)} pending writes")
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    ready = [p for p, job in self._jobs.items() if job[0] <= now]
+                    if ready:
+                        break
+                    if self._jobs:
+                        self._cond.wait(min(job[0] for job in self._jobs.values()) - now)
+                    else:
+                        self._cond.wait()
+                jobs = [(p, self._jobs.pop(p)) for p in ready]
+                self._busy += 1
+
+            for key, (_, action, on_done) in jobs:
+                try:
+                    action(key)
+                    if on_done:
+                        on_done(key)
+                except Exception:
+                    log.exception(f"Background job failed: {key}")
+
+            with self._cond:
+                self._busy -= 1
+                self._cond.notify_all()
+
+_writer = None
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        _writer = WriteBehindQueue()
+    return _writer
@@ -0,0 +1,168 @@
+# core/point_patterns.py
+# Bulk click point generation (grids, hex grids, circles, random fills inside
+# a region) plus CSV/JSON import and export. Coordinates are built a row or
+# axis at a time and points come back as the same dicts profiles store, ready
+# for PointModel.insert_points.
+import csv
+import json
+import math
+import os
+import random
+from core.logging_setup import get_logger
+
+log = get_logger("patterns")
+
+COLUMNS = ("x", "y", "type", "delay", "label", "group")
+# Hard cap so a typo in a spacing field can't build millions of points
+MAX_POINTS = 200000
+
+def _points(xs, ys, click_type, group):
+    return [{"x": x, "y": y, "type": click_type, "delay": 0, "label": "", "group": group}
+            for x, y in zip(xs, ys)]
+
+def _check(n):
+    if n > MAX_POINTS:
+        raise ValueError(f"Pattern would create {n} points (limit {MAX_POINTS})")
+
+def _axis(start, length, spacing):
+    # Evenly spaced coordinates covering [start, start + length]
+    if spacing <= 0:
+        raise ValueError("Spacing must be positive")
+    return range(start, start + length + 1, spacing)
+
+def grid(x, y, w, h, spacing, spacing_y=None, click_type="left", group=0):
+    cols = _axis(x, w, spacing)
+    rows = _axis(y, h, spacing_y or spacing)
+    _check(len(cols) * len(rows))
+    xs = list(cols) * len(rows)
+    ys = [r for r in rows for _ in range(len(cols))]
+    return _points(xs, ys, click_type, group)
+
+def hex_grid(x, y, w, h, spacing, click_type="left", group=0):
+    # Rows sqrt(3)/2 * spacing apart, every other row shifted half a step;
+    # every point is `spacing` away from its six neighbours
+    step_y = max(1, round(spacing * math.sqrt(3) / 2))
+    rows = _axis(y, h, step_y)
+    even = list(_axis(x, w, spacing))
+    odd = list(_axis(x + spacing // 2, w - spacing // 2, spacing)) if w >= spacing // 2 else []
+    _check(len(even) * ((len(rows) + 1) // 2) + len(odd) * (len(rows) // 2))
+    xs, ys = [], []
+    for i, ry in enumerate(rows):
+        row = odd if i & 1 else even
+        xs.extend(row)
+        ys.extend([ry] * len(row))
+    return _points(xs, ys, click_type, group)
+
+def circle(cx, cy, radius, count, rings=1, click_type="left", group=0):
+    # `count` points on the outer ring; inner rings keep the same arc spacing
+    if count <= 0 or rings <= 0:
+        return []
+    xs, ys = [], []
+    for ring in range(rings, 0, -1):
+        r = radius * ring / rings
+        n = max(1, round(count * ring / rings))
+        step = 2 * math.pi / n
+        xs.extend(round(cx + r * math.cos(i * step)) for i in range(n))
+        ys.extend(round(cy + r * math.sin(i * step)) for i in range(n))
+    _check(len(xs))
+    return _points(xs, ys, click_type, group)
+
+def random_fill(x, y, w, h, count, min_dist=0, seed=None, click_type="left", group=0):
+    # Uniform points in the region. With min_dist, candidates closer than that
+    # to an accepted point are rejected (cell grid, so it stays linear); the
+    # result can then hold fewer than `count` points.
+    _check(count)
+    rng = random.Random(seed)
+    if min_dist <= 0:
+        xs = [rng.randint(x, x + w) for _ in range(count)]
+        ys = [rng.randint(y, y + h) for _ in range(count)]
+        return _points(xs, ys, click_type, group)
+
+    cell = min_dist / math.sqrt(2)
+    taken = {}
+    xs, ys = [], []
+    attempts = count * 30
+    d2 = min_dist * min_dist
+    while len(xs) < count and attempts:
+        attempts -= 1
+        px, py = rng.randint(x, x + w), rng.randint(y, y + h)
+        gx, gy = int((px - x) / cell), int((py - y) / cell)
+        ok = True
+        for ox in range(gx - 2, gx + 3):
+            for oy in range(gy - 2, gy + 3):
+                q = taken.get((ox, oy))
+                if q and (q[0] - px) ** 2 + (q[1] - py) ** 2 < d2:
+                    ok = False
+                    break
+            if not ok:
+                break
+        if ok:
+            taken[(gx, gy)] = (px, py)
+            xs.append(px)
+            ys.append(py)
+    if len(xs) < count:
+        log.info(f"Random fill placed {len(xs)}/{count} points at min distance {min_dist}")
+    return _points(xs, ys, click_type, group)
+
+PATTERNS = {
+    "grid": grid,
+    "hex": hex_grid,
+    "circle": circle,
+    "random": random_fill,
+}
+
+def generate(kind, **opts):
+    if kind not in PATTERNS:
+        raise ValueError(f"Unknown pattern: {kind}")
+    return PATTERNS[kind](**opts)
+
+# ---------------- IMPORT / EXPORT ----------------
+
+def _clean(d):
+    return {"x": int(float(d["x"])), "y": int(float(d["y"])),
+            "type": d.get("type") or "left",
+            "delay": int(float(d.get("delay") or 0)),
+            "label": d.get("label") or "",
+            "group": int(float(d.get("group") or 0))}
+
+def load_points(path):
+    # .json: a list of points or a whole profile; anything else is CSV with
+    # an optional x,y,type,delay,label,group header
+    if os.path.splitext(path)[1].lower() == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("points", [])
+        return [_clean(d) for d in data]
+
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    if not rows:
+        return []
+    header = [c.strip().lower() for c in rows[0]]
+    first = 1
+    if "x" in header and "y" in header:
+        rows = rows[1:]
+        first = 2
+    else:
+        header = list(COLUMNS)
+    points = []
+    for n, row in enumerate(rows, first):
+        if not row or not "".join(row).strip():
+            continue
+        try:
+            points.append(_clean(dict(zip(header, (c.strip() for c in row)))))
+        except (KeyError, ValueError):
+            raise ValueError(f"{os.path.basename(path)}: bad point on line {n}: {','.join(row)}")
+    return points
+
+def save_points(points, path):
+    if os.path.splitext(path)[1].lower() == ".json":
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(points, f, indent=1)
+        return
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(COLUMNS)
+        for p in points:
+            w.writerow([p.get(c, "") for c in COLUMNS])
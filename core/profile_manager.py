@@ -1,9 +1,21 @@
 import json
+import threading
 from pathlib import Path
-from core.logging_setup import get_logger
+from core.logging_setup import get_logger, BASE_DIR
+from core.persistence import get_writer, durable_write
+from core.profile_store import SQLiteProfileStore, DB_FILE
 
 log = get_logger("profile_manager")
 
+def _clone(value):
+    # Cheap deep copy for JSON-shaped data; callers (e.g. PointModel) mutate
+    # the profiles they get, so cached entries must never be handed out.
+    if isinstance(value, dict):
+        return {k: _clone(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clone(v) for v in value]
+    return value
+
 class ProfileManager:
     DEFAULT_PROFILE = {
         "version": 2,
@@ -26,24 +38,98 @@ class ProfileManager:
         "failsafe": {"enabled": False, "timeout": 60}
     }
 
-    def __init__(self, profile_dir="profiles"):
-        import sys
-        if getattr(sys, 'frozen', False):
-            base = Path(sys.executable).parent
-        else:
-            base = Path(sys.argv[0]).parent
+    def __init__(self, profile_dir="profiles", writer=None, backend="json"):
+        self.profile_dir = BASE_DIR / profile_dir
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+
+        self.writer = writer or get_writer()
+
+        # Optional single-file library instead of one JSON file per profile
+        self.store = None
+        if backend == "sqlite":
+            self.store = SQLiteProfileStore(self.profile_dir / DB_FILE)
+            if self.store.count() == 0:
+                self.store.import_json(self.profile_dir, self.normalize)
+            log.info(f"Using SQLite profile store ({self.store.count()} profiles)")
 
-        self.profile_dir = base / profile_dir
-        self.profile_dir.mkdir(exist_ok=True)
+        # path -> ((mtime_ns, size), profile); only valid while the file is unchanged.
+        # A key of None marks a profile whose write (or SQLite commit) is still
+        # queued: the cache is authoritative until the writer thread settles
+        # it. (None, None) is a queued delete.
+        self._cache = {}
+        self._cache_lock = threading.Lock()
 
     def _atomic_write(self, path, data):
-        tmp = path.with_suffix(".tmp")
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
-            f.flush()
-        tmp.replace(path)
+        profile = _clone(data)
+        with self._cache_lock:
+            self._cache[path] = (None, profile)
+        self.writer.submit(
+            path,
+            lambda: json.dumps(profile, indent=4).encode("utf-8"),
+            lambda p: self._on_written(p, profile)
+        )
+
+    def _on_written(self, path, profile):
+        # Runs on the writer thread
+        with self._cache_lock:
+            entry = self._cache.get(path)
+            if entry and entry[1] is profile:
+                st = path.stat()
+                self._cache[path] = ((st.st_mtime_ns, st.st_size), profile)
         log.debug(f"Profile written: {path.name}")
 
+    def _store_put(self, name, data):
+        # SQLite commit on the writer thread; the cache answers until it lands
+        path = self.profile_dir / f"{name}.json"
+        profile = _clone(data)
+        with self._cache_lock:
+            self._cache[path] = (None, profile)
+        self.writer.call(("store", name), lambda: self.store.put(name, profile),
+                         lambda key: self._settle(path, profile))
+
+    def _settle(self, path, profile):
+        # Runs on the writer thread: the store (or disk) now has what the
+        # pending entry held, unless a newer save replaced it meanwhile
+        with self._cache_lock:
+            entry = self._cache.get(path)
+            if entry and entry[0] is None and entry[1] is profile:
+                del self._cache[path]
+
+    def _remember(self, path, profile):
+        st = path.stat()
+        self._cache[path] = ((st.st_mtime_ns, st.st_size), _clone(profile))
+
+    def invalidate(self, name=None):
+        if name is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(self.profile_dir / f"{name}.json", None)
+
+    def file_changed(self, name):
+        # Drop the cached entry unless it already describes the file on disk
+        # (our own background writes also show up as changes)
+        path = self.profile_dir / f"{name}.json"
+        entry = self._cache.get(path)
+        if not entry or entry[0] is None:
+            return
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            self._cache.pop(path, None)
+            return
+        if entry[0] != (st.st_mtime_ns, st.st_size):
+            self._cache.pop(path, None)
+            log.debug(f"Profile cache invalidated: {name}")
+
+    def needs_migration(self, data):
+        if data.get("version", 1) < self.DEFAULT_PROFILE["version"]:
+            return True
+        # Old list-style or broken points can show up even in current-version files
+        for p in data.get("points", []):
+            if not isinstance(p, dict) or "x" not in p or "y" not in p:
+                return True
+        return False
+
     def migrate_profile(self, data):
         version = data.get("version", 1)
 
@@ -89,29 +175,70 @@ class ProfileManager:
         return data
 
     def normalize(self, name, data):
-        data = self.migrate_profile(data)
+        if self.needs_migration(data):
+            data = self.migrate_profile(data)
         merged = {**self.DEFAULT_PROFILE, **data}
         merged["name"] = name
         return merged
 
+    def _load_from_store(self, name):
+        entry = self._cache.get(self.profile_dir / f"{name}.json")
+        if entry and entry[1] is not None:
+            profile = _clone(entry[1])
+        else:
+            data = None if entry else self.store.get(name) # (None, None): delete queued
+            if data is None:
+                profile = self.normalize(name, {})
+                self._store_put(name, profile)
+            else:
+                stale = self.needs_migration(data)
+                profile = self.normalize(name, data)
+                if stale or profile != data:
+                    self._store_put(name, profile)
+        self.writer.call(("touch", name), lambda: self.store.touch(name))
+        return profile
+
     def load(self, name):
         path = self.profile_dir / f"{name}.json"
         log.info(f"Loading profile: {name}")
 
+        if self.store:
+            return self._load_from_store(name)
+
         try:
-            if not path.exists():
+            cached = self._cache.get(path)
+            if cached and cached[1] is None:
+                cached = None
+                st = None # delete still queued, same as a missing file
+            elif cached and cached[0] is None:
+                return _clone(cached[1])
+            else:
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    st = None
+
+            if st is None:
                 profile = self.normalize(name, {})
                 self._atomic_write(path, profile)
-                return profile
+                return _clone(profile)
+
+            if cached and cached[0] == (st.st_mtime_ns, st.st_size):
+                return _clone(cached[1])
 
             raw = path.read_text(encoding="utf-8").strip()
             if not raw:
                 raise ValueError("Empty profile")
 
             data = json.loads(raw)
+            stale = self.needs_migration(data)
             profile = self.normalize(name, data)
-            self._atomic_write(path, profile)
-            return profile
+            if stale or profile != data:
+                # Only rewrite when migration/normalization actually changed something
+                self._atomic_write(path, profile)
+            else:
+                self._remember(path, profile)
+            return _clone(profile)
 
         except Exception:
             log.exception("Profile load failed, recovering")
@@ -122,15 +249,60 @@ class ProfileManager:
     def save(self, name, data):
         log.info(f"Saving profile: {name}")
         profile = self.normalize(name, data)
+        if self.store:
+            self._store_put(name, profile)
+            return
         self._atomic_write(self.profile_dir / f"{name}.json", profile)
 
     def list_profiles(self):
-        return sorted(p.stem for p in self.profile_dir.glob("*.json"))
+        if self.store:
+            names = set(self.store.names())
+        else:
+            names = {p.stem for p in self.profile_dir.glob("*.json")}
+        # Queued saves are listed already, queued deletes no longer
+        for path, entry in list(self._cache.items()):
+            if entry[0] is None:
+                if entry[1] is None:
+                    names.discard(path.stem)
+                else:
+                    names.add(path.stem)
+        return sorted(names)
+
+    def flush(self):
+        self.writer.flush()
+
+    def import_json(self, directory):
+        return self.store.import_json(directory, self.normalize)
+
+    def export_json(self, directory):
+        if self.store:
+            return self.store.export_json(directory)
+        self.flush()
+        directory.mkdir(parents=True, exist_ok=True)
+        count = 0
+        for name in self.list_profiles():
+            payload = json.dumps(self.load(name), indent=4).encode("utf-8")
+            durable_write(directory / f"{name}.json", payload)
+            count += 1
+        return count
 
     def delete(self, name):
+        # Queued behind any pending or in-flight write of the same profile
         path = self.profile_dir / f"{name}.json"
-        if path.exists():
-            path.unlink()
-            log.info(f"Deleted profile: {name}")
+        entry = self._cache.get(path)
+        if entry and entry[0] is None:
+            exists = entry[1] is not None
         else:
+            exists = self.store.exists(name) if self.store else path.exists()
+        if not exists:
             log.warning(f"Delete failed: profile {name} not found")
+            return
+
+        with self._cache_lock:
+            self._cache[path] = (None, None)
+        if self.store:
+            self.writer.call(("store", name), lambda: self.store.delete(name),
+                             lambda key: self._settle(path, None))
+        else:
+            self.writer.delete(path, lambda p: self._settle(path, None))
+        log.info(f"Deleted profile: {name}")
@@ -0,0 +1,129 @@
+import json
+import sqlite3
+import threading
+import time
+from core.logging_setup import get_logger
+from core.persistence import durable_write
+
+log = get_logger("profile_store")
+
+DB_FILE = "profiles.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    name TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    last_used REAL NOT NULL DEFAULT 0,
+    updated REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS profiles_last_used ON profiles(last_used DESC);
+CREATE TABLE IF NOT EXISTS profile_tags (
+    name TEXT NOT NULL REFERENCES profiles(name) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (name, tag)
+);
+CREATE INDEX IF NOT EXISTS profile_tags_tag ON profile_tags(tag);
+"""
+
+class SQLiteProfileStore:
+    # Single-file profile library: indexed by name, tags and last use, with
+    # every save/delete in its own transaction.
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def get(self, name):
+        with self._lock:
+            row = self._db.execute("SELECT data FROM profiles WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, name, profile):
+        data = json.dumps(profile)
+        tags = [str(t) for t in profile.get("tags", [])]
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO profiles (name, data, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET data = excluded.data, updated = excluded.updated",
+                (name, data, time.time())
+            )
+            self._db.execute("DELETE FROM profile_tags WHERE name = ?", (name,))
+            self._db.executemany(
+                "INSERT OR IGNORE INTO profile_tags (name, tag) VALUES (?, ?)",
+                [(name, t) for t in tags]
+            )
+
+    def touch(self, name):
+        with self._lock, self._db:
+            self._db.execute("UPDATE profiles SET last_used = ? WHERE name = ?", (time.time(), name))
+
+    def delete(self, name):
+        with self._lock, self._db:
+            cur = self._db.execute("DELETE FROM profiles WHERE name = ?", (name,))
+        return cur.rowcount > 0
+
+    def exists(self, name):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM profiles WHERE name = ?", (name,)).fetchone() is not None
+
+    def names(self, order="name"):
+        sql = "SELECT name FROM profiles ORDER BY "
+        sql += "last_used DESC, name" if order == "recent" else "name"
+        with self._lock:
+            return [r[0] for r in self._db.execute(sql)]
+
+    def names_with_tag(self, tag):
+        with self._lock:
+            rows = self._db.execute("SELECT name FROM profile_tags WHERE tag = ? ORDER BY name", (tag,))
+            return [r[0] for r in rows]
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def import_json(self, profile_dir, normalize=None):
+        # Pull every <name>.json from the classic layout in one transaction
+        rows = []
+        for p in sorted(profile_dir.glob("*.json")):
+            try:
+                data = json.loads(p.read_text(encoding="utf-8"))
+            except Exception as e:
+                log.warning(f"Skipping unreadable profile {p.name}: {e}")
+                continue
+            if normalize:
+                data = normalize(p.stem, data)
+            rows.append((p.stem, data))
+
+        now = time.time()
+        with self._lock, self._db:
+            for name, data in rows:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO profiles (name, data, last_used, updated) VALUES (?, ?, 0, ?)",
+                    (name, json.dumps(data), now)
+                )
+                self._db.execute("DELETE FROM profile_tags WHERE name = ?", (name,))
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO profile_tags (name, tag) VALUES (?, ?)",
+                    [(name, str(t)) for t in data.get("tags", [])]
+                )
+        log.info(f"Imported {len(rows)} profiles from {profile_dir}")
+        return len(rows)
+
+    def export_json(self, profile_dir):
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            rows = self._db.execute("SELECT name, data FROM profiles ORDER BY name").fetchall()
+        for name, data in rows:
+            payload = json.dumps(json.loads(data), indent=4).encode("utf-8")
+            durable_write(profile_dir / f"{name}.json", payload)
+        log.info(f"Exported {len(rows)} profiles to {profile_dir}")
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
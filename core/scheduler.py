@@ -1,62 +1,217 @@
+import heapq
+import itertools
 import threading
-import time
 import datetime
 from PySide6.QtCore import QObject, Signal
+from core.cron import CronTrigger, DailyTrigger, IntervalTrigger, next_time_of_day
 from core.logging_setup import get_logger
+from core.metrics import get_registry
+from core.clock import REAL_CLOCK
 
 log = get_logger("scheduler")
 
+_metrics = get_registry()
+FIRES = _metrics.counter("autoclicker_scheduler_fires_total", "Scheduled starts/stops delivered")
+SKIPPED = _metrics.counter("autoclicker_scheduler_skipped_total", "Scheduled runs skipped as missed")
+LATENESS = _metrics.histogram(
+    "autoclicker_scheduler_lateness_seconds", "How late scheduled runs fired",
+    buckets=(0.001, 0.01, 0.1, 0.5, 1, 5, 30, 60, 300, 3600))
+
+# A run this late (e.g. the machine was asleep) is handled by the job's catch-up policy
+MISFIRE_GRACE_S = 60
+# Upper bound on one sleep so wall-clock jumps (suspend, clock changes) are noticed
+MAX_SLEEP_S = 300
+
+CATCH_UP_POLICIES = ("skip", "run")
+
+class ScheduledJob:
+    def __init__(self, profile, trigger, duration_s=0, stop_time="", catch_up="skip"):
+        self.profile = profile
+        self.trigger = trigger
+        self.duration_s = duration_s
+        self.stop_time = stop_time
+        self.catch_up = catch_up if catch_up in CATCH_UP_POLICIES else "skip"
+        self.cancelled = False
+        self.next_fire = None
+
+    def payload(self, action, scheduled, lateness):
+        return {
+            "profile": self.profile,
+            "action": action,
+            "trigger": repr(self.trigger),
+            "scheduled": scheduled.isoformat(timespec="seconds"),
+            "lateness_s": lateness,
+        }
+
+def build_jobs(profile_name, schedule_data, now, anchors=None):
+    # Legacy single "time" plus any number of entries under "jobs". Interval
+    # jobs start counting at `now` unless `anchors` (interval -> anchor) has
+    # one from before, so a profile re-save doesn't reset them.
+    if not schedule_data.get("enabled"):
+        return []
+
+    specs = list(schedule_data.get("jobs", []))
+    if any(schedule_data.get(k) for k in ("cron", "interval_min", "time")):
+        specs.insert(0, schedule_data)
+    anchors = anchors or {}
+
+    jobs = []
+    for spec in specs:
+        try:
+            if spec.get("cron"):
+                trigger = CronTrigger(spec["cron"])
+            elif spec.get("interval_min"):
+                seconds = spec["interval_min"] * 60
+                trigger = IntervalTrigger(seconds, anchors.get(seconds, now))
+            elif spec.get("time"):
+                trigger = DailyTrigger(spec["time"])
+            else:
+                continue
+        except ValueError as e:
+            log.error(f"Invalid schedule for {profile_name}: {e}")
+            continue
+        jobs.append(ScheduledJob(
+            profile_name, trigger,
+            duration_s=spec.get("duration_min", 0) * 60,
+            stop_time=spec.get("stop_time", ""),
+            catch_up=spec.get("catch_up", "skip")
+        ))
+    return jobs
+
 class Scheduler(QObject):
+    # Min-heap of (fire time, seq, action, job); the thread sleeps until the
+    # earliest entry instead of polling.
     job_triggered = Signal(dict)
 
-    def __init__(self):
+    def __init__(self, clock=None):
         super().__init__()
+        self.clock = clock or REAL_CLOCK
         self.running = False
         self.jobs = []
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
         self._thread = None
-        self._stop_event = threading.Event()
 
     def start(self):
         if self.running: return
         self.running = True
-        self._stop_event.clear()
-        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="SchedulerThread")
         self._thread.start()
         log.info("Scheduler started")
 
     def stop(self):
-        self.running = False
-        self._stop_event.set()
+        with self._cond:
+            self.running = False
+            self._cond.notify()
         if self._thread and self._thread.is_alive():
             self._thread.join(timeout=1)
         log.info("Scheduler stopped")
 
+    def _push(self, when, action, job):
+        heapq.heappush(self._heap, (when, next(self._seq), action, job))
+
     def update_job(self, profile_name, schedule_data):
-        # Remove existing job for this profile
-        self.jobs = [j for j in self.jobs if j["profile"] != profile_name]
+        now = self.clock.now()
+        with self._cond:
+            # Replace all jobs for this profile; old heap entries die lazily
+            anchors = {}
+            for j in self.jobs:
+                if j.profile == profile_name:
+                    j.cancelled = True
+                    if isinstance(j.trigger, IntervalTrigger):
+                        anchors[j.trigger.interval.total_seconds()] = j.trigger.anchor
+            self.jobs = [j for j in self.jobs if j.profile != profile_name]
+
+            for job in build_jobs(profile_name, schedule_data, now, anchors):
+                job.next_fire = job.trigger.next_after(now)
+                if job.next_fire is None:
+                    continue
+                self.jobs.append(job)
+                self._push(job.next_fire, "start", job)
+                log.info(f"Scheduled {profile_name}: {job.trigger!r}, next at {job.next_fire:%Y-%m-%d %H:%M}")
+            self._cond.notify()
 
-        if schedule_data.get("enabled"):
-            self.jobs.append({
-                "profile": profile_name,
-                "time": schedule_data.get("time"),
-                "executed_today": False
-            })
-            log.info(f"Scheduled {profile_name} at {schedule_data.get('time')}")
+    def next_run(self, profile_name=None):
+        runs = [j.next_fire for j in self.jobs
+                if j.next_fire and (profile_name is None or j.profile == profile_name)]
+        return min(runs) if runs else None
 
     def _loop(self):
-        while self.running:
-            now = datetime.datetime.now()
-            current_time = now.strftime("%H:%M")
-
-            # Reset executed flags at midnight
-            if now.hour == 0 and now.minute == 0 and now.second < 2:
-                for j in self.jobs: j["executed_today"] = False
-
-            for job in self.jobs:
-                if not job["executed_today"] and job["time"] == current_time:
-                    log.info(f"Triggering scheduled job: {job['profile']}")
-                    self.job_triggered.emit(job)
-                    job["executed_today"] = True
-
-            if self._stop_event.wait(1):
-                break
+        while True:
+            with self._cond:
+                if not self.running:
+                    break
+                if not self._heap:
+                    # Nothing scheduled: sleep until update_job/stop
+                    self._cond.wait()
+                    continue
+
+                when, _, action, job = self._heap[0]
+                # Pending stops still run so a re-saved profile isn't left clicking
+                if job.cancelled and action == "start":
+                    heapq.heappop(self._heap)
+                    continue
+
+                now = self.clock.now()
+                delay = (when - now).total_seconds()
+                if delay > 0:
+                    self.clock.wait(self._cond, min(delay, MAX_SLEEP_S))
+                    continue
+
+                heapq.heappop(self._heap)
+                fire = self._handle(job, action, when, now)
+
+            if fire:
+                self.job_triggered.emit(fire)
+
+    def run_until(self, until):
+        # Synchronous replay for dry runs (no thread): delivers everything due
+        # up to `until` in order and returns the payloads. Needs a SimulatedClock.
+        fired = []
+        with self._cond:
+            while self._heap and self._heap[0][0] <= until:
+                when, _, action, job = heapq.heappop(self._heap)
+                if job.cancelled and action == "start":
+                    continue
+                self.clock.sleep_until_datetime(when)
+                fire = self._handle(job, action, when, self.clock.now())
+                if fire:
+                    fired.append(fire)
+            self.clock.sleep_until_datetime(until)
+        return fired
+
+    def _handle(self, job, action, when, now):
+        # Called with the lock held; returns the payload to emit (or None)
+        lateness = (now - when).total_seconds()
+        LATENESS.observe(lateness)
+
+        if action == "stop":
+            log.info(f"Scheduled stop for {job.profile} (late {lateness:.3f}s)")
+            FIRES.inc()
+            return job.payload("stop", when, lateness)
+
+        # Reschedule first so a skipped run doesn't stall the job
+        job.next_fire = job.trigger.next_after(max(now, when))
+        if job.next_fire is not None:
+            self._push(job.next_fire, "start", job)
+
+        if lateness > MISFIRE_GRACE_S and job.catch_up == "skip":
+            log.warning(f"Missed run of {job.profile} at {when:%H:%M} ({lateness:.0f}s late), skipping")
+            SKIPPED.inc()
+            return None
+
+        stop_at = None
+        if job.duration_s > 0:
+            stop_at = now + datetime.timedelta(seconds=job.duration_s)
+        elif job.stop_time:
+            try:
+                stop_at = next_time_of_day(job.stop_time, now)
+            except ValueError:
+                log.error(f"Invalid stop time for {job.profile}: {job.stop_time}")
+        if stop_at is not None:
+            self._push(stop_at, "stop", job)
+
+        log.info(f"Triggering scheduled job: {job.profile} (late {lateness:.3f}s)")
+        FIRES.inc()
+        return job.payload("start", when, lateness)
@@ -0,0 +1,93 @@
+# core/spatial.py
+# Grid-hash index over click points: each point goes in a square cell keyed
+# by (x // cell, y // cell), so "which point is near here" only looks at the
+# few cells around the query instead of every point.
+from collections import defaultdict
+
+class GridIndex:
+    def __init__(self, cell=32):
+        self.cell = max(1, int(cell))
+        self._cells = defaultdict(list) # (cx, cy) -> [(row, x, y), ...]
+        self.size = 0
+
+    def add(self, row, x, y):
+        c = self.cell
+        self._cells[(x // c, y // c)].append((row, x, y))
+        self.size += 1
+
+    def rebuild(self, xy):
+        # xy: iterable of (x, y); rows are their positions in it
+        self._cells.clear()
+        self.size = 0
+        add = self.add
+        for row, (x, y) in enumerate(xy):
+            add(row, int(x), int(y))
+
+    def _candidates(self, x, y, radius):
+        c = self.cell
+        cells = self._cells
+        reach = -(-int(radius) // c) # cells to look at either side, rounded up
+        cx, cy = x // c, y // c
+        for gx in range(cx - reach, cx + reach + 1):
+            for gy in range(cy - reach, cy + reach + 1):
+                bucket = cells.get((gx, gy))
+                if bucket:
+                    yield from bucket
+
+    def within(self, x, y, radius):
+        # Rows within `radius` px of (x, y), in row order
+        r2 = radius * radius
+        return sorted(row for row, px, py in self._candidates(x, y, radius)
+                      if (px - x) ** 2 + (py - y) ** 2 <= r2)
+
+    def nearest(self, x, y, max_dist):
+        # Closest row within max_dist (lowest row on ties), or None. With
+        # max_dist <= cell this only touches the 3x3 cells around the query.
+        best, best_d2 = None, max_dist * max_dist
+        for row, px, py in self._candidates(x, y, max_dist):
+            d2 = (px - x) ** 2 + (py - y) ** 2
+            if d2 < best_d2 or (d2 == best_d2 and (best is None or row < best)):
+                best, best_d2 = row, d2
+        return best
+
+def close_duplicates(xy, radius):
+    # Rows to drop so no two kept points are within `radius` px; the earliest
+    # point of each cluster is kept (with its label/type/group)
+    if radius <= 0:
+        return []
+    keep = GridIndex(radius)
+    drop = []
+    for row, (x, y) in enumerate(xy):
+        x, y = int(x), int(y)
+        if keep.nearest(x, y, radius) is None:
+            keep.add(row, x, y)
+        else:
+            drop.append(row)
+    return drop
+
+# Rough per-tick costs of the click engine, on the generous side: one
+# SendInput call per flush plus the per-click work of building three inputs,
+# jitter and bookkeeping.
+SEND_COST_S = 0.00005
+CLICK_COST_S = 0.00002
+
+def tick_cost(n_points, mode):
+    sends = n_points if mode == "sequential" else (2 if mode == "grouped" else 1)
+    cost = sends * SEND_COST_S + n_points * CLICK_COST_S
+    if mode == "grouped":
+        cost += 0.001 # the pause between the two halves
+    return cost
+
+def density_warning(n_points, delay_ms, mode, game_safe=False, min_delay_ms=2):
+    # Message when one pass over all points takes longer than the tick it
+    # has to fit in, i.e. the engine would lag and report missed ticks
+    if not n_points:
+        return None
+    delay = max(delay_ms, min_delay_ms) / 1000
+    if game_safe:
+        delay = max(delay, 0.050)
+    cost = tick_cost(n_points, mode)
+    if cost <= delay:
+        return None
+    return (f"{n_points} points need ~{cost * 1000:.1f} ms per pass but the delay is "
+            f"{delay * 1000:.0f} ms; clicks will lag (max ~{int(n_points / cost)} CPS)")
@@ -0,0 +1,103 @@
+import builtins
+import datetime
+import json
+import sys
+import time
+
+# --profile-startup: times every first import (inclusive and self time) plus
+# named init phases, and writes a report once the window is up.
+
+_orig_import = builtins.__import__
+_t0 = None
+_imports = {}  # module -> [cumulative s, self s]
+_stack = []    # child time accumulated by imports in progress
+_phases = []   # (label, seconds since start)
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level == 0 and name in sys.modules:
+        return _orig_import(name, globals, locals, fromlist, level)
+
+    before = len(sys.modules)
+    _stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        return _orig_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        children = _stack.pop()
+        if _stack:
+            _stack[-1] += elapsed
+        # Only imports that actually loaded something are interesting
+        if len(sys.modules) != before:
+            if level:
+                package = (globals or {}).get("__package__") or ""
+                name = f"{package}.{name}" if name else package
+            entry = _imports.setdefault(name, [0.0, 0.0])
+            entry[0] += elapsed
+            entry[1] += elapsed - children
+
+def start(t0=None):
+    global _t0
+    _t0 = t0 if t0 is not None else time.perf_counter()
+    builtins.__import__ = _timed_import
+
+def mark(label):
+    if _t0 is not None:
+        _phases.append((label, time.perf_counter() - _t0))
+
+def finish(extra=None, top=30):
+    # Stops timing and writes logs/startup_profile.{txt,json}; returns the report
+    builtins.__import__ = _orig_import
+    from core.logging_setup import LOG_DIR, get_logger
+    from core.procinfo import rss_bytes
+
+    total = time.perf_counter() - _t0
+    phases = []
+    prev = 0.0
+    for label, at in _phases:
+        phases.append({"phase": label, "at_ms": round(at * 1000, 1), "took_ms": round((at - prev) * 1000, 1)})
+        prev = at
+    imports = sorted(
+        ({"module": m, "cumulative_ms": round(c * 1000, 2), "self_ms": round(s * 1000, 2)}
+         for m, (c, s) in _imports.items()),
+        key=lambda r: r["self_ms"], reverse=True
+    )
+    report = {
+        "time": datetime.datetime.now().isoformat(timespec="seconds"),
+        "time_to_window_ms": round(total * 1000, 1),
+        "rss_mb": round(rss_bytes() / (1024 * 1024), 1),
+        "modules_loaded": len(sys.modules),
+        "import_ms": round(sum(s for _, s in _imports.values()) * 1000, 1),
+        "phases": phases,
+        "imports": imports,
+    }
+    report.update(extra or {})
+
+    LOG_DIR.mkdir(exist_ok=True)
+    with open(LOG_DIR / "startup_profile.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    lines = [
+        f"Time to window: {report['time_to_window_ms']} ms "
+        f"(imports {report['import_ms']} ms, {report['modules_loaded']} modules, RSS {report['rss_mb']} MB)",
+        "",
+        "Phases:",
+    ]
+    lines += [f"  {p['at_ms']:>9.1f} ms  +{p['took_ms']:>8.1f} ms  {p['phase']}" for p in phases]
+    lines += ["", f"Slowest imports (self / cumulative ms, top {top}):"]
+    lines += [f"  {r['self_ms']:>9.2f}  {r['cumulative_ms']:>9.2f}  {r['module']}" for r in imports[:top]]
+    (LOG_DIR / "startup_profile.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    # One line per run so time-to-window can be tracked over time
+    history = LOG_DIR / "startup_history.csv"
+    new = not history.exists()
+    with open(history, "a", encoding="utf-8") as f:
+        if new:
+            f.write("time,time_to_window_ms,import_ms,rss_mb,modules\n")
+        f.write(f"{report['time']},{report['time_to_window_ms']},{report['import_ms']},"
+                f"{report['rss_mb']},{report['modules_loaded']}\n")
+
+    get_logger("startup").info(
+        f"Startup profile: {report['time_to_window_ms']} ms to window, report in {LOG_DIR / 'startup_profile.txt'}"
+    )
+    return report
@@ -1,93 +1,17 @@
-import time
 import threading
-import ctypes
-import platform
 import random
-from ctypes import wintypes
 from PySide6.QtCore import QObject, Signal
 from core.logging_setup import get_logger
+from core.metrics import get_registry
+from core.clock import REAL_CLOCK
 
 log = get_logger("engine")
 
-IS_WINDOWS = platform.system() == "Windows"
-
-if IS_WINDOWS:
-    user32 = ctypes.WinDLL("user32", use_last_error=True)
-
-    ULONG_PTR = ctypes.c_ulonglong if ctypes.sizeof(ctypes.c_void_p) == 8 else ctypes.c_ulong
-
-    INPUT_MOUSE = 0
-    MOUSEEVENTF_LEFTDOWN = 0x0002
-    MOUSEEVENTF_LEFTUP = 0x0004
-    MOUSEEVENTF_RIGHTDOWN = 0x0008
-    MOUSEEVENTF_RIGHTUP = 0x0010
-    MOUSEEVENTF_ABSOLUTE = 0x8000
-    MOUSEEVENTF_MOVE = 0x0001
-
-    SM_XVIRTUALSCREEN = 76
-    SM_YVIRTUALSCREEN = 77
-    SM_CXVIRTUALSCREEN = 78
-    SM_CYVIRTUALSCREEN = 79
-
-    VX = user32.GetSystemMetrics(SM_XVIRTUALSCREEN)
-    VY = user32.GetSystemMetrics(SM_YVIRTUALSCREEN)
-    VW = user32.GetSystemMetrics(SM_CXVIRTUALSCREEN)
-    VH = user32.GetSystemMetrics(SM_CYVIRTUALSCREEN)
-
-    class MOUSEINPUT(ctypes.Structure):
-        _fields_ = [
-            ("dx", wintypes.LONG),
-            ("dy", wintypes.LONG),
-            ("mouseData", wintypes.DWORD),
-            ("dwFlags", wintypes.DWORD),
-            ("time", wintypes.DWORD),
-            ("dwExtraInfo", ULONG_PTR),
-        ]
-
-    class INPUT(ctypes.Structure):
-        _fields_ = [("type", wintypes.DWORD), ("mi", MOUSEINPUT)]
-
-    # Pre-create inputs to avoid ctypes overhead in loop
-    _INPUT_MOUSE_MOVE = INPUT(INPUT_MOUSE, MOUSEINPUT(0, 0, 0, MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE, 0, 0))
-    _INPUT_LEFT_DOWN = INPUT(INPUT_MOUSE, MOUSEINPUT(0, 0, 0, MOUSEEVENTF_LEFTDOWN, 0, 0))
-    _INPUT_LEFT_UP = INPUT(INPUT_MOUSE, MOUSEINPUT(0, 0, 0, MOUSEEVENTF_LEFTUP, 0, 0))
-    _INPUT_RIGHT_DOWN = INPUT(INPUT_MOUSE, MOUSEINPUT(0, 0, 0, MOUSEEVENTF_RIGHTDOWN, 0, 0))
-    _INPUT_RIGHT_UP = INPUT(INPUT_MOUSE, MOUSEINPUT(0, 0, 0, MOUSEEVENTF_RIGHTUP, 0, 0))
-
-    def get_click_inputs(x, y, click_type):
-        x = max(VX, min(x, VX + VW - 1))
-        y = max(VY, min(y, VY + VH - 1))
-
-        abs_x = int((x - VX) * 65535 / VW)
-        abs_y = int((y - VY) * 65535 / VH)
-
-        # Update move input
-        move = INPUT(INPUT_MOUSE, MOUSEINPUT(abs_x, abs_y, 0, MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE, 0, 0))
-
-        if click_type == "left":
-            return [move, _INPUT_LEFT_DOWN, _INPUT_LEFT_UP]
-        else:
-            return [move, _INPUT_RIGHT_DOWN, _INPUT_RIGHT_UP]
-
-    def send_inputs(inputs_list):
-        n = len(inputs_list)
-        if n == 0: return
-        arr = (INPUT * n)(*inputs_list)
-        try:
-            if user32.SendInput(n, ctypes.byref(arr), ctypes.sizeof(INPUT)) == 0:
-                # Log but don't crash thread?
-                # raise ctypes.WinError(ctypes.get_last_error())
-                log.error(f"SendInput failed: {ctypes.WinError(ctypes.get_last_error())}")
-        except OSError as e:
-            log.error(f"SendInput OS error: {e}")
-
-else:
-    def get_click_inputs(x, y, click_type):
-        # Return dummy inputs to simulate 3 events per click (move, down, up)
-        return [1, 2, 3]
-
-    def send_inputs(inputs_list):
-        pass
+_metrics = get_registry()
+CLICKS = _metrics.counter("autoclicker_clicks_total", "Clicks injected by the click engine")
+CPS = _metrics.gauge("autoclicker_cps", "Clicks per second achieved over the last second")
+TICK_ERROR = _metrics.histogram("autoclicker_tick_error_seconds", "How late each click tick fired vs its deadline")
+MISSED = _metrics.counter("autoclicker_missed_deadlines_total", "Ticks that started after their deadline had passed")
 
 class ClickEngine(QObject):
     started = Signal()
@@ -95,14 +19,27 @@ class ClickEngine(QObject):
     error = Signal(str)
     cps_updated = Signal(int)
 
-    def __init__(self):
+    def __init__(self, clock=None, backend=None, rng=None):
         super().__init__()
+        # Injectable for dry runs (engine.simulator): a SimulatedClock, a
+        # recording backend instead of real input and a seeded random.Random
+        self.clock = clock or REAL_CLOCK
+        self.backend = backend
+        self.rng = rng or random
         self.running = False
         self._stop = threading.Event()
+        self._paused = False
+        self.total_clicks = 0
+        # Optional engine.trace.TraceWriter; every injected click is recorded
+        self.trace = None
+        # Optional engine.click_feed.ClickFeed for the live heatmap; may be
+        # swapped while running
+        self.feed = None
         self._thread = None
         self._lock = threading.Lock()
 
-    def start(self, cfg):
+    def start(self, cfg, block=False):
+        # block=True runs the loop on the calling thread (simulator)
         with self._lock:
             if self.running:
                 log.debug("Start ignored: already running")
@@ -112,17 +49,24 @@ class ClickEngine(QObject):
                 return
 
             self.running = True
+            self._paused = False
+            self.total_clicks = 0
             self._stop.clear()
 
-            self._thread = threading.Thread(
-                target=self._loop,
-                args=(cfg,),
-                daemon=True,
-                name="ClickEngineThread"
-            )
-            log.info("Engine thread starting")
-            self._thread.start()
-            self.started.emit()
+            if block:
+                self._thread = None
+            else:
+                self._thread = threading.Thread(
+                    target=self._loop,
+                    args=(cfg,),
+                    daemon=True,
+                    name="ClickEngineThread"
+                )
+                log.info("Engine thread starting")
+                self._thread.start()
+        self.started.emit()
+        if block:
+            self._loop(cfg)
 
     def stop(self):
         with self._lock:
@@ -138,8 +82,24 @@ class ClickEngine(QObject):
 
         self.stopped.emit()
 
+    def toggle_pause(self):
+        if not self.running:
+            return
+        self._paused = not self._paused
+        log.info("Engine paused" if self._paused else "Engine resumed")
+
     def _loop(self, cfg):
         try:
+            if self.backend is not None:
+                get_click_inputs = self.backend.get_click_inputs
+                send_inputs = self.backend.send_inputs
+            else:
+                # Input backend (ctypes/pynput) loads on the first run, not at startup
+                from engine.input_backend import get_click_inputs, send_inputs
+            clock = self.clock
+            perf = clock.perf
+            rng = self.rng
+
             points = cfg["points"]
             mode = cfg["click_mode"]
             click_type = cfg["click_type"]
@@ -173,15 +133,28 @@ class ClickEngine(QObject):
             burst_interval = burst.get("interval_ms", 500) / 1000.0
             burst_counter = 0
 
-            next_tick = time.perf_counter()
+            next_tick = perf()
             clicks_this_sec = 0
-            last_cps_time = time.perf_counter()
+            last_cps_time = perf()
+
+            trace = self.trace
+            if trace:
+                from engine.trace import BUTTONS, SOURCE_ENGINE
+            tick = 0
+            traced = []
 
             while not self._stop.is_set():
-                now = time.perf_counter()
+                if self._paused:
+                    clock.sleep(0.01)
+                    # Don't catch up on the clicks skipped while paused
+                    next_tick = perf()
+                    continue
+
+                now = perf()
 
                 # CPS
                 if now - last_cps_time >= 1.0:
+                    CPS.set(clicks_this_sec)
                     self.cps_updated.emit(clicks_this_sec)
                     clicks_this_sec = 0
                     last_cps_time = now
@@ -189,34 +162,50 @@ class ClickEngine(QObject):
                 # Jitter Delay
                 current_delay = base_delay
                 if jitter_pct > 0:
-                    current_delay += base_delay * random.uniform(-jitter_pct, jitter_pct)
+                    current_delay += base_delay * rng.uniform(-jitter_pct, jitter_pct)
 
+                deadline = next_tick
+                tick += 1
+                feed = self.feed
                 next_tick += max(current_delay, 0.001)
 
                 def get_jp(p):
                     jx, jy = 0, 0
                     if jitter_px > 0:
-                        jx = random.randint(-jitter_px, jitter_px)
-                        jy = random.randint(-jitter_px, jitter_px)
+                        jx = rng.randint(-jitter_px, jitter_px)
+                        jy = rng.randint(-jitter_px, jitter_px)
                     return (int(p.get("x",0)) + jx, int(p.get("y",0)) + jy)
 
                 input_buffer = []
 
+                def queue_click(x, y, ctype):
+                    input_buffer.extend(get_click_inputs(x, y, ctype))
+                    if feed:
+                        feed.push(x, y)
+                    if trace:
+                        traced.append((x, y, ctype))
+
                 def flush_buffer():
                     nonlocal input_buffer, clicks_this_sec, total_clicks, burst_counter
                     if input_buffer:
                         count = len(input_buffer) // 3 # 3 inputs per click
                         send_inputs(input_buffer)
+                        if trace:
+                            sent = perf()
+                            for x, y, ctype in traced:
+                                trace.record(sent, deadline, x, y, BUTTONS.get(ctype, 0), SOURCE_ENGINE, 0, tick & 0xFFFFFFFF)
+                            traced.clear()
                         clicks_this_sec += count
                         total_clicks += count
+                        self.total_clicks = total_clicks
+                        CLICKS.inc(count)
                         burst_counter += count
                         input_buffer = []
 
                 if mode == "simultaneous":
                     for p in points:
                         jx, jy = get_jp(p)
-                        ctype = p.get("type", click_type)
-                        input_buffer.extend(get_click_inputs(jx, jy, ctype))
+                        queue_click(jx, jy, p.get("type", click_type))
 
                     flush_buffer()
 
@@ -224,8 +213,7 @@ class ClickEngine(QObject):
                     for p in points:
                         if self._stop.is_set(): return
                         jx, jy = get_jp(p)
-                        ctype = p.get("type", click_type)
-                        input_buffer.extend(get_click_inputs(jx, jy, ctype))
+                        queue_click(jx, jy, p.get("type", click_type))
 
                         # Flush immediately for sequential unless batching > 1
                         # If batching > 1, we might group sequential clicks?
@@ -240,37 +228,37 @@ class ClickEngine(QObject):
                     for group in groups:
                         for p in group:
                             jx, jy = get_jp(p)
-                            input_buffer.extend(get_click_inputs(jx, jy, p.get("type", click_type)))
+                            queue_click(jx, jy, p.get("type", click_type))
                         flush_buffer()
-                        time.sleep(0.001)
+                        clock.sleep(0.001)
 
                 # Check limits
                 if limit_enabled and total_clicks >= limit_count:
-                    log.info(f"Click limit reached: {total_clicks}")
+                    log.info("Click limit reached: %d", total_clicks)
                     return
 
                 # Check burst
                 if burst_enabled and burst_counter >= burst_size:
                     burst_counter = 0
-                    end_wait = time.perf_counter() + burst_interval
-                    while time.perf_counter() < end_wait:
+                    end_wait = perf() + burst_interval
+                    while perf() < end_wait:
                         if self._stop.is_set(): return
-                        time.sleep(0.001)
+                        clock.sleep(0.001)
                     # Reset timing to avoid catch-up speed burst
-                    next_tick = time.perf_counter()
+                    next_tick = perf()
 
                 # Wait for next tick
-                now = time.perf_counter()
+                now = perf()
                 wait = next_tick - now
                 if wait > 0:
-                    if wait > 0.002:
-                        time.sleep(wait - 0.0015)
-                    # Busy wait
-                    while time.perf_counter() < next_tick:
-                        if self._stop.is_set(): return
+                    # Sleep, then busy wait the last stretch
+                    if not clock.sleep_until(next_tick, self._stop.is_set): return
+                    TICK_ERROR.observe(perf() - next_tick)
                 else:
                     # Lagging
-                    next_tick = time.perf_counter()
+                    MISSED.inc()
+                    TICK_ERROR.observe(-wait)
+                    next_tick = perf()
 
         except Exception as e:
             log.critical("Engine crashed", exc_info=True)
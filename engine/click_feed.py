@@ -0,0 +1,37 @@
+from array import array
+
+class ClickFeed:
+    # Single-producer/single-consumer ring of click positions. The engine
+    # thread pushes, the GUI drains on its own timer; no locks, the writer only
+    # ever moves `head` forward after the slot is written. A reader that falls
+    # more than `capacity` behind skips to the newest entries.
+    def __init__(self, capacity=8192):
+        size = 1
+        while size < capacity:
+            size <<= 1
+        self.capacity = size
+        self._mask = size - 1
+        self._xy = array("i", bytes(8 * size))
+        self.head = 0
+        self.dropped = 0
+
+    def push(self, x, y):
+        i = self.head
+        j = (i & self._mask) << 1
+        self._xy[j] = x
+        self._xy[j + 1] = y
+        self.head = i + 1
+
+    def drain(self, since):
+        # Returns ([(x, y), ...], new cursor) for everything pushed after `since`
+        head = self.head
+        if head - since > self.capacity:
+            self.dropped += head - since - self.capacity
+            since = head - self.capacity
+        xy = self._xy
+        mask = self._mask
+        out = []
+        for i in range(since, head):
+            j = (i & mask) << 1
+            out.append((xy[j], xy[j + 1]))
+        return out, head
@@ -0,0 +1,338 @@
+# engine/input_backend.py
+# Shared injection backend for the click engine and the macro player.
+# Inputs are built once (get_*_input helpers), optionally packed into a
+# native batch with prepare_inputs, and injected with a single OS call.
+import ctypes
+import os
+import platform
+import threading
+from core.logging_setup import get_logger
+from core.metrics import get_registry
+
+log = get_logger("input_backend")
+
+SEND_FAILURES = get_registry().counter("autoclicker_send_failures_total", "Injection calls the OS rejected")
+# The click engine and the macro player both send; failures are the slow
+# path, so one lock is simpler than a series per thread
+_failures_lock = threading.Lock()
+
+def _count_failure():
+    with _failures_lock:
+        SEND_FAILURES.inc()
+        return SEND_FAILURES.value
+
+IS_WINDOWS = platform.system() == "Windows"
+
+if IS_WINDOWS:
+    from ctypes import wintypes
+
+    user32 = ctypes.WinDLL("user32", use_last_error=True)
+    user32.VkKeyScanW.restype = ctypes.c_short
+
+    ULONG_PTR = ctypes.c_ulonglong if ctypes.sizeof(ctypes.c_void_p) == 8 else ctypes.c_ulong
+
+    INPUT_MOUSE = 0
+    INPUT_KEYBOARD = 1
+
+    MOUSEEVENTF_MOVE = 0x0001
+    MOUSEEVENTF_LEFTDOWN = 0x0002
+    MOUSEEVENTF_LEFTUP = 0x0004
+    MOUSEEVENTF_RIGHTDOWN = 0x0008
+    MOUSEEVENTF_RIGHTUP = 0x0010
+    MOUSEEVENTF_MIDDLEDOWN = 0x0020
+    MOUSEEVENTF_MIDDLEUP = 0x0040
+    MOUSEEVENTF_XDOWN = 0x0080
+    MOUSEEVENTF_XUP = 0x0100
+    MOUSEEVENTF_WHEEL = 0x0800
+    MOUSEEVENTF_HWHEEL = 0x1000
+    MOUSEEVENTF_VIRTUALDESK = 0x4000
+    MOUSEEVENTF_ABSOLUTE = 0x8000
+
+    KEYEVENTF_EXTENDEDKEY = 0x0001
+    KEYEVENTF_KEYUP = 0x0002
+    KEYEVENTF_UNICODE = 0x0004
+
+    WHEEL_DELTA = 120
+
+    SM_XVIRTUALSCREEN = 76
+    SM_YVIRTUALSCREEN = 77
+    SM_CXVIRTUALSCREEN = 78
+    SM_CYVIRTUALSCREEN = 79
+
+    VX = user32.GetSystemMetrics(SM_XVIRTUALSCREEN)
+    VY = user32.GetSystemMetrics(SM_YVIRTUALSCREEN)
+    VW = user32.GetSystemMetrics(SM_CXVIRTUALSCREEN)
+    VH = user32.GetSystemMetrics(SM_CYVIRTUALSCREEN)
+
+    class MOUSEINPUT(ctypes.Structure):
+        _fields_ = [
+            ("dx", wintypes.LONG),
+            ("dy", wintypes.LONG),
+            ("mouseData", wintypes.DWORD),
+            ("dwFlags", wintypes.DWORD),
+            ("time", wintypes.DWORD),
+            ("dwExtraInfo", ULONG_PTR),
+        ]
+
+    class KEYBDINPUT(ctypes.Structure):
+        _fields_ = [
+            ("wVk", wintypes.WORD),
+            ("wScan", wintypes.WORD),
+            ("dwFlags", wintypes.DWORD),
+            ("time", wintypes.DWORD),
+            ("dwExtraInfo", ULONG_PTR),
+        ]
+
+    class HARDWAREINPUT(ctypes.Structure):
+        _fields_ = [
+            ("uMsg", wintypes.DWORD),
+            ("wParamL", wintypes.WORD),
+            ("wParamH", wintypes.WORD),
+        ]
+
+    class _INPUTUNION(ctypes.Union):
+        _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT), ("hi", HARDWAREINPUT)]
+
+    class INPUT(ctypes.Structure):
+        _anonymous_ = ("u",)
+        _fields_ = [("type", wintypes.DWORD), ("u", _INPUTUNION)]
+
+    INPUT_SIZE = ctypes.sizeof(INPUT)
+
+    def _mouse(dx, dy, data, flags):
+        return INPUT(INPUT_MOUSE, _INPUTUNION(mi=MOUSEINPUT(dx, dy, data & 0xFFFFFFFF, flags, 0, 0)))
+
+    # Pre-create inputs to avoid ctypes overhead in loop
+    _BUTTON_INPUTS = {
+        ("left", True): _mouse(0, 0, 0, MOUSEEVENTF_LEFTDOWN),
+        ("left", False): _mouse(0, 0, 0, MOUSEEVENTF_LEFTUP),
+        ("right", True): _mouse(0, 0, 0, MOUSEEVENTF_RIGHTDOWN),
+        ("right", False): _mouse(0, 0, 0, MOUSEEVENTF_RIGHTUP),
+        ("middle", True): _mouse(0, 0, 0, MOUSEEVENTF_MIDDLEDOWN),
+        ("middle", False): _mouse(0, 0, 0, MOUSEEVENTF_MIDDLEUP),
+        ("x1", True): _mouse(0, 0, 1, MOUSEEVENTF_XDOWN),
+        ("x1", False): _mouse(0, 0, 1, MOUSEEVENTF_XUP),
+        ("x2", True): _mouse(0, 0, 2, MOUSEEVENTF_XDOWN),
+        ("x2", False): _mouse(0, 0, 2, MOUSEEVENTF_XUP),
+    }
+
+    # pynput Key names -> virtual-key codes
+    VK_MAP = {
+        "alt": 0x12, "alt_l": 0xA4, "alt_r": 0xA5, "alt_gr": 0xA5,
+        "backspace": 0x08, "caps_lock": 0x14,
+        "cmd": 0x5B, "cmd_l": 0x5B, "cmd_r": 0x5C,
+        "ctrl": 0x11, "ctrl_l": 0xA2, "ctrl_r": 0xA3,
+        "delete": 0x2E, "down": 0x28, "end": 0x23, "enter": 0x0D, "esc": 0x1B,
+        "home": 0x24, "insert": 0x2D, "left": 0x25, "menu": 0x5D,
+        "num_lock": 0x90, "page_down": 0x22, "page_up": 0x21, "pause": 0x13,
+        "print_screen": 0x2C, "right": 0x27, "scroll_lock": 0x91,
+        "shift": 0x10, "shift_l": 0xA0, "shift_r": 0xA1,
+        "space": 0x20, "tab": 0x09, "up": 0x26,
+        "media_play_pause": 0xB3, "media_volume_mute": 0xAD,
+        "media_volume_down": 0xAE, "media_volume_up": 0xAF,
+        "media_previous": 0xB1, "media_next": 0xB0,
+    }
+    VK_MAP.update({f"f{i}": 0x6F + i for i in range(1, 25)})
+
+    _EXTENDED_VKS = {
+        0xA3, 0xA5, 0x2D, 0x2E, 0x24, 0x23, 0x21, 0x22,
+        0x25, 0x26, 0x27, 0x28, 0x90, 0x2C, 0x5B, 0x5C, 0x5D,
+    }
+
+    _KEY_CACHE = {}
+
+    def get_screen_rect():
+        return VX, VY, VW, VH
+
+    def _abs_move(x, y):
+        x = max(VX, min(x, VX + VW - 1))
+        y = max(VY, min(y, VY + VH - 1))
+
+        abs_x = int((x - VX) * 65535 / VW)
+        abs_y = int((y - VY) * 65535 / VH)
+        return _mouse(abs_x, abs_y, 0, MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE | MOUSEEVENTF_VIRTUALDESK)
+
+    def get_move_input(x, y):
+        return _abs_move(x, y)
+
+    def get_button_input(button, pressed):
+        return _BUTTON_INPUTS.get((button, pressed)) or _BUTTON_INPUTS[("left", pressed)]
+
+    def get_scroll_inputs(dx, dy):
+        inputs = []
+        if dy:
+            inputs.append(_mouse(0, 0, int(dy * WHEEL_DELTA), MOUSEEVENTF_WHEEL))
+        if dx:
+            inputs.append(_mouse(0, 0, int(dx * WHEEL_DELTA), MOUSEEVENTF_HWHEEL))
+        return inputs
+
+    def _vk_for(key):
+        if key.startswith("Key."):
+            return VK_MAP.get(key[4:])
+        if key.startswith("<") and key.endswith(">"):
+            try: return int(key[1:-1])
+            except ValueError: return None
+        if len(key) == 1:
+            res = user32.VkKeyScanW(ord(key))
+            if res == -1:
+                return None
+            return res & 0xFF
+        return None
+
+    def get_key_input(key, pressed):
+        cache_key = (key, pressed)
+        inp = _KEY_CACHE.get(cache_key)
+        if inp is not None:
+            return inp
+
+        flags = 0 if pressed else KEYEVENTF_KEYUP
+        vk = _vk_for(key)
+        if vk is not None:
+            scan = user32.MapVirtualKeyW(vk, 0)
+            if vk in _EXTENDED_VKS:
+                flags |= KEYEVENTF_EXTENDEDKEY
+            inp = INPUT(INPUT_KEYBOARD, _INPUTUNION(ki=KEYBDINPUT(vk, scan, flags, 0, 0)))
+        elif len(key) == 1:
+            # Not on the current layout, type it as unicode
+            inp = INPUT(INPUT_KEYBOARD, _INPUTUNION(ki=KEYBDINPUT(0, ord(key), flags | KEYEVENTF_UNICODE, 0, 0)))
+        else:
+            log.warning("Unknown key for injection: %s", key)
+            return None
+
+        _KEY_CACHE[cache_key] = inp
+        return inp
+
+    def get_noop_input():
+        # Relative zero move: a real injection with no visible effect, used to
+        # measure SendInput cost
+        return _mouse(0, 0, 0, MOUSEEVENTF_MOVE)
+
+    def get_click_inputs(x, y, click_type):
+        if click_type == "left":
+            return [_abs_move(x, y), _BUTTON_INPUTS[("left", True)], _BUTTON_INPUTS[("left", False)]]
+        else:
+            return [_abs_move(x, y), _BUTTON_INPUTS[("right", True)], _BUTTON_INPUTS[("right", False)]]
+
+    def _send_failed(err):
+        # A blocked SendInput (UIPI, secure desktop) fails on every tick; log the
+        # first failure and then only every 1000th instead of flooding the log
+        count = _count_failure()
+        if count == 1 or count % 1000 == 0:
+            log.error("SendInput failed (%d so far): %s", count, ctypes.WinError(err))
+
+    def _send(arr, n):
+        try:
+            if user32.SendInput(n, ctypes.byref(arr), INPUT_SIZE) == 0:
+                # Log but don't crash thread
+                _send_failed(ctypes.get_last_error())
+        except OSError as e:
+            _count_failure()
+            log.error("SendInput OS error: %s", e)
+
+    def prepare_inputs(inputs_list):
+        n = len(inputs_list)
+        return (INPUT * n)(*inputs_list), n
+
+    def send_prepared(prepared):
+        arr, n = prepared
+        if n:
+            _send(arr, n)
+
+    def send_inputs(inputs_list):
+        n = len(inputs_list)
+        if n == 0: return
+        _send((INPUT * n)(*inputs_list), n)
+
+else:
+    # Fallback: inputs are small op tuples replayed through pynput. The click
+    # engine stays a no-op here as it always was (only macro playback used
+    # pynput) unless AUTOCLICKER_PYNPUT_CLICKS=1 opts in to real clicks.
+    PYNPUT_CLICKS = os.environ.get("AUTOCLICKER_PYNPUT_CLICKS") == "1"
+    _NOOP = ("noop",)
+    _NOOP_CLICK = [_NOOP] * 3 # still 3 inputs per click for the engine's counts
+    _controllers = None
+
+    def _get_controllers():
+        global _controllers
+        if _controllers is None:
+            from pynput import mouse, keyboard
+            _controllers = (mouse, keyboard, mouse.Controller(), keyboard.Controller())
+        return _controllers
+
+    def get_screen_rect():
+        return 0, 0, 1920, 1080
+
+    def get_move_input(x, y):
+        return ("move", int(x), int(y))
+
+    def get_button_input(button, pressed):
+        return ("press" if pressed else "release", button)
+
+    def get_scroll_inputs(dx, dy):
+        return [("scroll", dx, dy)] if dx or dy else []
+
+    def get_key_input(key, pressed):
+        return ("key_down" if pressed else "key_up", key)
+
+    def get_noop_input():
+        return None
+
+    def get_click_inputs(x, y, click_type):
+        if not PYNPUT_CLICKS:
+            return _NOOP_CLICK
+        button = "left" if click_type == "left" else "right"
+        return [("move", int(x), int(y)), ("press", button), ("release", button)]
+
+    def _parse_key(keyboard, k_str):
+        if len(k_str) == 1:
+            return k_str
+        # Key.space -> keyboard.Key.space
+        if k_str.startswith("Key."):
+            return getattr(keyboard.Key, k_str[4:], k_str)
+        if k_str.startswith("<") and k_str.endswith(">"):
+            return keyboard.KeyCode.from_vk(int(k_str[1:-1]))
+        return k_str
+
+    def send_inputs(inputs_list):
+        if not inputs_list or inputs_list[0] is _NOOP: return
+        mouse, keyboard, mouse_ctl, key_ctl = _get_controllers()
+        for op in inputs_list:
+            kind = op[0]
+            try:
+                if kind == "move":
+                    mouse_ctl.position = (op[1], op[2])
+                elif kind == "press":
+                    mouse_ctl.press(getattr(mouse.Button, op[1], mouse.Button.left))
+                elif kind == "release":
+                    mouse_ctl.release(getattr(mouse.Button, op[1], mouse.Button.left))
+                elif kind == "scroll":
+                    mouse_ctl.scroll(op[1], op[2])
+                elif kind == "key_down":
+                    key_ctl.press(_parse_key(keyboard, op[1]))
+                elif kind == "key_up":
+                    key_ctl.release(_parse_key(keyboard, op[1]))
+            except Exception as e:
+                _count_failure()
+                log.error("Input injection error: %s", e)
+
+    def prepare_inputs(inputs_list):
+        return tuple(inputs_list)
+
+    def send_prepared(prepared):
+        send_inputs(prepared)
+
+def button_name(button):
+    # "Button.left" (as recorded by pynput) -> "left"
+    return button.split('.')[-1]
+
+def key_code(key):
+    # Recorded key string -> numeric code for traces: the vk on Windows,
+    # otherwise "<vk>" or the character's code point; -1 if unknown
+    if IS_WINDOWS:
+        vk = _vk_for(key)
+        if vk is not None:
+            return vk
+    if key.startswith("<") and key.endswith(">"):
+        try: return int(key[1:-1])
+        except ValueError: return -1
+    return ord(key) if len(key) == 1 else -1
@@ -1,32 +1,24 @@
 import time
+import heapq
+import itertools
+import random
 import threading
-import json
-import ctypes
-import platform
-from pynput import mouse, keyboard
 from PySide6.QtCore import QObject, Signal
 from core.logging_setup import get_logger
+from core.input_hub import get_hub
+from core.metrics import get_registry
+from core.clock import REAL_CLOCK
+from engine import input_backend as backend
+from engine.input_backend import get_screen_rect
 
 log = get_logger("macro_engine")
 
-def get_screen_rect():
-    if platform.system() == "Windows":
-        try:
-            user32 = ctypes.WinDLL("user32", use_last_error=True)
-            SM_XVIRTUALSCREEN = 76
-            SM_YVIRTUALSCREEN = 77
-            SM_CXVIRTUALSCREEN = 78
-            SM_CYVIRTUALSCREEN = 79
-            return (
-                user32.GetSystemMetrics(SM_XVIRTUALSCREEN),
-                user32.GetSystemMetrics(SM_YVIRTUALSCREEN),
-                user32.GetSystemMetrics(SM_CXVIRTUALSCREEN),
-                user32.GetSystemMetrics(SM_CYVIRTUALSCREEN)
-            )
-        except:
-            return 0, 0, 1920, 1080
-    else:
-        return 0, 0, 1920, 1080
+# Events closer together than this are injected as one SendInput batch
+GROUP_WINDOW_S = 0.0005
+
+_metrics = get_registry()
+BATCHES = _metrics.counter("autoclicker_macro_batches_total", "Macro input batches injected")
+DRIFT = _metrics.histogram("autoclicker_macro_drift_seconds", "|delivered - recorded| time of each macro batch")
 
 class MacroRecorder(QObject):
     finished = Signal(list)
@@ -36,8 +28,7 @@ class MacroRecorder(QObject):
         self.events = []
         self.start_time = 0
         self.running = False
-        self._m_listener = None
-        self._k_listener = None
+        self._tokens = []
         self.rect = (0, 0, 1920, 1080)
 
     def start(self):
@@ -46,28 +37,24 @@ class MacroRecorder(QObject):
         self.running = True
         self.rect = get_screen_rect()
 
-        self._m_listener = mouse.Listener(
-            on_click=self._on_click,
-            on_scroll=self._on_scroll)
-        self._k_listener = keyboard.Listener(
-            on_press=self._on_press,
-            on_release=self._on_release)
-
-        self._m_listener.start()
-        self._k_listener.start()
+        hub = get_hub()
+        self._tokens = [
+            hub.subscribe("mouse_click", self._on_click),
+            hub.subscribe("mouse_scroll", self._on_scroll),
+            hub.subscribe("key_press", self._on_press),
+            hub.subscribe("key_release", self._on_release),
+        ]
         log.info("Macro recording started")
 
     def stop(self):
         if not self.running: return
         self.running = False
-        if self._m_listener:
-            self._m_listener.stop()
-            self._m_listener = None
-        if self._k_listener:
-            self._k_listener.stop()
-            self._k_listener = None
-
-        log.info(f"Macro recording stopped. {len(self.events)} events.")
+        hub = get_hub()
+        for token in self._tokens:
+            hub.unsubscribe(token)
+        self._tokens = []
+
+        log.info("Macro recording stopped. %d events.", len(self.events))
         self.finished.emit(self.events)
 
     def _record(self, type_, data):
@@ -97,80 +84,389 @@ class MacroRecorder(QObject):
         except: k = str(key)
         self._record("key_release", {"key": k})
 
+def _event_inputs(event, rect, backend=backend):
+    t = event["type"]
+    d = event["data"]
+    vx, vy, vw, vh = rect
+
+    if t == "mouse_click":
+        abs_x = int(vx + d["x"] * vw)
+        abs_y = int(vy + d["y"] * vh)
+        return [
+            backend.get_move_input(abs_x, abs_y),
+            backend.get_button_input(backend.button_name(d["button"]), d["pressed"])
+        ]
+
+    elif t == "mouse_scroll":
+        abs_x = int(vx + d["x"] * vw)
+        abs_y = int(vy + d["y"] * vh)
+        return [backend.get_move_input(abs_x, abs_y)] + backend.get_scroll_inputs(d["dx"], d["dy"])
+
+    elif t in ("key_press", "key_release"):
+        if not d.get("key"):
+            return []
+        inp = backend.get_key_input(d["key"], t == "key_press")
+        return [inp] if inp is not None else []
+
+    return []
+
+def _event_kind(event):
+    return "key" if event["type"].startswith("key_") else "mouse"
+
+def _event_mark(event, rect, backend=backend):
+    # (x, y, button code) recorded in traces for this event: screen position
+    # and button for mouse events, key code in x for keys
+    from engine.trace import BUTTONS, SCROLL, KEY_DOWN, KEY_UP
+    t = event["type"]
+    d = event["data"]
+    if t in ("key_press", "key_release"):
+        return (backend.key_code(d["key"]), -1, KEY_DOWN if t == "key_press" else KEY_UP)
+    vx, vy, vw, vh = rect
+    x, y = int(vx + d["x"] * vw), int(vy + d["y"] * vh)
+    if t == "mouse_scroll":
+        return (x, y, SCROLL)
+    return (x, y, BUTTONS.get(backend.button_name(d["button"]), 0))
+
+def compile_macro(events, rect=None, group_window=GROUP_WINDOW_S, backend=backend):
+    # Turn recorded events into [(t, prepared_batch, kind, marks)] so playback
+    # does one OS call per batch and no per-event parsing. marks holds one
+    # _event_mark per event for traces.
+    rect = rect or backend.get_screen_rect()
+    batches = []
+    batch_t = None
+    batch_kind = None
+    batch_inputs = []
+    batch_marks = []
+
+    for event in events:
+        inputs = _event_inputs(event, rect, backend)
+        if not inputs:
+            continue
+        kind = _event_kind(event)
+        mark = _event_mark(event, rect, backend)
+        if batch_t is not None and event["t"] - batch_t <= group_window:
+            batch_inputs.extend(inputs)
+            batch_marks.append(mark)
+            if kind != batch_kind:
+                batch_kind = "mixed"
+            continue
+        if batch_inputs:
+            batches.append((batch_t, backend.prepare_inputs(batch_inputs), batch_kind, tuple(batch_marks)))
+        batch_t = event["t"]
+        batch_kind = kind
+        batch_inputs = list(inputs)
+        batch_marks = [mark]
+
+    if batch_inputs:
+        batches.append((batch_t, backend.prepare_inputs(batch_inputs), batch_kind, tuple(batch_marks)))
+    return batches
+
+class LatencyEstimator:
+    # Running estimate of how long an injection takes per batch kind, plus how
+    # late the player thread wakes; playback fires early by the sum.
+    ALPHA = 0.1
+    CALIBRATION_SAMPLES = 20
+
+    def __init__(self):
+        self.cost = {}
+        self.lateness = 0.0
+        self.calibrated = False
+
+    def calibrate(self):
+        self.calibrated = True
+        noop = backend.get_noop_input()
+        if noop is None:
+            return
+        prepared = backend.prepare_inputs([noop])
+        samples = []
+        for _ in range(self.CALIBRATION_SAMPLES):
+            t0 = time.perf_counter()
+            backend.send_prepared(prepared)
+            samples.append(time.perf_counter() - t0)
+        samples.sort()
+        median = samples[len(samples) // 2]
+        for kind in ("mouse", "key", "mixed"):
+            self.cost.setdefault(kind, median)
+        log.info("Injection latency calibrated: %.0f us", median * 1e6)
+
+    def lead(self, kind):
+        return self.cost.get(kind, 0.0) + self.lateness
+
+    def observe(self, kind, cost, late):
+        prev = self.cost.get(kind)
+        self.cost[kind] = cost if prev is None else prev + self.ALPHA * (cost - prev)
+        self.lateness += self.ALPHA * (late - self.lateness)
+
+class FidelityTracker:
+    # Recorded vs delivered timing for one playback session
+    MAX_SAMPLES = 100_000
+
+    def __init__(self):
+        self.errors = []
+        self.count = 0
+        self.total = 0.0
+        self.max_abs = 0.0
+
+    def add(self, error):
+        self.count += 1
+        self.total += error
+        if abs(error) > self.max_abs:
+            self.max_abs = abs(error)
+        if len(self.errors) < self.MAX_SAMPLES:
+            self.errors.append(error)
+
+    def report(self):
+        if not self.count:
+            return {"batches": 0}
+        abs_sorted = sorted(abs(e) for e in self.errors)
+        return {
+            "batches": self.count,
+            "mean_error_ms": self.total / self.count * 1000,
+            "mean_abs_error_ms": sum(abs_sorted) / len(abs_sorted) * 1000,
+            "p95_abs_error_ms": abs_sorted[min(len(abs_sorted) - 1, int(len(abs_sorted) * 0.95))] * 1000,
+            "max_abs_error_ms": self.max_abs * 1000,
+        }
+
+class PlaybackTrack:
+    # One compiled macro being played: owns its repeat state and the mapping
+    # from macro time to wall time, so speed can change mid-playback.
+    def __init__(self, batches, speed=1.0, repeat=1, gap_ms=0, gap_jitter_ms=0, rng=None):
+        self.batches = batches
+        self.rng = rng or random
+        self.length = batches[-1][0] if batches else 0.0
+        self.repeat = repeat # 0 = loop until stopped
+        self.gap = gap_ms / 1000
+        self.gap_jitter = gap_jitter_ms / 1000
+        self.iteration = 0
+        self.index = 0
+        self.id = 0
+        self.stopped = False
+        # (wall time, macro position, speed) swapped as one tuple so the GUI
+        # thread can rescale without locking the player thread
+        self._anchor = (time.perf_counter(), 0.0, max(speed, 0.01))
+
+    @property
+    def speed(self):
+        return self._anchor[2]
+
+    def start(self, now):
+        self._anchor = (now, 0.0, self._anchor[2])
+
+    def set_speed(self, speed, now=None):
+        now = time.perf_counter() if now is None else now
+        wall, pos, old = self._anchor
+        if now < wall:
+            # Still in the gap before the next iteration: the gap is real time,
+            # so keep its deadline and only rescale what follows it
+            self._anchor = (wall, pos, max(speed, 0.01))
+            return
+        self._anchor = (now, pos + (now - wall) * old, max(speed, 0.01))
+
+    def due(self, t):
+        wall, pos, speed = self._anchor
+        return wall + (t - pos) / speed
+
+    def next_due(self):
+        return self.due(self.batches[self.index][0])
+
+    def advance(self):
+        # Move to the next batch; returns False once all repeats are done
+        self.index += 1
+        if self.index < len(self.batches):
+            return True
+
+        self.iteration += 1
+        if self.repeat and self.iteration >= self.repeat:
+            return False
+
+        gap = self.gap
+        if self.gap_jitter:
+            gap = max(0.0, gap + self.rng.uniform(-self.gap_jitter, self.gap_jitter))
+        # Next iteration starts where this one ended (in wall time) plus the gap
+        self._anchor = (self.due(self.length) + gap, 0.0, self._anchor[2])
+        self.index = 0
+        return True
+
 class MacroPlayer(QObject):
+    # Plays any number of tracks on one injection thread: tracks are merged
+    # lazily through a heap keyed by each track's next wall-clock deadline.
     finished = Signal()
+    track_finished = Signal(int)
+    fidelity_report = Signal(dict)
 
-    def __init__(self):
+    def __init__(self, compensate=True, clock=None, backend=None, rng=None):
         super().__init__()
         self.running = False
-        self.mouse_ctl = mouse.Controller()
-        self.key_ctl = keyboard.Controller()
+        self.compensate = compensate
+        # Injectable for dry runs, see ClickEngine
+        self.clock = clock or REAL_CLOCK
+        self.backend = backend
+        self.rng = rng
+        self.latency = LatencyEstimator()
+        self.last_report = {}
+        # Optional engine.trace.TraceWriter; every injected batch is recorded
+        self.trace = None
+        self._lock = threading.Lock()
+        self._tracks = {}
+        self._pending = []
+        self._wake = threading.Event()
+        self._resched = False
+        self._next_id = 1
+        self._generation = 0
+        self._thread = None
 
-    def play(self, events, speed=1.0):
-        if self.running: return
-        self.running = True
-        log.info(f"Macro playback started. Speed: {speed}x")
-        threading.Thread(target=self._play_loop, args=(events, speed), daemon=True).start()
+    def play(self, events, speed=1.0, repeat=1, gap_ms=0, gap_jitter_ms=0, block=False):
+        # block=True plays on the calling thread (simulator); returns when done
+        batches = compile_macro(events, backend=self.backend or backend)
+        if not batches:
+            log.warning("Macro has no playable events")
+            return None
+        track = PlaybackTrack(batches, speed, repeat, gap_ms, gap_jitter_ms, rng=self.rng)
 
-    def stop(self):
-        if self.running:
-            self.running = False
-            log.info("Macro playback stopped")
+        with self._lock:
+            track.id = self._next_id
+            self._next_id += 1
+            self._tracks[track.id] = track
+            self._pending.append(track)
+            start = not self.running
+            self.running = True
+            generation = self._generation
+
+        log.info(
+            "Macro track %d started. Speed: %sx, repeat: %s, %d events in %d batches",
+            track.id, speed, repeat or "loop", len(events), len(batches)
+        )
+        if start and block:
+            self._play_loop(generation)
+        elif start:
+            self._thread = threading.Thread(target=self._play_loop, args=(generation,), daemon=True, name="MacroPlayerThread")
+            self._thread.start()
+        else:
+            self._wake.set()
+        return track.id
+
+    def set_speed(self, speed, track_id=None):
+        tracks = list(self._tracks.values()) if track_id is None else [self._tracks.get(track_id)]
+        for track in tracks:
+            if track:
+                track.set_speed(speed, self.clock.perf())
+        self._resched = True
+        self._wake.set()
+        log.debug("Macro playback speed changed: %sx (track %s)", speed, track_id or "all")
+
+    def stop(self, track_id=None):
+        with self._lock:
+            if track_id is not None:
+                track = self._tracks.get(track_id)
+                if track:
+                    track.stopped = True
+                    log.info("Macro track %d stopped", track_id)
+            elif self.running:
+                self.running = False
+                self._generation += 1
+                self._pending = []
+                self._tracks = {}
+                log.info("Macro playback stopped")
+        self._wake.set()
+        if track_id is None:
+            # Like ClickEngine.stop: wait (briefly) for the last batch, so
+            # callers can close what it writes to, e.g. traces
+            thread = self._thread
+            if thread and thread.is_alive() and thread is not threading.current_thread():
+                thread.join(timeout=1)
+
+    def _play_loop(self, generation):
+        send = (self.backend or backend).send_prepared
+        clock = self.clock
+        perf = clock.perf
+        latency = self.latency
+        fidelity = FidelityTracker()
+        trace = self.trace
+        if trace:
+            from engine.trace import SOURCE_MACRO
+        if self.compensate and not latency.calibrated:
+            latency.calibrate()
+        heap = []
+        seq = itertools.count()
+        active = lambda: self.running and self._generation == generation
+
+        def finish(track):
+            self._tracks.pop(track.id, None)
+            self.track_finished.emit(track.id)
 
-    def _play_loop(self, events, speed):
-        start_time = time.perf_counter()
         try:
-            for event in events:
-                if not self.running: break
+            while active():
+                if self._pending:
+                    with self._lock:
+                        pending, self._pending = self._pending, []
+                    now = perf()
+                    for track in pending:
+                        track.start(now)
+                        heapq.heappush(heap, (track.next_due(), next(seq), track))
+
+                if self._resched:
+                    # A speed change moved deadlines; re-key the heap
+                    self._resched = False
+                    heap = [(t.next_due(), next(seq), t) for _, _, t in heap]
+                    heapq.heapify(heap)
 
-                target_time = event["t"] / speed
-                while time.perf_counter() - start_time < target_time:
-                    if not self.running: break
-                    time.sleep(0.001)
+                if not heap:
+                    with self._lock:
+                        if not self._pending and self._generation == generation:
+                            self.running = False
+                            break
+                    continue
 
-                if not self.running: break
-                self._execute_event(event)
+                due, _, track = heap[0]
+                if track.stopped:
+                    heapq.heappop(heap)
+                    finish(track)
+                    continue
+
+                _, prepared, kind, marks = track.batches[track.index]
+                # Fire early so the event lands when it was recorded
+                target = due - latency.lead(kind) if self.compensate else due
+                wait = target - perf()
+                if wait > 0.002:
+                    # Sleep in short slices so new tracks and speed changes are picked up
+                    clock.wait(self._wake, min(wait - 0.0015, 0.05))
+                    self._wake.clear()
+                    continue
+                # Busy wait the last stretch for accurate timing
+                clock.sleep_until(target, lambda: not active())
+
+                if not active(): break
+                heapq.heappop(heap)
+                sent_at = perf()
+                send(prepared)
+                delivered = perf()
+                latency.observe(kind, delivered - sent_at, sent_at - target)
+                fidelity.add(delivered - due)
+                BATCHES.inc()
+                DRIFT.observe(abs(delivered - due))
+                if trace:
+                    for x, y, button in marks:
+                        trace.record(delivered, due, x, y, button, SOURCE_MACRO, track.id & 0xFFFF, track.index)
+                if track.advance():
+                    heapq.heappush(heap, (track.next_due(), next(seq), track))
+                else:
+                    finish(track)
         except Exception as e:
-            log.error(f"Macro playback error: {e}")
+            log.error("Macro playback error: %s", e)
 
-        self.running = False
-        self.finished.emit()
+        for _, _, track in heap:
+            self.track_finished.emit(track.id)
+        with self._lock:
+            if self._generation == generation:
+                self.running = False
+                self._tracks = {}
 
-    def _execute_event(self, event):
-        t = event["type"]
-        d = event["data"]
-        vx, vy, vw, vh = get_screen_rect()
-
-        if t == "mouse_click":
-            abs_x = int(vx + d["x"] * vw)
-            abs_y = int(vy + d["y"] * vh)
-            self.mouse_ctl.position = (abs_x, abs_y)
-            btn = getattr(mouse.Button, d["button"].split('.')[-1], mouse.Button.left)
-            if d["pressed"]:
-                self.mouse_ctl.press(btn)
-            else:
-                self.mouse_ctl.release(btn)
-
-        elif t == "mouse_scroll":
-            abs_x = int(vx + d["x"] * vw)
-            abs_y = int(vy + d["y"] * vh)
-            self.mouse_ctl.position = (abs_x, abs_y)
-            self.mouse_ctl.scroll(d["dx"], d["dy"])
-
-        elif t == "key_press":
-            k = self._parse_key(d["key"])
-            self.key_ctl.press(k)
-
-        elif t == "key_release":
-            k = self._parse_key(d["key"])
-            self.key_ctl.release(k)
-
-    def _parse_key(self, k_str):
-        # Basic parsing
-        if len(k_str) == 1:
-            return k_str
-        # Key.space -> keyboard.Key.space
-        if k_str.startswith("Key."):
-            attr = k_str.split('.')[1]
-            return getattr(keyboard.Key, attr, k_str)
-        return k_str
+        self.last_report = fidelity.report()
+        if fidelity.count:
+            r = self.last_report
+            log.info(
+                "Playback fidelity: %d batches, mean %+.3f ms, p95 |err| %.3f ms, max |err| %.3f ms",
+                r["batches"], r["mean_error_ms"], r["p95_abs_error_ms"], r["max_abs_error_ms"]
+            )
+        self.fidelity_report.emit(self.last_report)
+        self.finished.emit()
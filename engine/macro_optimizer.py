@@ -0,0 +1,160 @@
+import json
+from core.logging_setup import get_logger
+
+log = get_logger("macro_optimizer")
+
+DEFAULT_OPTIONS = {
+    "resolution_ms": 1,         # Timestamp quantum; playback can't honor anything finer
+    "collapse_repeats": True,   # Drop OS auto-repeat presses while a key is held
+    "drop_noise": True,         # Orphan releases, zero-duration pairs, bare modifier taps
+    "max_idle_ms": 0,           # 0 = keep idle gaps as recorded
+    "coord_precision": 5,       # Decimals kept on normalized 0..1 coordinates
+}
+
+MODIFIER_KEYS = {
+    "Key.shift", "Key.shift_l", "Key.shift_r",
+    "Key.ctrl", "Key.ctrl_l", "Key.ctrl_r",
+    "Key.alt", "Key.alt_l", "Key.alt_r", "Key.alt_gr",
+    "Key.cmd", "Key.cmd_l", "Key.cmd_r",
+}
+
+def _input_id(event):
+    # Identity of the physical input an event belongs to, or None for scrolls
+    t = event["type"]
+    if t in ("key_press", "key_release"):
+        key = event["data"].get("key")
+        # Keys pynput couldn't name are recorded as None; nothing to pair them by
+        return "k:" + key if key else None
+    if t == "mouse_click":
+        return "m:" + event["data"]["button"]
+    return None
+
+def _is_press(event):
+    t = event["type"]
+    return t == "key_press" or (t == "mouse_click" and event["data"]["pressed"])
+
+def _collapse_repeats(events, drop_orphans):
+    held = set()
+    out = []
+    for e in events:
+        iid = _input_id(e)
+        if iid is None:
+            out.append(e)
+            continue
+        if _is_press(e):
+            if iid in held:
+                continue # Auto-repeat
+            held.add(iid)
+        else:
+            if iid not in held and drop_orphans:
+                continue # Release of something pressed before recording started
+            held.discard(iid)
+        out.append(e)
+    return out
+
+def _drop_noise(events):
+    # Remove press/release pairs that carry no information: zero-duration
+    # pairs (same raw timestamp) and modifiers tapped on their own. Runs before
+    # quantizing so short real taps that share a bucket are kept.
+    drop = set()
+    for i in range(len(events) - 1):
+        a, b = events[i], events[i + 1]
+        iid = _input_id(a)
+        if iid is None or iid != _input_id(b):
+            continue
+        if not _is_press(a) or _is_press(b):
+            continue
+        bare_modifier = a["type"] == "key_press" and a["data"]["key"] in MODIFIER_KEYS
+        if a["t"] == b["t"] or bare_modifier:
+            drop.add(i)
+            drop.add(i + 1)
+    if not drop:
+        return events
+    return [e for i, e in enumerate(events) if i not in drop]
+
+def _quantize(events, res_s):
+    last = 0.0
+    for e in events:
+        t = round(round(e["t"] / res_s) * res_s, 6)
+        # Never let rounding reorder events
+        if t < last:
+            t = last
+        e["t"] = last = t
+    return events
+
+def _merge_simultaneous(events):
+    # Events sharing a quantized timestamp already play as one batch; scrolls
+    # at the same spot in the same quantum are folded into a single event.
+    out = []
+    for e in events:
+        prev = out[-1] if out else None
+        if (prev is not None and e["type"] == "mouse_scroll" and prev["type"] == "mouse_scroll"
+                and prev["t"] == e["t"]
+                and prev["data"]["x"] == e["data"]["x"] and prev["data"]["y"] == e["data"]["y"]):
+            prev["data"]["dx"] += e["data"]["dx"]
+            prev["data"]["dy"] += e["data"]["dy"]
+            continue
+        out.append(e)
+    return out
+
+def _strip_idle(events, max_idle_s):
+    shift = 0.0
+    last = 0.0
+    for e in events:
+        t = e["t"] - shift
+        gap = t - last
+        if gap > max_idle_s:
+            shift += gap - max_idle_s
+            t = last + max_idle_s
+        e["t"] = last = round(t, 6)
+    return events
+
+def _round_coords(events, digits):
+    for e in events:
+        d = e["data"]
+        if "x" in d:
+            d["x"] = round(d["x"], digits)
+            d["y"] = round(d["y"], digits)
+    return events
+
+def _size(events):
+    return len(json.dumps(events, separators=(",", ":")))
+
+def optimize_macro(events, options=None):
+    opts = {**DEFAULT_OPTIONS, **(options or {})}
+    before_count = len(events)
+    before_size = _size(events)
+
+    # Work on copies so the recorder's list is left untouched
+    out = [{"t": e["t"], "type": e["type"], "data": dict(e["data"])} for e in events]
+    out.sort(key=lambda e: e["t"])
+
+    if opts["collapse_repeats"]:
+        out = _collapse_repeats(out, drop_orphans=opts["drop_noise"])
+
+    if opts["drop_noise"]:
+        out = _drop_noise(out)
+
+    res_s = max(opts["resolution_ms"], 0) / 1000
+    if res_s > 0:
+        out = _quantize(out, res_s)
+
+    out = _merge_simultaneous(out)
+
+    if opts["max_idle_ms"] > 0:
+        out = _strip_idle(out, opts["max_idle_ms"] / 1000)
+
+    if opts["coord_precision"] is not None:
+        out = _round_coords(out, opts["coord_precision"])
+
+    report = {
+        "events_before": before_count,
+        "events_after": len(out),
+        "bytes_before": before_size,
+        "bytes_after": _size(out),
+    }
+    log.info(
+        f"Macro optimized: {report['events_before']} -> {report['events_after']} events, "
+        f"{report['bytes_before']} -> {report['bytes_after']} bytes"
+    )
+    return out, report
@@ -0,0 +1,190 @@
+# engine/simulator.py
+# Dry runs: the real ClickEngine / MacroPlayer / Scheduler code driven by a
+# SimulatedClock and a backend that records instead of injecting. An hour of
+# clicking takes seconds, and the timeline is exactly what the engine would do
+# (given the same random seed).
+#
+#   python -m engine.simulator --profile farm --duration 3600
+#   python -m engine.simulator --macro login --repeat 5 --timeline out.csv
+#   python -m engine.simulator --profile farm --schedule-days 7
+import datetime
+import random
+from core.clock import SimulatedClock
+from core.logging_setup import get_logger
+
+log = get_logger("simulator")
+
+class RecordingBackend:
+    # Same surface as engine.input_backend, but ops are plain tuples and
+    # "sending" appends (time, op) to a timeline read from the simulated clock.
+    def __init__(self, clock, rect=(0, 0, 1920, 1080), keep_timeline=True):
+        self.clock = clock
+        self.rect = rect
+        self.keep_timeline = keep_timeline
+        self.timeline = []
+        self.sends = 0
+        self.clicks = 0
+
+    def get_screen_rect(self):
+        return self.rect
+
+    def button_name(self, button):
+        return str(button).split(".")[-1]
+
+    def key_code(self, key):
+        return ord(key) if len(key) == 1 else -1
+
+    def get_move_input(self, x, y):
+        return ("move", x, y)
+
+    def get_button_input(self, button, pressed):
+        return ("press" if pressed else "release", button)
+
+    def get_scroll_inputs(self, dx, dy):
+        return [("scroll", dx, dy)]
+
+    def get_key_input(self, key, pressed):
+        return ("key_down" if pressed else "key_up", key)
+
+    def get_noop_input(self):
+        return None
+
+    def get_click_inputs(self, x, y, click_type):
+        # Three ops per click, like the real backends (the engine counts on it)
+        return [("move", x, y), ("press", click_type), ("release", click_type)]
+
+    def prepare_inputs(self, inputs):
+        return tuple(inputs)
+
+    def send_prepared(self, prepared):
+        self.sends += 1
+        t = self.clock.perf()
+        x = y = None
+        for op in prepared:
+            if op[0] == "move":
+                x, y = op[1], op[2]
+            elif op[0] == "press":
+                self.clicks += 1
+                if self.keep_timeline:
+                    self.timeline.append((t, x, y, op[1]))
+
+    def send_inputs(self, inputs):
+        self.send_prepared(inputs)
+
+def cps_curve(timeline, duration):
+    # Clicks in each whole simulated second
+    curve = [0] * max(1, int(duration + 0.999999))
+    for t, *_ in timeline:
+        i = int(t)
+        if i < len(curve):
+            curve[i] += 1
+    return curve
+
+def _summary(backend, duration, keep_timeline):
+    result = {
+        "duration_s": round(duration, 6),
+        "clicks": backend.clicks,
+        "sends": backend.sends,
+        "avg_cps": round(backend.clicks / duration, 2) if duration > 0 else 0,
+    }
+    if keep_timeline:
+        curve = cps_curve(backend.timeline, duration)
+        result.update({
+            "cps_curve": curve,
+            "peak_cps": max(curve),
+            "min_cps": min(curve),
+            "first_click_s": backend.timeline[0][0] if backend.timeline else None,
+            "last_click_s": backend.timeline[-1][0] if backend.timeline else None,
+            "timeline": backend.timeline,
+        })
+    return result
+
+def simulate_profile(profile, duration_s=60, seed=0, speedup=0, keep_timeline=True):
+    # Runs the click engine on `profile` for duration_s simulated seconds (or
+    # until its click limit) and returns timeline, per-second CPS and totals.
+    from engine.click_engine import ClickEngine
+
+    engine = None
+    clock = SimulatedClock(speedup=speedup, limit=duration_s, on_limit=lambda: engine._stop.set())
+    backend = RecordingBackend(clock, keep_timeline=keep_timeline)
+    # Private RNG: same seed, same timeline, and the process-wide one is left alone
+    engine = ClickEngine(clock=clock, backend=backend, rng=random.Random(seed))
+    engine.start(profile, block=True)
+    log.info("Simulated %s: %d clicks in %.1fs", profile.get("name", "profile"), backend.clicks, clock.t)
+    return _summary(backend, clock.t, keep_timeline)
+
+def simulate_macro(events, speed=1.0, repeat=1, gap_ms=0, gap_jitter_ms=0,
+                   max_duration_s=3600, seed=0, speedup=0, keep_timeline=True):
+    # Plays `events` through the macro player; repeat=0 loops until max_duration_s
+    from engine.macro_engine import MacroPlayer
+
+    player = None
+    clock = SimulatedClock(speedup=speedup, limit=max_duration_s, on_limit=lambda: player.stop())
+    backend = RecordingBackend(clock, keep_timeline=keep_timeline)
+    player = MacroPlayer(compensate=False, clock=clock, backend=backend, rng=random.Random(seed))
+    player.play(events, speed, repeat, gap_ms, gap_jitter_ms, block=True)
+    result = _summary(backend, clock.t, keep_timeline)
+    result["batches"] = backend.sends
+    return result
+
+def simulate_schedule(profile_name, schedule, days=1, start=None):
+    # Every start/stop the scheduler would deliver over the next `days`
+    from core.scheduler import Scheduler
+
+    clock = SimulatedClock(start=start)
+    scheduler = Scheduler(clock=clock)
+    scheduler.update_job(profile_name, schedule)
+    return scheduler.run_until(clock.now() + datetime.timedelta(days=days))
+
+def write_timeline_csv(timeline, out):
+    import csv
+    with open(out, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["t", "x", "y", "button"])
+        for t, x, y, button in timeline:
+            w.writerow([f"{t:.6f}", x, y, button])
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import sys
+    from core.logging_setup import setup_logging
+
+    parser = argparse.ArgumentParser(description="Dry-run a profile or macro on a simulated clock")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--profile")
+    target.add_argument("--macro")
+    parser.add_argument("--duration", type=float, default=60, help="simulated seconds (macro: upper bound)")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--speedup", type=float, default=0, help="e.g. 1000 to pace the run at 1000x; 0 = flat out")
+    parser.add_argument("--schedule-days", type=float, default=0, help="also list scheduled runs for N days")
+    parser.add_argument("--timeline", help="write every click to this CSV file")
+    parser.add_argument("--expect-clicks", type=int, default=None, help="exit 1 unless exactly this many clicks")
+    args = parser.parse_args()
+
+    setup_logging("WARNING")
+    if args.profile:
+        from core.profile_manager import ProfileManager
+        profiles = ProfileManager()
+        if args.profile not in profiles.list_profiles():
+            sys.exit(f"Profile not found: {args.profile}")
+        profile = profiles.load(args.profile)
+        result = simulate_profile(profile, args.duration, args.seed, args.speedup, keep_timeline=True)
+        if args.schedule_days:
+            result["schedule"] = simulate_schedule(args.profile, profile.get("schedule", {}), args.schedule_days)
+    else:
+        from core.macro_manager import MacroManager
+        events = MacroManager().load(args.macro)
+        if not events:
+            sys.exit(f"Macro not found or empty: {args.macro}")
+        result = simulate_macro(events, args.speed, args.repeat, max_duration_s=args.duration,
+                                seed=args.seed, speedup=args.speedup, keep_timeline=True)
+
+    timeline = result.pop("timeline", [])
+    if args.timeline:
+        write_timeline_csv(timeline, args.timeline)
+    print(json.dumps(result, indent=2, default=str))
+    if args.expect_clicks is not None and result["clicks"] != args.expect_clicks:
+        sys.exit(1)
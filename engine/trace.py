@@ -0,0 +1,138 @@
+# engine/trace.py
+# Per-event trace recorder: fixed-size records in a preallocated, memory-mapped
+# ring file. Writing a record is one struct.pack_into into the mapping, with no
+# allocation and no syscall; the OS writes the pages back on its own.
+#
+#   python -m engine.trace logs/trace-engine.bin            summary
+#   python -m engine.trace logs/trace-engine.bin --csv out.csv
+import mmap
+import os
+import struct
+
+MAGIC = b"ACTR"
+VERSION = 1
+# magic, version, record size, capacity, records written (total, not wrapped)
+HEADER = struct.Struct("<4sHHIQ")
+HEADER_SIZE = 64
+COUNT_OFFSET = 12
+COUNT = struct.Struct("<Q")
+# sent at, deadline (perf_counter s), x, y, button, source, track, batch.
+# Key records (button KEY_DOWN/KEY_UP) carry the key code (vk on Windows) in x.
+RECORD = struct.Struct("<ddiiBBHI")
+
+SOURCE_ENGINE = 0
+SOURCE_MACRO = 1
+SOURCES = {SOURCE_ENGINE: "engine", SOURCE_MACRO: "macro"}
+
+BUTTONS = {"left": 1, "right": 2, "middle": 3}
+SCROLL = 4
+KEY_DOWN = 5
+KEY_UP = 6
+BUTTON_NAMES = {0: "", 1: "left", 2: "right", 3: "middle", SCROLL: "scroll", KEY_DOWN: "key_down", KEY_UP: "key_up"}
+
+DEFAULT_CAPACITY = 1 << 18  # 8 MB of 32-byte records
+
+class TraceWriter:
+    def __init__(self, path, capacity=DEFAULT_CAPACITY):
+        self.path = str(path)
+        self.capacity = capacity
+        size = HEADER_SIZE + capacity * RECORD.size
+        with open(self.path, "wb") as f:
+            f.truncate(size)
+        self._file = open(self.path, "r+b")
+        self._mm = mmap.mmap(self._file.fileno(), size)
+        HEADER.pack_into(self._mm, 0, MAGIC, VERSION, RECORD.size, capacity, 0)
+        self._count = 0
+        self._pack = RECORD.pack_into
+        self._pack_count = COUNT.pack_into
+
+    def record(self, sent, deadline, x=-1, y=-1, button=0, source=SOURCE_ENGINE, track=0, batch=0):
+        # No-op once closed; a thread still sending while the app shuts down
+        # may also find the map closed under it
+        mm = self._mm
+        if mm is None:
+            return
+        i = self._count
+        try:
+            self._pack(mm, HEADER_SIZE + (i % self.capacity) * RECORD.size,
+                       sent, deadline, x, y, button, source, track, batch)
+            self._count = i + 1
+            # Count last, so a reader never sees a slot that isn't filled in yet
+            self._pack_count(mm, COUNT_OFFSET, i + 1)
+        except ValueError:
+            pass
+
+    def close(self):
+        mm = self._mm
+        if mm is None:
+            return
+        self._mm = None
+        mm.flush()
+        mm.close()
+        self._file.close()
+
+def open_trace(path, capacity=DEFAULT_CAPACITY):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    return TraceWriter(path, capacity)
+
+# ---------------- offline reader ----------------
+
+def read_trace(path):
+    # Records in write order (oldest first), as tuples in RECORD field order
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, rec_size, capacity, count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"Not a trace file: {path}")
+    if version != VERSION or rec_size != RECORD.size:
+        raise ValueError(f"Unsupported trace version {version} (record size {rec_size})")
+    n = min(count, capacity)
+    first = count - n
+    return [RECORD.unpack_from(data, HEADER_SIZE + ((first + k) % capacity) * rec_size) for k in range(n)]
+
+def summarize(records):
+    if not records:
+        return {"records": 0}
+    late = sorted(r[0] - r[1] for r in records)
+    n = len(late)
+    span = records[-1][0] - records[0][0]
+    batches = len({(r[5], r[6], r[7]) for r in records})
+    per_source = {}
+    for r in records:
+        name = SOURCES.get(r[5], str(r[5]))
+        per_source[name] = per_source.get(name, 0) + 1
+    return {
+        "records": n,
+        "batches": batches,
+        "span_s": round(span, 6),
+        "events_per_s": round(n / span, 1) if span > 0 else 0,
+        "mean_late_ms": round(sum(late) / n * 1000, 4),
+        "p50_late_ms": round(late[n // 2] * 1000, 4),
+        "p95_late_ms": round(late[min(n - 1, int(n * 0.95))] * 1000, 4),
+        "p99_late_ms": round(late[min(n - 1, int(n * 0.99))] * 1000, 4),
+        "max_late_ms": round(late[-1] * 1000, 4),
+        "by_source": per_source,
+    }
+
+def write_csv(records, out):
+    import csv
+    with open(out, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["sent", "deadline", "late_ms", "x", "y", "button", "source", "track", "batch"])
+        for sent, deadline, x, y, button, source, track, batch in records:
+            w.writerow([f"{sent:.6f}", f"{deadline:.6f}", f"{(sent - deadline) * 1000:.4f}",
+                        x, y, BUTTON_NAMES.get(button, button), SOURCES.get(source, source), track, batch])
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Summarize or export a click trace file")
+    parser.add_argument("trace")
+    parser.add_argument("--csv", help="write every record to this CSV file")
+    args = parser.parse_args()
+
+    records = read_trace(args.trace)
+    if args.csv:
+        write_csv(records, args.csv)
+    print(json.dumps(summarize(records), indent=2))
@@ -1,3 +1,16 @@
+import time
+T0 = time.perf_counter()
+
+import sys
+# --profile-startup: time imports and init phases, report written to logs/
+PROFILE_STARTUP = "--profile-startup" in sys.argv
+if PROFILE_STARTUP:
+    from core import startup_profile
+    startup_profile.start(T0)
+    mark = startup_profile.mark
+else:
+    mark = lambda label: None
+
 import platform
 if platform.system() == "Windows":
     import ctypes
@@ -8,34 +21,78 @@ if platform.system() == "Windows":
     except:
         pass
 
-import sys
+import os
+from core.logging_setup import get_logger, setup_logging, log_diagnostics
+# --log-levels=engine=WARNING,hotkeys=DEBUG (same format as AUTOCLICKER_LOG_LEVELS)
+setup_logging(next((a.split("=", 1)[1] for a in sys.argv if a.startswith("--log-levels=")), None))
+mark("logging")
+
 from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QTimer
 from ui.styles import DARK_STYLE
 from core.profile_manager import ProfileManager
 from core.macro_manager import MacroManager
 from ui.main_window import MainWindow
 from core.controller import Controller
-from core.logging_setup import get_logger
 from core.app_state import AppState
+from core.persistence import get_writer
+from core.procinfo import startup_report
+mark("imports")
 
 log = get_logger("main")
 log.info("Application starting")
 
 app = QApplication(sys.argv)
 app.setStyleSheet(DARK_STYLE)
+mark("QApplication")
 
-profile_manager = ProfileManager()
+# AUTOCLICKER_PROFILE_STORE=sqlite keeps all profiles in profiles/profiles.db
+profile_manager = ProfileManager(backend=os.environ.get("AUTOCLICKER_PROFILE_STORE", "json"))
 macro_manager = MacroManager()
 profile = profile_manager.load("default")
+mark("profile load")
 
 app_state = AppState()
 app_state.active_profile = profile
 
 window = MainWindow(profile, profile_manager, macro_manager)
+mark("MainWindow")
 controller = Controller(window, app_state, profile_manager, macro_manager)
+mark("Controller")
 
 window.start.clicked.connect(controller.toggle)
 window.show()
+mark("window.show")
 
 log.info("UI shown")
-sys.exit(app.exec())
+
+exporter = None
+
+def _after_first_frame():
+    global exporter
+    # First event-loop turn: the window has been painted
+    mark("first event loop turn")
+    if PROFILE_STARTUP:
+        startup_profile.finish()
+    log_diagnostics()
+    # AUTOCLICKER_METRICS_PORT / AUTOCLICKER_METRICS_DUMP_S enable the exporter
+    from core.metrics import start_exporter
+    exporter = start_exporter()
+QTimer.singleShot(0, _after_first_frame)
+
+# --startup-probe: report time-to-window and memory, then quit (compare with cli.py)
+if "--startup-probe" in sys.argv:
+    import json
+
+    def _probe():
+        report = startup_report(T0, "gui")
+        log.info(f"GUI ready in {report['startup_ms']} ms, RSS {report['rss_mb']} MB")
+        print(json.dumps(report))
+        app.quit()
+    QTimer.singleShot(0, _probe)
+
+ret = app.exec()
+if exporter:
+    exporter.stop()
+get_writer().flush()
+sys.exit(ret)
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+import pytest
+
+from core.cron import CronTrigger, DailyTrigger, IntervalTrigger
+
+def _fires(trigger, start, n):
+    out, t = [], start
+    for _ in range(n):
+        t = trigger.next_after(t)
+        out.append(t)
+    return out
+
+def test_ranges_steps_and_names():
+    trig = CronTrigger("*/15 9-17 * * mon-fri")
+    # Saturday evening -> Monday morning
+    assert trig.next_after(datetime(2026, 10, 3, 18, 0)) == datetime(2026, 10, 5, 9, 0)
+    assert _fires(trig, datetime(2026, 10, 5, 17, 30), 3) == [
+        datetime(2026, 10, 5, 17, 45), datetime(2026, 10, 6, 9, 0), datetime(2026, 10, 6, 9, 15)]
+    assert CronTrigger("0 0 1 jan *").next_after(datetime(2026, 6, 1)) == datetime(2027, 1, 1)
+
+def test_next_after_is_strict():
+    trig = DailyTrigger("12:00")
+    assert trig.next_after(datetime(2026, 10, 1, 12, 0)) == datetime(2026, 10, 2, 12, 0)
+    assert trig.next_after(datetime(2026, 10, 1, 11, 59, 59)) == datetime(2026, 10, 1, 12, 0)
+
+def test_dom_and_dow_match_either():
+    # Friday or the 13th, as in cron
+    trig = CronTrigger("0 12 13 * fri")
+    days = [t.day for t in _fires(trig, datetime(2026, 10, 1), 5)]
+    assert days == [2, 9, 13, 16, 23]
+
+def test_dom_alone_and_sunday_as_7():
+    assert CronTrigger("0 0 31 * *").next_after(datetime(2026, 10, 31, 1, 0)) == datetime(2026, 12, 31)
+    assert CronTrigger("30 6 * * 7").next_after(datetime(2026, 10, 1)) == datetime(2026, 10, 4, 6, 30)
+
+@pytest.mark.parametrize("expr", ["* * * *", "60 * * * *", "* 24 * * *", "*/0 * * * *", "5-1 * * * *"])
+def test_invalid_expressions(expr):
+    with pytest.raises(ValueError):
+        CronTrigger(expr)
+
+def test_interval_anchor():
+    anchor = datetime(2026, 10, 1, 8, 0, 0, 500000)
+    trig = IntervalTrigger(600, anchor)
+    assert trig.anchor == datetime(2026, 10, 1, 8, 0)
+    # Before the anchor the anchor itself is next; afterwards strictly later
+    assert trig.next_after(datetime(2026, 10, 1, 7, 0)) == trig.anchor
+    assert trig.next_after(trig.anchor) == trig.anchor + timedelta(minutes=10)
+    assert trig.next_after(datetime(2026, 10, 1, 8, 25)) == datetime(2026, 10, 1, 8, 30)
+    assert trig.next_after(datetime(2026, 10, 1, 8, 30)) == datetime(2026, 10, 1, 8, 40)
+
+def test_interval_must_be_positive():
+    with pytest.raises(ValueError):
+        IntervalTrigger(0, datetime(2026, 10, 1))
@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+import pytest
+
+import core.hotkeys as hotkeys
+from core.hotkeys import Hotkeys, MOD_STALE_S
+
+@pytest.fixture
+def hk(monkeypatch):
+    # Hook-event tracking only, whatever platform runs the tests
+    monkeypatch.setattr(hotkeys, "held_modifiers", None)
+    fired = []
+    h = Hotkeys([("f6", "toggle", None), ("esc", "kill", None), ("ctrl+f7", "pause", None)],
+                lambda action, arg, t: fired.append(action))
+    return h, fired
+
+def _key(name):
+    return SimpleNamespace(name=name)
+
+def test_chord_and_kill_with_modifiers_held(hk):
+    h, fired = hk
+    h._on_press(_key("ctrl_l"))
+    h._on_press(_key("f7"))
+    h._on_press(_key("f6")) # ctrl+f6 is not bound
+    h._on_press(_key("esc")) # kill matches anyway
+    assert fired == ["pause", "kill"]
+
+def test_stale_modifier_is_dropped(hk):
+    h, fired = hk
+    h._on_press(_key("alt_l")) # release never arrives
+    h._held["alt"] -= MOD_STALE_S + 1
+    h._on_press(_key("f6"))
+    assert fired == ["toggle"]
+    assert not h._mods
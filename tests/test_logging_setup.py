@@ -0,0 +1,26 @@
+import logging
+import pytest
+
+from core.logging_setup import get_levels, set_levels
+
+@pytest.fixture(autouse=True)
+def restore_levels():
+    root = logging.getLogger().level
+    yield
+    set_levels()
+    logging.getLogger().setLevel(root)
+
+def test_removed_subsystem_follows_root_again():
+    set_levels("t_engine=ERROR,t_ui=DEBUG")
+    assert logging.getLogger("t_engine").level == logging.ERROR
+    set_levels("WARNING,t_ui=INFO")
+    assert logging.getLogger("t_engine").level == logging.NOTSET
+    assert logging.getLogger("t_ui").level == logging.INFO
+    assert get_levels()["root"] == "WARNING"
+    assert "t_engine" not in get_levels()
+
+def test_later_specs_layer_on_earlier_ones():
+    set_levels("t_engine=ERROR,t_ui=DEBUG", "t_ui=WARNING,t_bad=LOUD")
+    assert logging.getLogger("t_engine").level == logging.ERROR
+    assert logging.getLogger("t_ui").level == logging.WARNING
+    assert logging.getLogger("t_bad").level == logging.NOTSET
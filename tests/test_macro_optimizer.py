@@ -0,0 +1,21 @@
+from engine.macro_optimizer import optimize_macro
+
+def _click(t, pressed):
+    return {"t": t, "type": "mouse_click",
+            "data": {"x": 0.5, "y": 0.5, "button": "Button.left", "pressed": pressed}}
+
+def test_short_click_survives_coarse_quantization():
+    events = [_click(1.00, True), _click(1.04, False)]
+    out, _ = optimize_macro(events, {"resolution_ms": 100})
+    assert [e["data"]["pressed"] for e in out] == [True, False]
+
+def test_zero_duration_pair_is_dropped():
+    events = [_click(1.0, True), _click(1.0, False)]
+    out, _ = optimize_macro(events)
+    assert out == []
+
+def test_unnamed_key_does_not_raise():
+    events = [{"t": 0.1, "type": "key_press", "data": {"key": None}},
+              {"t": 0.2, "type": "key_release", "data": {"key": None}}]
+    out, _ = optimize_macro(events)
+    assert len(out) == 2
@@ -0,0 +1,47 @@
+import pytest
+
+from core.metrics import Registry
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setenv("AUTOCLICKER_INSTANCE", "t")
+    return Registry()
+
+def test_prometheus_text(registry):
+    registry.counter("clicks_total", "Clicks sent").inc(3)
+    registry.gauge("cps", "Clicks per second").set(12.5)
+    h = registry.histogram("lat_seconds", "Latency", buckets=(0.01, 0.1))
+    for v in (0.005, 0.05, 0.5):
+        h.observe(v)
+    assert registry.prometheus_text().splitlines() == [
+        "# HELP clicks_total Clicks sent",
+        "# TYPE clicks_total counter",
+        'clicks_total{instance="t"} 3',
+        "# HELP cps Clicks per second",
+        "# TYPE cps gauge",
+        'cps{instance="t"} 12.5',
+        "# HELP lat_seconds Latency",
+        "# TYPE lat_seconds histogram",
+        'lat_seconds_bucket{instance="t",le="0.01"} 1',
+        'lat_seconds_bucket{instance="t",le="0.1"} 2',
+        'lat_seconds_bucket{instance="t",le="+Inf"} 3',
+        'lat_seconds_sum{instance="t"} 0.555',
+        'lat_seconds_count{instance="t"} 3',
+    ]
+
+def test_labelled_series_share_help_and_type(registry):
+    kbd = registry.counter("events_total", "Hook events", labels={"hook": "kbd"})
+    mouse = registry.counter("events_total", "Hook events", labels={"hook": "mouse"})
+    assert registry.counter("events_total", "Hook events", labels={"hook": "kbd"}) is kbd
+    kbd.inc()
+    mouse.inc(2)
+    text = registry.prometheus_text()
+    assert text.count("# TYPE events_total counter") == 1
+    assert 'events_total{instance="t",hook="kbd"} 1' in text
+    assert 'events_total{instance="t",hook="mouse"} 2' in text
+    assert set(registry.snapshot()["metrics"]) == {'events_total{hook="kbd"}', 'events_total{hook="mouse"}'}
+
+def test_name_cannot_change_kind(registry):
+    registry.counter("x", "x")
+    with pytest.raises(ValueError):
+        registry.gauge("x", "x")
@@ -0,0 +1,37 @@
+import threading
+
+from core.persistence import WriteBehindQueue
+
+def test_delete_waits_for_write_in_flight(tmp_path):
+    path = tmp_path / "a.json"
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return b"{}"
+
+    q = WriteBehindQueue(coalesce_s=0)
+    q.submit(path, slow)
+    assert started.wait(5)
+    q.delete(path)
+    release.set()
+    assert q.flush()
+    assert not path.exists()
+
+def test_delete_replaces_queued_write(tmp_path):
+    path = tmp_path / "a.json"
+    done = []
+    q = WriteBehindQueue(coalesce_s=60)
+    q.submit(path, lambda: b"{}", done.append)
+    q.delete(path)
+    assert q.flush()
+    assert not path.exists() and done == []
+
+def test_calls_run_on_the_writer_in_order(tmp_path):
+    seen = []
+    q = WriteBehindQueue()
+    q.call("a", lambda: seen.append(("a", threading.current_thread().name)))
+    q.call("b", lambda: seen.append(("b", threading.current_thread().name)))
+    assert q.flush()
+    assert seen == [("a", "PersistenceThread"), ("b", "PersistenceThread")]
@@ -0,0 +1,64 @@
+import pytest
+
+pytest.importorskip("PySide6")
+
+from ui.point_model import MAX_RANGED, Point, PointModel
+
+def _model(n):
+    return PointModel([{"x": i * 100, "y": 0} for i in range(n)])
+
+def _record(model):
+    seen = []
+    model.rowsInserted.connect(lambda parent, first, last: seen.append(("insert", first, last)))
+    model.rowsRemoved.connect(lambda parent, first, last: seen.append(("remove", first, last)))
+    model.modelReset.connect(lambda: seen.append(("reset",)))
+    model.dataChanged.connect(lambda top, bottom, roles=None: seen.append(("changed", top.row(), bottom.row())))
+    return seen
+
+def _xs(model):
+    return [p["x"] for p in model.get_points()]
+
+def test_insert_is_one_signal():
+    model = _model(3)
+    seen = _record(model)
+    model.insert_points(1, [{"x": 7, "y": 7}, Point(8, 8)])
+    model.insert_points(99, [{"x": 9, "y": 9}]) # clamped to the end
+    model.insert_points(0, [])
+    assert seen == [("insert", 1, 2), ("insert", 5, 5)]
+    assert _xs(model) == [0, 7, 8, 100, 200, 9]
+
+def test_remove_rows_by_run_last_first():
+    model = _model(10)
+    seen = _record(model)
+    model.remove_rows([8, 1, 2, 5, 7, 2, 42])
+    assert seen == [("remove", 7, 8), ("remove", 5, 5), ("remove", 1, 2)]
+    assert _xs(model) == [0, 300, 400, 600, 900]
+
+def test_scattered_remove_resets_once():
+    n = (MAX_RANGED + 1) * 2
+    model = _model(n)
+    seen = _record(model)
+    model.remove_rows(range(0, n, 2))
+    assert seen == [("reset",)]
+    assert _xs(model) == [i * 100 for i in range(1, n, 2)]
+
+def test_update_points_ranges_and_text():
+    model = _model(5)
+    first = model.data(model.index(0))
+    seen = _record(model)
+    model.update_points([3, 0, 1], label="hit", group=2)
+    assert seen == [("changed", 0, 1), ("changed", 3, 3)]
+    assert model.data(model.index(0)) != first
+    assert [p["group"] for p in model.get_points()] == [2, 2, 0, 2, 0]
+    with pytest.raises(ValueError):
+        model.update_points([0], colour="red")
+
+def test_duplicate_and_merge_close():
+    model = PointModel([{"x": 0, "y": 0, "label": "keep"}, {"x": 3, "y": 4}, {"x": 50, "y": 50}])
+    model.duplicate_rows([0, 2], dx=10, dy=0)
+    assert [(p["x"], p["y"]) for p in model.get_points()] == [(0, 0), (3, 4), (50, 50), (10, 0), (60, 50)]
+    assert model.nearest_row(2, 2) == 1
+    # (3, 4) is 5 px from (0, 0); the first point of a cluster stays
+    assert model.merge_close(5) == 1
+    assert model.get_points()[0]["label"] == "keep"
+    assert len(model.get_points()) == 4
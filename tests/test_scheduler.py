@@ -0,0 +1,80 @@
+import datetime
+import pytest
+
+pytest.importorskip("PySide6")
+
+from core.clock import SimulatedClock
+from core.scheduler import Scheduler
+from engine.simulator import simulate_schedule
+
+START = datetime.datetime(2020, 1, 1, 8, 0)
+
+def _starts(runs):
+    return [(r["trigger"], r["scheduled"]) for r in runs if r["action"] == "start"]
+
+def test_interval_counts_from_simulated_start():
+    runs = simulate_schedule("p", {"enabled": True, "interval_min": 30}, days=1, start=START)
+    starts = _starts(runs)
+    assert len(starts) == 48
+    assert starts[0][1] == "2020-01-01T08:30:00"
+
+def test_interval_anchor_survives_resave():
+    clock = SimulatedClock(start=START)
+    sched = Scheduler(clock)
+    sched.update_job("p", {"enabled": True, "interval_min": 30})
+    clock.advance(600)
+    sched.update_job("p", {"enabled": True, "interval_min": 30, "duration_min": 5})
+    assert sched.next_run("p") == datetime.datetime(2020, 1, 1, 8, 30)
+    # A new interval starts counting again
+    sched.update_job("p", {"enabled": True, "interval_min": 15})
+    assert sched.next_run("p") == datetime.datetime(2020, 1, 1, 8, 25)
+
+def test_legacy_time_kept_next_to_jobs():
+    schedule = {"enabled": True, "time": "09:00", "jobs": [{"time": "18:00"}]}
+    starts = _starts(simulate_schedule("p", schedule, days=1, start=START))
+    assert starts == [("daily(09:00)", "2020-01-01T09:00:00"),
+                      ("daily(18:00)", "2020-01-01T18:00:00")]
+
+def test_jobs_fire_in_time_order_across_profiles():
+    clock = SimulatedClock(start=START)
+    sched = Scheduler(clock)
+    sched.update_job("late", {"enabled": True, "time": "10:00"})
+    sched.update_job("early", {"enabled": True, "time": "09:00"})
+    sched.update_job("cron", {"enabled": True, "cron": "30 9 * * *"})
+    fired = sched.run_until(datetime.datetime(2020, 1, 1, 12, 0))
+    assert [(f["profile"], f["scheduled"][11:16]) for f in fired] == [
+        ("early", "09:00"), ("cron", "09:30"), ("late", "10:00")]
+    assert sched.next_run() == datetime.datetime(2020, 1, 2, 9, 0)
+
+def test_duration_and_stop_time_windows():
+    clock = SimulatedClock(start=START)
+    sched = Scheduler(clock)
+    sched.update_job("d", {"enabled": True, "time": "09:00", "duration_min": 45})
+    sched.update_job("s", {"enabled": True, "time": "23:00", "stop_time": "01:30"})
+    fired = sched.run_until(datetime.datetime(2020, 1, 2, 2, 0))
+    assert [(f["profile"], f["action"], f["scheduled"]) for f in fired] == [
+        ("d", "start", "2020-01-01T09:00:00"),
+        ("d", "stop", "2020-01-01T09:45:00"),
+        ("s", "start", "2020-01-01T23:00:00"),
+        ("s", "stop", "2020-01-02T01:30:00"),
+    ]
+
+def test_update_replaces_pending_runs():
+    clock = SimulatedClock(start=START)
+    sched = Scheduler(clock)
+    sched.update_job("p", {"enabled": True, "time": "09:00"})
+    sched.update_job("p", {"enabled": True, "time": "11:00"})
+    fired = sched.run_until(datetime.datetime(2020, 1, 1, 12, 0))
+    assert [f["scheduled"] for f in fired] == ["2020-01-01T11:00:00"]
+    sched.update_job("p", {"enabled": False, "time": "11:00"})
+    assert sched.next_run("p") is None
+
+@pytest.mark.parametrize("catch_up, runs", [("skip", 0), ("run", 1)])
+def test_missed_run_catch_up(catch_up, runs):
+    clock = SimulatedClock(start=START)
+    sched = Scheduler(clock)
+    sched.update_job("p", {"enabled": True, "time": "09:00", "catch_up": catch_up})
+    clock.advance(3 * 3600) # asleep through 09:00
+    fired = sched.run_until(datetime.datetime(2020, 1, 1, 12, 0))
+    assert len(fired) == runs
+    assert sched.next_run("p") == datetime.datetime(2020, 1, 2, 9, 0)
@@ -0,0 +1,62 @@
+import datetime
+import pytest
+
+pytest.importorskip("PySide6")
+
+from engine.simulator import simulate_macro, simulate_profile, simulate_schedule
+
+PROFILE = {"name": "t", "delay_ms": 100, "click_type": "left", "click_mode": "sequential",
+           "points": [{"x": 10, "y": 20}, {"x": 30, "y": 40}]}
+
+def _click(t, x, button, pressed):
+    return {"t": t, "type": "mouse_click",
+            "data": {"x": x, "y": 0.5, "button": f"Button.{button}", "pressed": pressed}}
+
+MACRO = [_click(0.0, 0.5, "left", True), _click(0.05, 0.5, "left", False),
+         _click(1.0, 0.25, "right", True), _click(1.05, 0.25, "right", False)]
+
+def test_profile_timeline():
+    r = simulate_profile(PROFILE, duration_s=10)
+    assert r["timeline"][:4] == [(0.0, 10, 20, "left"), (0.0, 30, 40, "left"),
+                                 (0.1, 10, 20, "left"), (0.1, 30, 40, "left")]
+    assert 198 <= r["clicks"] <= 202
+    # Sequential mode sends each point on its own
+    assert r["sends"] == r["clicks"]
+    assert sum(r["cps_curve"]) == r["clicks"]
+
+def test_profile_click_limit():
+    profile = dict(PROFILE, click_mode="simultaneous", click_limit={"enabled": True, "count": 8})
+    r = simulate_profile(profile, duration_s=10)
+    assert r["clicks"] == 8
+    assert r["duration_s"] < 1
+
+def test_profile_same_seed_same_timeline():
+    profile = dict(PROFILE, tuning={"jitter": {"px": 3, "percent": 20}})
+    a = simulate_profile(profile, duration_s=5, seed=1)["timeline"]
+    assert simulate_profile(profile, duration_s=5, seed=1)["timeline"] == a
+    assert simulate_profile(profile, duration_s=5, seed=2)["timeline"] != a
+
+def test_macro_repeat_gap():
+    r = simulate_macro(MACRO, repeat=3, gap_ms=500)
+    # Relative positions map onto the 1920x1080 recording screen
+    assert [(round(t, 6), x, y, b) for t, x, y, b in r["timeline"]] == [
+        (0.0, 960, 540, "left"), (1.0, 480, 540, "right"),
+        (1.55, 960, 540, "left"), (2.55, 480, 540, "right"),
+        (3.1, 960, 540, "left"), (4.1, 480, 540, "right"),
+    ]
+    assert r["batches"] == 12
+
+def test_macro_speed_and_loop_limit():
+    r = simulate_macro(MACRO, speed=2)
+    assert [round(t, 6) for t, *_ in r["timeline"]] == [0.0, 0.5]
+    r = simulate_macro(MACRO, repeat=0, max_duration_s=10)
+    assert r["duration_s"] == 10
+    assert 18 <= r["clicks"] <= 20
+
+def test_schedule_timeline():
+    schedule = {"enabled": True, "cron": "0 9 * * mon-fri", "duration_min": 30}
+    runs = simulate_schedule("p", schedule, days=7, start=datetime.datetime(2026, 10, 3))
+    starts = [r["scheduled"] for r in runs if r["action"] == "start"]
+    stops = [r["scheduled"] for r in runs if r["action"] == "stop"]
+    assert starts == [f"2026-10-{d:02d}T09:00:00" for d in range(5, 10)]
+    assert stops == [f"2026-10-{d:02d}T09:30:00" for d in range(5, 10)]
@@ -0,0 +1,34 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def test_profile_dry_run_end_to_end(tmp_path):
+    profiles = tmp_path / "profiles"
+    profiles.mkdir()
+    profile = {
+        "version": 2, "name": "farm", "delay_ms": 100, "click_type": "left",
+        "click_mode": "sequential", "points": [{"x": 10, "y": 20}, {"x": 30, "y": 40}],
+    }
+    (profiles / "farm.json").write_text(json.dumps(profile), encoding="utf-8")
+
+    env = dict(os.environ, AUTOCLICKER_HOME=str(tmp_path))
+    out = subprocess.run(
+        [sys.executable, "-m", "engine.simulator", "--profile", "farm", "--duration", "10",
+         "--timeline", str(tmp_path / "timeline.csv")],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=60)
+    assert out.returncode == 0, out.stderr
+
+    result = json.loads(out.stdout)
+    # 10 s at 100 ms per tick, two points per tick
+    assert 198 <= result["clicks"] <= 202
+    assert (tmp_path / "timeline.csv").read_text().startswith("t,x,y,button")
+    assert not (ROOT / "engine" / "profiles").exists()
+    assert not (ROOT / "engine" / "logs").exists()
@@ -0,0 +1,28 @@
+from core.spatial import GridIndex, close_duplicates, density_warning
+
+def test_nearest_within_max_dist():
+    idx = GridIndex(16)
+    idx.rebuild([(0, 0), (20, 0), (-30, -30), (100, 100)])
+    assert idx.nearest(12, 0, 16) == 1
+    assert idx.nearest(-25, -25, 16) == 2
+    assert idx.nearest(60, 60, 16) is None
+    # Farther than one cell still found when max_dist reaches it
+    assert idx.nearest(60, 60, 60) == 3
+
+def test_nearest_tie_takes_lowest_row():
+    idx = GridIndex(8)
+    idx.rebuild([(10, 0), (-10, 0), (0, 10)])
+    assert idx.nearest(0, 0, 10) == 0
+    assert idx.within(0, 0, 10) == [0, 1, 2]
+    assert idx.within(0, 0, 9) == []
+
+def test_close_duplicates_keeps_first_of_cluster():
+    xy = [(0, 0), (3, 4), (6, 8), (100, 0), (100, 5), (200, 200)]
+    # (6, 8) is 5 px from (3, 4) but 10 px from the kept (0, 0), so it stays
+    assert close_duplicates(xy, 5) == [1, 4]
+    assert close_duplicates(xy, 0) == []
+
+def test_density_warning():
+    assert density_warning(0, 1, "sequential") is None
+    assert density_warning(10, 100, "sequential") is None
+    assert "clicks will lag" in density_warning(5000, 10, "sequential")
@@ -0,0 +1,44 @@
+import csv
+
+from engine.trace import (
+    BUTTONS, KEY_DOWN, SOURCE_ENGINE, SOURCE_MACRO, open_trace, read_trace, summarize, write_csv
+)
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "sub" / "trace.bin"
+    tw = open_trace(str(path), capacity=8)
+    tw.record(1.001, 1.0, 10, 20, BUTTONS["left"], SOURCE_ENGINE, 0, 1)
+    tw.record(2.0005, 2.0, 65, -1, KEY_DOWN, SOURCE_MACRO, 3, 2)
+    # Readable while still open (the count is written last)
+    assert len(read_trace(path)) == 2
+    tw.close()
+    assert read_trace(path) == [(1.001, 1.0, 10, 20, 1, 0, 0, 1), (2.0005, 2.0, 65, -1, KEY_DOWN, 1, 3, 2)]
+
+    out = tmp_path / "trace.csv"
+    write_csv(read_trace(path), out)
+    with open(out, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0][:3] == ["sent", "deadline", "late_ms"]
+    assert rows[1][3:] == ["10", "20", "left", "engine", "0", "1"]
+    assert rows[2][5:7] == ["key_down", "macro"]
+
+def test_ring_keeps_the_newest_records(tmp_path):
+    path = tmp_path / "trace.bin"
+    tw = open_trace(str(path), capacity=4)
+    for i in range(10):
+        tw.record(float(i), float(i), i, 0, BUTTONS["left"], SOURCE_ENGINE, 0, i)
+    tw.close()
+    records = read_trace(path)
+    assert [r[2] for r in records] == [6, 7, 8, 9]
+    summary = summarize(records)
+    assert summary["records"] == 4 and summary["batches"] == 4
+    assert summary["by_source"] == {"engine": 4}
+
+def test_record_after_close_is_ignored(tmp_path):
+    path = tmp_path / "trace.bin"
+    tw = open_trace(str(path), capacity=4)
+    tw.record(1.0, 1.0)
+    tw.close()
+    tw.record(2.0, 2.0)
+    tw.close()
+    assert len(read_trace(path)) == 1
@@ -0,0 +1,92 @@
+# ui/generate_dialog.py
+from PySide6.QtWidgets import (
+    QDialog, QFormLayout, QComboBox, QSpinBox, QDialogButtonBox, QMessageBox
+)
+from PySide6.QtGui import QGuiApplication
+from core.point_patterns import generate
+
+class GenerateDialog(QDialog):
+    # Pattern + region form; points() builds the list once the dialog is accepted
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Generate Points")
+        form = QFormLayout(self)
+
+        self.kind = QComboBox()
+        self.kind.addItems(["grid", "hex", "circle", "random"])
+        self.kind.currentTextChanged.connect(self._update_fields)
+        form.addRow("Pattern", self.kind)
+
+        geo = QGuiApplication.primaryScreen().virtualGeometry()
+        self.x = self._spin(geo.x(), -100000, 100000)
+        self.y = self._spin(geo.y(), -100000, 100000)
+        self.w = self._spin(geo.width(), 0, 100000)
+        self.h = self._spin(geo.height(), 0, 100000)
+        for label, w in (("X", self.x), ("Y", self.y), ("Width", self.w), ("Height", self.h)):
+            form.addRow(label, w)
+
+        self.spacing = self._spin(50, 1, 10000, " px")
+        self.count = self._spin(100, 1, 200000)
+        self.rings = self._spin(1, 1, 100)
+        self.min_dist = self._spin(0, 0, 10000, " px")
+        form.addRow("Spacing", self.spacing)
+        form.addRow("Count", self.count)
+        form.addRow("Rings", self.rings)
+        form.addRow("Min Distance", self.min_dist)
+        self._rows = {"spacing": self.spacing, "count": self.count, "rings": self.rings, "min_dist": self.min_dist}
+
+        self.click_type = QComboBox()
+        self.click_type.addItems(["left", "right"])
+        self.group = self._spin(0, 0, 9)
+        form.addRow("Click Type", self.click_type)
+        form.addRow("Group", self.group)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self._accept)
+        buttons.rejected.connect(self.reject)
+        form.addRow(buttons)
+
+        self._points = []
+        self._update_fields(self.kind.currentText())
+
+    def _spin(self, value, lo, hi, suffix=""):
+        s = QSpinBox()
+        s.setRange(lo, hi)
+        s.setValue(value)
+        if suffix:
+            s.setSuffix(suffix)
+        return s
+
+    def _update_fields(self, kind):
+        used = {"grid": ("spacing",), "hex": ("spacing",),
+                "circle": ("count", "rings"), "random": ("count", "min_dist")}[kind]
+        for name, w in self._rows.items():
+            w.setEnabled(name in used)
+
+    def _options(self):
+        kind = self.kind.currentText()
+        opts = {"click_type": self.click_type.currentText(), "group": self.group.value()}
+        x, y, w, h = self.x.value(), self.y.value(), self.w.value(), self.h.value()
+        if kind == "circle":
+            # Circle fills the region: centred, radius to the nearer edge
+            opts.update(cx=x + w // 2, cy=y + h // 2, radius=min(w, h) // 2,
+                        count=self.count.value(), rings=self.rings.value())
+        else:
+            opts.update(x=x, y=y, w=w, h=h)
+            if kind == "random":
+                opts.update(count=self.count.value(), min_dist=self.min_dist.value())
+            else:
+                opts.update(spacing=self.spacing.value())
+        return kind, opts
+
+    def _accept(self):
+        kind, opts = self._options()
+        try:
+            self._points = generate(kind, **opts)
+        except ValueError as e:
+            QMessageBox.warning(self, "Generate Points", str(e))
+            return
+        self.accept()
+
+    def points(self):
+        return self._points
@@ -0,0 +1,80 @@
+from PySide6.QtWidgets import QWidget
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QPainter, QColor, QGuiApplication
+from engine.click_feed import ClickFeed
+
+CELL = 6           # px per heatmap cell
+FPS = 30           # fixed render rate, independent of CPS
+DECAY = 0.92       # per frame; about 0.8 s half-life at 30 fps
+MIN_HEAT = 0.05    # cells fading below this are dropped
+MAX_CELLS = 4096   # bound on cells drawn per frame
+SATURATE = 20.0    # hits that render at full intensity
+
+class HeatmapOverlay(QWidget):
+    # Live view of where engine clicks land (after jitter). The engine pushes
+    # positions into a ClickFeed; this widget drains it at FPS, keeps a sparse
+    # decaying hit count per cell and repaints only while something is visible.
+    def __init__(self, feed=None):
+        super().__init__()
+        self.setWindowFlags(Qt.WindowStaysOnTopHint | Qt.FramelessWindowHint | Qt.Tool)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+
+        self.feed = feed or ClickFeed()
+        self._cursor = self.feed.head
+        self._heat = {} # (cx, cy) -> decaying hit count
+
+        geo = QGuiApplication.primaryScreen().virtualGeometry()
+        self._origin = geo.topLeft()
+        self.setGeometry(geo)
+
+        # Precomputed ramp: faint green -> yellow -> opaque red
+        self._colors = []
+        for i in range(64):
+            f = i / 63
+            self._colors.append(QColor(int(255 * min(1, 2 * f)), int(255 * min(1, 2 - 2 * f)), 0, int(40 + 180 * f)))
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(1000 // FPS)
+        self._timer.timeout.connect(self._tick)
+
+    def start(self):
+        self._cursor = self.feed.head
+        self._timer.start()
+        self.show()
+
+    def stop(self):
+        self._timer.stop()
+        self._heat.clear()
+        self.hide()
+
+    def _tick(self):
+        points, self._cursor = self.feed.drain(self._cursor)
+        heat = self._heat
+        if not points and not heat:
+            return
+
+        for cell in list(heat):
+            v = heat[cell] * DECAY
+            if v < MIN_HEAT:
+                del heat[cell]
+            else:
+                heat[cell] = v
+
+        ox, oy = self._origin.x(), self._origin.y()
+        for x, y in points:
+            cell = ((x - ox) // CELL, (y - oy) // CELL)
+            heat[cell] = heat.get(cell, 0.0) + 1.0
+
+        if len(heat) > MAX_CELLS:
+            # Keep the hottest cells so drawing stays bounded
+            keep = sorted(heat.items(), key=lambda kv: kv[1], reverse=True)[:MAX_CELLS]
+            self._heat = heat = dict(keep)
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        colors = self._colors
+        top = len(colors) - 1
+        for (cx, cy), v in self._heat.items():
+            painter.fillRect(cx * CELL, cy * CELL, CELL, CELL, colors[min(top, int(v / SATURATE * top))])
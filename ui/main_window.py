@@ -1,11 +1,15 @@
 # ui/main_window.py
-from PySide6.QtWidgets import *
-from PySide6.QtCore import Qt, Signal, QTime
-from ui.picker import PointPicker
+import bisect
+from PySide6.QtWidgets import (
+    QWidget, QApplication, QTabWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QComboBox, QSpinBox, QCheckBox, QLineEdit, QSlider, QTimeEdit, QListView,
+    QListWidget, QListWidgetItem, QAbstractItemView, QMenu, QMessageBox, QInputDialog,
+    QFileDialog
+)
+from PySide6.QtCore import Qt, Signal, QTime, QTimer, QItemSelectionModel
 from ui.point_model import PointModel
-from ui.overlay import Overlay
 from ui.styles import DARK_STYLE, LIGHT_STYLE
-from core.logging_setup import get_logger
+from core.logging_setup import get_logger, set_levels, get_levels
 
 log = get_logger("ui")
 
@@ -16,12 +20,15 @@ class MainWindow(QWidget):
     rename_profile_requested = Signal()
     delete_profile_requested = Signal()
     config_changed = Signal()
+    profile_requested = Signal(float)
+    heatmap_toggled = Signal(bool)
 
     # Macro Signals
     record_macro_requested = Signal()
     stop_recording_requested = Signal()
     play_macro_requested = Signal(str, float)
     stop_macro_requested = Signal()
+    macro_speed_changed = Signal(float)
     delete_macro_requested = Signal(str)
 
     def __init__(self, profile, profile_manager, macro_manager):
@@ -33,6 +40,7 @@ class MainWindow(QWidget):
         self.profile_name = profile["name"]
 
         self.overlay = None
+        self.heatmap = None
 
         # Point Model
         self.point_model = PointModel()
@@ -101,6 +109,16 @@ class MainWindow(QWidget):
         self.btn_preview.clicked.connect(self._toggle_overlay)
         self.btn_preview.setToolTip("Toggle click overlay preview")
 
+        self.btn_heatmap = QPushButton("🔥")
+        self.btn_heatmap.setCheckable(True)
+        self.btn_heatmap.clicked.connect(self._toggle_heatmap)
+        self.btn_heatmap.setToolTip("Live heatmap of where clicks land")
+
+        self.btn_select = QPushButton("🎯")
+        self.btn_select.setCheckable(True)
+        self.btn_select.clicked.connect(self._toggle_overlay_select)
+        self.btn_select.setToolTip("Select points by clicking them on the overlay (Ctrl adds, right-click ends)")
+
         self.lbl_unsaved = QLabel("")
         self.lbl_unsaved.setStyleSheet("color: orange; font-weight: bold;")
 
@@ -110,17 +128,60 @@ class MainWindow(QWidget):
         self.top_bar_layout.addWidget(self.btn_rename)
         self.top_bar_layout.addWidget(self.btn_delete)
         self.top_bar_layout.addWidget(self.btn_preview)
+        self.top_bar_layout.addWidget(self.btn_select)
+        self.top_bar_layout.addWidget(self.btn_heatmap)
 
     def _toggle_overlay(self, checked):
         if checked:
             if not self.overlay:
+                from ui.overlay import Overlay
                 self.overlay = Overlay()
+                self.overlay.point_clicked.connect(self._on_overlay_point_clicked)
+                self.overlay.select_finished.connect(lambda: self._toggle_overlay_select(False))
             self.overlay.update_points(self.point_model.get_points())
             self.overlay.show()
+            self._on_point_selection_changed()
         else:
+            self._toggle_overlay_select(False)
             if self.overlay:
                 self.overlay.hide()
 
+    def _toggle_overlay_select(self, checked):
+        self.btn_select.setChecked(checked)
+        if checked and not self.btn_preview.isChecked():
+            self.btn_preview.setChecked(True)
+            self._toggle_overlay(True)
+        if self.overlay:
+            self.overlay.set_selectable(checked)
+
+    def _on_overlay_point_clicked(self, x, y, additive):
+        from ui.overlay import SELECT_RADIUS
+        row = self.point_model.nearest_row(x, y, SELECT_RADIUS)
+        sel = self.points_view.selectionModel()
+        if row is None:
+            if not additive:
+                sel.clearSelection()
+            return
+        idx = self.point_model.index(row)
+        sel.select(idx, QItemSelectionModel.Toggle if additive else QItemSelectionModel.ClearAndSelect)
+        sel.setCurrentIndex(idx, QItemSelectionModel.NoUpdate)
+        self.points_view.scrollTo(idx)
+
+    def _on_point_selection_changed(self, *args):
+        if self.overlay and self.overlay.isVisible():
+            points = self.point_model.get_points()
+            self.overlay.set_selection([points[r] for r in self._selected_point_rows()])
+
+    def _toggle_heatmap(self, checked):
+        if checked:
+            if not self.heatmap:
+                from ui.heatmap import HeatmapOverlay
+                self.heatmap = HeatmapOverlay()
+            self.heatmap.start()
+        elif self.heatmap:
+            self.heatmap.stop()
+        self.heatmap_toggled.emit(checked)
+
     def _on_profile_combo_changed(self, text):
         if text:
             self.profile_switched.emit(text)
@@ -129,6 +190,15 @@ class MainWindow(QWidget):
         self.config_changed.emit()
         if self.overlay and self.overlay.isVisible():
             self.overlay.update_points(self.point_model.get_points())
+            self._on_point_selection_changed()
+        self._update_density_warning()
+
+    def _update_density_warning(self):
+        from core.spatial import density_warning
+        msg = density_warning(self.point_model.rowCount(), self.delay.value(),
+                              self.mode.currentText(), self.chk_game_safe.isChecked())
+        self.lbl_density.setText(f"⚠ {msg}" if msg else "")
+        self.lbl_density.setVisible(bool(msg))
 
     def set_unsaved_indicator(self, unsaved):
         self.lbl_unsaved.setText("(*)" if unsaved else "")
@@ -201,16 +271,51 @@ class MainWindow(QWidget):
         self.points_view.setAcceptDrops(True)
         self.points_view.setDropIndicatorShown(True)
         self.points_view.setDefaultDropAction(Qt.MoveAction)
+        # Every row is one line of text; skips per-row size hints on large lists
+        self.points_view.setUniformItemSizes(True)
+        self.points_view.setLayoutMode(QListView.Batched)
 
         self.points_view.setContextMenuPolicy(Qt.CustomContextMenu)
         self.points_view.customContextMenuRequested.connect(self._point_menu)
+        self.points_view.selectionModel().selectionChanged.connect(self._on_point_selection_changed)
 
         self.points_view.setToolTip("List of coordinates (Drag to reorder, Right-click to delete)")
 
+        # Shown when one pass over the points can't fit in the click delay
+        self.lbl_density = QLabel("")
+        self.lbl_density.setStyleSheet("color: orange;")
+        self.lbl_density.setWordWrap(True)
+        self.lbl_density.setVisible(False)
+
         self.pick_btn = QPushButton("➕ Pick Point")
         self.pick_btn.clicked.connect(self._start_picker)
         self.pick_btn.setToolTip("Pick a point on screen")
 
+        self.pick_many_btn = QPushButton("➕➕ Pick Many")
+        self.pick_many_btn.clicked.connect(lambda: self._start_picker(continuous=True))
+        self.pick_many_btn.setToolTip("Left-click to add points; right-click or Enter to finish")
+
+        gen_btn = QPushButton("Generate…")
+        gen_btn.clicked.connect(self._generate_points)
+        gen_btn.setToolTip("Add a grid, hex grid, circle or random fill of points")
+
+        import_btn = QPushButton("Import…")
+        import_btn.clicked.connect(self._import_points)
+        import_btn.setToolTip("Append points from a CSV or JSON file")
+
+        export_btn = QPushButton("Export…")
+        export_btn.clicked.connect(self._export_points)
+        export_btn.setToolTip("Save points to a CSV or JSON file")
+
+        pick_layout = QHBoxLayout()
+        pick_layout.addWidget(self.pick_btn)
+        pick_layout.addWidget(self.pick_many_btn)
+
+        bulk_layout = QHBoxLayout()
+        bulk_layout.addWidget(gen_btn)
+        bulk_layout.addWidget(import_btn)
+        bulk_layout.addWidget(export_btn)
+
         clear = QPushButton("🧹 Clear Points")
         clear.clicked.connect(lambda: self.point_model.set_points([]))
         clear.setToolTip("Remove all points")
@@ -229,76 +334,72 @@ class MainWindow(QWidget):
         l.addLayout(burst_layout)
         l.addWidget(QLabel("Points"))
         l.addWidget(self.points_view)
-        l.addWidget(self.pick_btn)
+        l.addWidget(self.lbl_density)
+        l.addLayout(pick_layout)
+        l.addLayout(bulk_layout)
         l.addWidget(clear)
         l.addWidget(self.start)
 
     def _point_menu(self, pos):
         idx = self.points_view.indexAt(pos)
-        if not idx.isValid():
-            return
 
         menu = QMenu(self)
-        delete = menu.addAction("Delete")
-        set_group = menu.addAction("Set Group...")
+        delete = duplicate = set_group = None
+        if idx.isValid():
+            delete = menu.addAction("Delete")
+            duplicate = menu.addAction("Duplicate")
+            set_group = menu.addAction("Set Group...")
+            menu.addSeparator()
+        merge = menu.addAction("Merge Close Points...")
+        merge.setEnabled(self.point_model.rowCount() > 1)
 
         action = menu.exec(self.points_view.mapToGlobal(pos))
+        if action is None:
+            return
+
+        if action == merge:
+            radius, ok = QInputDialog.getInt(self, "Merge Close Points", "Merge points within (px):", 5, 1, 500)
+            if ok:
+                merged = self.point_model.merge_close(radius)
+                log.info(f"Merged {merged} points within {radius}px")
+                self.status.setText(f"Merged {merged} point(s) within {radius} px")
+            return
+
+        rows = self._selected_point_rows()
+        if not rows:
+            return
 
         if action == delete:
-            indexes = self.points_view.selectedIndexes()
-            rows = sorted(set(i.row() for i in indexes), reverse=True)
-            for r in rows:
-                self.point_model.remove_at(r)
+            self.point_model.remove_rows(rows)
 
         elif action == set_group:
-            indexes = self.points_view.selectedIndexes()
-            if not indexes: return
-
             group, ok = QInputDialog.getInt(self, "Set Group", "Group ID (0-9):", 0, 0, 9)
             if ok:
-                for i in indexes:
-                    self.point_model.set_group(i.row(), group)
+                self.point_model.update_points(rows, group=group)
 
         elif action == duplicate:
-            indexes = self.points_view.selectedIndexes()
-            if not indexes: return
-
-            # Sort by row to keep order
-            rows = sorted([i.row() for i in indexes])
-            new_points = []
-
-            # Get data for selected points
-            current_points = self.point_model.get_points()
-            for r in rows:
-                if 0 <= r < len(current_points):
-                    # Deep copy the dict to avoid ref issues
-                    p = current_points[r].copy()
-                    # Offset slightly so user sees it
-                    p["x"] += 10
-                    p["y"] += 10
-                    new_points.append(p)
-
-            # Insert them
-            # Access underlying list directly to copy full properties
-            # This relies on internal implementation of PointModel but is safe given we just read it.
-            # To be 100% proper we would add 'add_point_dict' to model, but we are updating main_window now.
-            # We can use set_points to refresh everything or just append.
-            all_points = self.point_model.get_points()
-            all_points.extend(new_points)
-            self.point_model.set_points(all_points)
+            self.point_model.duplicate_rows(rows)
+
+    def _selected_point_rows(self):
+        return sorted({i.row() for i in self.points_view.selectionModel().selectedRows()})
 
     # ---------------- SETTINGS TAB ----------------
 
     def _build_settings_tab(self):
         l = QVBoxLayout(self.settings_tab)
 
+        # Editable: any key or modifier chord, e.g. "ctrl+shift+f6"
         self.toggle_key = QComboBox()
-        self.toggle_key.addItems(["f6", "f7", "f8"])
+        self.toggle_key.setEditable(True)
+        self.toggle_key.addItems(["f6", "f7", "f8", "ctrl+f6", "alt+x"])
         self.toggle_key.currentTextChanged.connect(self._on_config_changed)
+        self.toggle_key.setToolTip("Key or chord, e.g. f6, ctrl+shift+s")
 
         self.kill_key = QComboBox()
-        self.kill_key.addItems(["esc"])
+        self.kill_key.setEditable(True)
+        self.kill_key.addItems(["esc", "ctrl+esc", "f12"])
         self.kill_key.currentTextChanged.connect(self._on_config_changed)
+        self.kill_key.setToolTip("Key or chord that closes the app")
 
         # Theme Toggle
         self.theme_combo = QComboBox()
@@ -315,11 +416,24 @@ class MainWindow(QWidget):
         self.chk_compact = QCheckBox("Compact Mode")
         self.chk_compact.toggled.connect(self._toggle_compact_mode)
 
+        # Applied immediately, not saved with the profile
+        self.log_levels = QLineEdit()
+        self.log_levels.setPlaceholderText("e.g. DEBUG or engine=WARNING,hotkeys=DEBUG")
+        self.log_levels.setText(",".join(
+            lvl if name == "root" else f"{name}={lvl}" for name, lvl in get_levels().items()))
+        self.log_levels.editingFinished.connect(lambda: set_levels(self.log_levels.text()))
+
+        # Samples the engine/player/scheduler threads; output goes to logs/*.collapsed
+        btn_profile = QPushButton("Profile Threads (10s)")
+        btn_profile.setToolTip("Sampling profiler at 200 Hz, under 1% overhead; writes logs/profile-*.collapsed")
+        btn_profile.clicked.connect(lambda: self.profile_requested.emit(10.0))
+
         for w in [
             QLabel("Toggle Key"), self.toggle_key,
             QLabel("Kill Key"), self.kill_key,
             QLabel("Theme"), self.theme_combo,
             self.chk_compact,
+            QLabel("Log Levels"), self.log_levels, btn_profile,
             save, save_as
         ]:
             l.addWidget(w)
@@ -417,21 +531,71 @@ class MainWindow(QWidget):
         self.time_sched.setDisplayFormat("HH:mm")
         self.time_sched.timeChanged.connect(self._on_config_changed)
 
+        self.cron_sched = QLineEdit()
+        self.cron_sched.setPlaceholderText("e.g. */30 9-17 * * mon-fri")
+        self.cron_sched.setToolTip("Cron expression (minute hour day month weekday).\nOverrides Start Time when set.")
+        self.cron_sched.textChanged.connect(self._on_config_changed)
+
+        self.interval_sched = QSpinBox()
+        self.interval_sched.setRange(0, 7 * 24 * 60)
+        self.interval_sched.setSuffix(" min")
+        self.interval_sched.setSpecialValueText("Off")
+        self.interval_sched.setToolTip("Start every N minutes, counted from when the schedule was enabled or the app started.\nUsed when no cron is set; overrides Start Time.")
+        self.interval_sched.valueChanged.connect(self._on_config_changed)
+
+        self.duration_sched = QSpinBox()
+        self.duration_sched.setRange(0, 24 * 60)
+        self.duration_sched.setSuffix(" min")
+        self.duration_sched.setSpecialValueText("Until stopped")
+        self.duration_sched.valueChanged.connect(self._on_config_changed)
+
+        self.chk_catch_up = QCheckBox("Run missed start after sleep")
+        self.chk_catch_up.setToolTip("If the PC was asleep at the scheduled time, run once on wake")
+        self.chk_catch_up.toggled.connect(self._on_config_changed)
+
+        # Extra jobs stored in the profile but not editable here
+        self._schedule_jobs = []
+
         self.lbl_sched_status = QLabel("Next Run: -")
 
         l.addWidget(self.chk_sched)
         l.addWidget(QLabel("Start Time:"))
         l.addWidget(self.time_sched)
+        l.addWidget(QLabel("Cron (optional):"))
+        l.addWidget(self.cron_sched)
+        l.addWidget(QLabel("Repeat Every:"))
+        l.addWidget(self.interval_sched)
+        l.addWidget(QLabel("Run For:"))
+        l.addWidget(self.duration_sched)
+        l.addWidget(self.chk_catch_up)
         l.addWidget(self.lbl_sched_status)
         l.addStretch()
 
+    def set_next_run(self, when):
+        self.lbl_sched_status.setText(f"Next Run: {when:%a %Y-%m-%d %H:%M}" if when else "Next Run: -")
+
     # ---------------- MACRO TAB ----------------
 
     def _build_macro_tab(self):
         l = QVBoxLayout(self.macro_tab)
 
+        self.macro_search = QLineEdit()
+        self.macro_search.setPlaceholderText("Search macros…")
+        self.macro_search.textChanged.connect(self.refresh_macro_list)
+
+        self.macro_kind = QComboBox()
+        self.macro_kind.addItems(["All", "Mouse", "Keyboard", "Mixed"])
+        self.macro_kind.currentTextChanged.connect(self.refresh_macro_list)
+        self.macro_kind.setToolTip("Filter by recorded input type")
+
+        search_layout = QHBoxLayout()
+        search_layout.addWidget(self.macro_search, 1)
+        search_layout.addWidget(self.macro_kind)
+
         self.macro_list = QListWidget()
-        self.macro_list.addItems(self.macro_manager.list_macros())
+        self.macro_list.setUniformItemSizes(True)
+        self.macro_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.macro_list.setToolTip("Select several macros to play them together")
 
         btns = QHBoxLayout()
         self.btn_record = QPushButton("Record")
@@ -455,11 +619,69 @@ class MainWindow(QWidget):
         self.speed_slider = QSlider(Qt.Horizontal)
         self.speed_slider.setRange(10, 500)
         self.speed_slider.setValue(100)
-
+        self.speed_slider.valueChanged.connect(lambda v: self.macro_speed_changed.emit(v / 100.0))
+        self.speed_slider.setToolTip("Playback speed (applies live while playing)")
+
+        self.macro_repeat = QSpinBox()
+        self.macro_repeat.setRange(0, 100000)
+        self.macro_repeat.setValue(1)
+        self.macro_repeat.setSpecialValueText("Loop")
+        self.macro_repeat.setToolTip("Number of times to play (Loop = until stopped)")
+
+        self.macro_gap = QSpinBox()
+        self.macro_gap.setRange(0, 600000)
+        self.macro_gap.setSuffix(" ms")
+        self.macro_gap.setToolTip("Pause between repetitions")
+
+        self.macro_gap_jitter = QSpinBox()
+        self.macro_gap_jitter.setRange(0, 600000)
+        self.macro_gap_jitter.setPrefix("± ")
+        self.macro_gap_jitter.setSuffix(" ms")
+        self.macro_gap_jitter.setToolTip("Random variation of the pause between repetitions")
+
+        repeat_layout = QHBoxLayout()
+        repeat_layout.addWidget(QLabel("Repeat:"))
+        repeat_layout.addWidget(self.macro_repeat)
+        repeat_layout.addWidget(QLabel("Gap:"))
+        repeat_layout.addWidget(self.macro_gap)
+        repeat_layout.addWidget(self.macro_gap_jitter)
+
+        # Optimizer options applied to new recordings before save
+        self.macro_resolution = QSpinBox()
+        self.macro_resolution.setRange(0, 100)
+        self.macro_resolution.setValue(1)
+        self.macro_resolution.setSuffix(" ms")
+        self.macro_resolution.setToolTip("Round event timestamps to this resolution (0 = keep raw)")
+
+        self.macro_max_idle = QSpinBox()
+        self.macro_max_idle.setRange(0, 60000)
+        self.macro_max_idle.setSingleStep(100)
+        self.macro_max_idle.setSuffix(" ms")
+        self.macro_max_idle.setSpecialValueText("Off")
+        self.macro_max_idle.setToolTip("Shorten idle gaps longer than this (Off = keep)")
+
+        opt_layout = QHBoxLayout()
+        opt_layout.addWidget(QLabel("Resolution:"))
+        opt_layout.addWidget(self.macro_resolution)
+        opt_layout.addWidget(QLabel("Max Idle:"))
+        opt_layout.addWidget(self.macro_max_idle)
+
+        l.addLayout(search_layout)
         l.addWidget(self.macro_list)
         l.addLayout(btns)
         l.addWidget(QLabel("Playback Speed"))
         l.addWidget(self.speed_slider)
+        l.addLayout(repeat_layout)
+        l.addLayout(opt_layout)
+
+        self.lbl_macro_fidelity = QLabel("")
+        self.lbl_macro_fidelity.setToolTip("Delivered vs recorded timing of the last playback")
+        l.addWidget(self.lbl_macro_fidelity)
+
+        # Listing syncs the macro index against disk; do it once the window is up
+        self._macro_names = []
+        self._macro_items = {}
+        QTimer.singleShot(0, self.refresh_macro_list)
 
     def _on_record_toggled(self, checked):
         if checked:
@@ -470,19 +692,117 @@ class MainWindow(QWidget):
             self.btn_record.setText("Record")
 
     def _on_play_clicked(self):
-        item = self.macro_list.currentItem()
-        if item:
-            speed = self.speed_slider.value() / 100.0
-            self.play_macro_requested.emit(item.text(), speed)
+        items = self.macro_list.selectedItems()
+        if not items and self.macro_list.currentItem():
+            items = [self.macro_list.currentItem()]
+        speed = self.speed_slider.value() / 100.0
+        for item in items:
+            self.play_macro_requested.emit(item.data(Qt.UserRole), speed)
 
     def _on_delete_macro_clicked(self):
         item = self.macro_list.currentItem()
         if item:
-            self.delete_macro_requested.emit(item.text())
+            self.delete_macro_requested.emit(item.data(Qt.UserRole))
+
+    def get_macro_options(self):
+        return {
+            "resolution_ms": self.macro_resolution.value(),
+            "max_idle_ms": self.macro_max_idle.value()
+        }
+
+    def show_macro_fidelity(self, report):
+        if not report.get("batches"):
+            self.lbl_macro_fidelity.setText("")
+            return
+        self.lbl_macro_fidelity.setText(
+            f"Timing: mean {report['mean_error_ms']:+.2f} ms, "
+            f"p95 {report['p95_abs_error_ms']:.2f} ms, max {report['max_abs_error_ms']:.2f} ms"
+        )
+
+    def get_playback_options(self):
+        return {
+            "repeat": self.macro_repeat.value(),
+            "gap_ms": self.macro_gap.value(),
+            "gap_jitter_ms": self.macro_gap_jitter.value()
+        }
 
-    def refresh_macro_list(self):
+    def _fill_macro_item(self, item, r):
+        item.setText(f"{r['name']}  ({r['duration']:.1f}s, {r['event_count']} ev)")
+        item.setData(Qt.UserRole, r["name"])
+        item.setToolTip(
+            f"Mouse: {r['mouse_events']}  Keys: {r['key_events']}  "
+            f"Scroll: {r['scroll_events']}  Size: {r['size']} B"
+        )
+
+    def refresh_macro_list(self, *args):
+        # Populated from the metadata index; macro files stay closed until playback
+        rows = self.macro_manager.search_macros(
+            self.macro_search.text(), self.macro_kind.currentText().lower()
+        )
+        self.macro_list.setUpdatesEnabled(False)
         self.macro_list.clear()
-        self.macro_list.addItems(self.macro_manager.list_macros())
+        self._macro_names = []
+        self._macro_items = {}
+        for r in rows:
+            item = QListWidgetItem()
+            self._fill_macro_item(item, r)
+            self.macro_list.addItem(item)
+            self._macro_names.append(r["name"])
+            self._macro_items[r["name"]] = item
+        self.macro_list.setUpdatesEnabled(True)
+
+    def update_macro_entry(self, name):
+        # Patch a single row after the file changed on disk
+        r = self.macro_manager.index.matches(
+            name, self.macro_search.text(), self.macro_kind.currentText().lower()
+        )
+        item = self._macro_items.get(name)
+        if r is None:
+            if item:
+                self.remove_macro_entry(name)
+            return
+        if item is None:
+            item = QListWidgetItem()
+            row = bisect.bisect_left(self._macro_names, name)
+            self._macro_names.insert(row, name)
+            self._macro_items[name] = item
+            self.macro_list.insertItem(row, item)
+        self._fill_macro_item(item, r)
+
+    def remove_macro_entry(self, name):
+        item = self._macro_items.pop(name, None)
+        if item is None:
+            return
+        row = bisect.bisect_left(self._macro_names, name)
+        del self._macro_names[row]
+        self.macro_list.takeItem(self.macro_list.row(item))
+
+    def refresh_profile_list(self):
+        self.profile_combo.blockSignals(True)
+        self.profile_combo.clear()
+        self.profile_combo.addItems(self.profile_manager.list_profiles())
+        self.profile_combo.setCurrentText(self.profile_name)
+        self.profile_combo.blockSignals(False)
+
+    def add_profile_entry(self, name):
+        if self.profile_combo.findText(name) >= 0:
+            return
+        # Keep the combo sorted without rebuilding it
+        row = 0
+        count = self.profile_combo.count()
+        while row < count and self.profile_combo.itemText(row) < name:
+            row += 1
+        self.profile_combo.blockSignals(True)
+        self.profile_combo.insertItem(row, name)
+        self.profile_combo.blockSignals(False)
+
+    def remove_profile_entry(self, name):
+        idx = self.profile_combo.findText(name)
+        if idx < 0 or name == self.profile_name:
+            return
+        self.profile_combo.blockSignals(True)
+        self.profile_combo.removeItem(idx)
+        self.profile_combo.blockSignals(False)
 
     def load_profile_data(self, p):
         self.profile_name = p["name"]
@@ -493,12 +813,13 @@ class MainWindow(QWidget):
             self.jitter_px, self.jitter_pct,
             self.chk_limit, self.limit_count,
             self.chk_burst, self.burst_size, self.burst_interval,
-            self.chk_sched, self.time_sched, self.chk_game_safe
+            self.chk_sched, self.time_sched, self.chk_game_safe,
+            self.cron_sched, self.duration_sched, self.chk_catch_up
         ]
         for w in inputs: w.blockSignals(True)
 
-        self.profile_combo.clear()
-        self.profile_combo.addItems(self.profile_manager.list_profiles())
+        # Switching only selects; entries are patched in place as profiles come and go
+        self.add_profile_entry(p["name"])
         self.profile_combo.setCurrentText(p["name"])
 
         self.delay.setValue(p["delay_ms"])
@@ -529,18 +850,29 @@ class MainWindow(QWidget):
         self.chk_sched.setChecked(sch.get("enabled", False))
         time_str = sch.get("time", "12:00")
         self.time_sched.setTime(QTime.fromString(time_str, "HH:mm"))
+        self.cron_sched.setText(sch.get("cron", ""))
+        self.interval_sched.setValue(int(sch.get("interval_min", 0)))
+        self.duration_sched.setValue(sch.get("duration_min", 0))
+        self.chk_catch_up.setChecked(sch.get("catch_up", "skip") == "run")
+        self._schedule_jobs = sch.get("jobs", [])
 
         for w in inputs: w.blockSignals(False)
+        self._update_density_warning()
         self.set_unsaved_indicator(False)
 
     # ---------------- POINT PICKER ----------------
 
-    def _start_picker(self):
+    def _start_picker(self, continuous=False):
         log.info("Starting point picker")
-        self.status.setText("Click anywhere to pick a point…")
+        if continuous:
+            self.status.setText("Click to add points… (right-click or Enter to finish)")
+        else:
+            self.status.setText("Click anywhere to pick a point…")
         self.pick_btn.setEnabled(False)
+        self.pick_many_btn.setEnabled(False)
 
-        self._picker = PointPicker()
+        from ui.picker import PointPicker
+        self._picker = PointPicker(continuous=continuous)
         self._picker.point_picked.connect(self._on_point_picked)
         self._picker.finished.connect(self._picker_finished)
         self._picker.start()
@@ -551,8 +883,42 @@ class MainWindow(QWidget):
     def _picker_finished(self):
         log.info("Point picker finished")
         self.pick_btn.setEnabled(True)
+        self.pick_many_btn.setEnabled(True)
         self.set_running(False)
 
+    def _generate_points(self):
+        from ui.generate_dialog import GenerateDialog
+        dlg = GenerateDialog(self)
+        if dlg.exec():
+            points = dlg.points()
+            self.point_model.append_points(points)
+            log.info(f"Generated {len(points)} points")
+
+    def _import_points(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import Points", "", "Points (*.csv *.json);;All Files (*)")
+        if not path:
+            return
+        from core.point_patterns import load_points
+        try:
+            points = load_points(path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            log.error(f"Point import failed: {e}")
+            QMessageBox.warning(self, "Import Points", str(e))
+            return
+        self.point_model.append_points(points)
+        log.info(f"Imported {len(points)} points from {path}")
+
+    def _export_points(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Points", f"{self.profile_name}.csv", "CSV (*.csv);;JSON (*.json)")
+        if not path:
+            return
+        from core.point_patterns import save_points
+        try:
+            save_points(self.point_model.get_points(), path)
+        except OSError as e:
+            log.error(f"Point export failed: {e}")
+            QMessageBox.warning(self, "Export Points", str(e))
+
     # ---------------- PROFILE ----------------
 
     def _save(self):
@@ -591,7 +957,12 @@ class MainWindow(QWidget):
             },
             "schedule": {
                 "enabled": self.chk_sched.isChecked(),
-                "time": self.time_sched.time().toString("HH:mm")
+                "time": self.time_sched.time().toString("HH:mm"),
+                "cron": self.cron_sched.text().strip(),
+                "interval_min": self.interval_sched.value(),
+                "duration_min": self.duration_sched.value(),
+                "catch_up": "run" if self.chk_catch_up.isChecked() else "skip",
+                "jobs": self._schedule_jobs
             }
         }
 
@@ -608,4 +979,6 @@ class MainWindow(QWidget):
     def closeEvent(self, event):
         if self.overlay:
             self.overlay.close()
+        if self.heatmap:
+            self.heatmap.close()
         event.accept()
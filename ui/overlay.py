@@ -1,47 +1,162 @@
 from PySide6.QtWidgets import QWidget
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QPainter, QPen, QColor, QBrush
+from PySide6.QtCore import Qt, QTimer, QRect, QRectF, Signal
+from PySide6.QtGui import QPainter, QPen, QColor, QBrush, QPainterPath, QRegion, QGuiApplication
+
+RADIUS = 10
+# Ring drawn around selected points
+SELECT_RADIUS = RADIUS + 3
+# Selection ring plus half the pen width plus a pixel of antialiasing
+MARGIN = SELECT_RADIUS + 2
+# Past this many changed points one full repaint is cheaper than a region
+FULL_REPAINT_AT = 256
+
+GROUP_COLORS = {
+    0: (0, 255, 0),   # Green
+    1: (0, 0, 255),   # Blue
+    2: (255, 0, 0),   # Red
+}
+OTHER_COLOR = (255, 255, 0) # Yellow
 
 class Overlay(QWidget):
+    # Click point preview across the whole virtual desktop. Points are drawn
+    # as one QPainterPath per group with cached pens/brushes; point changes
+    # only repaint the affected area and are coalesced to one repaint per frame.
+    # In select mode the overlay takes clicks and reports them as point_clicked
+    # (global x, y, additive) for the window to hit-test.
+    point_clicked = Signal(int, int, bool)
+    select_finished = Signal()
+
     def __init__(self):
         super().__init__()
         self.setWindowFlags(Qt.WindowStaysOnTopHint | Qt.FramelessWindowHint | Qt.Tool)
         self.setAttribute(Qt.WA_TranslucentBackground)
         self.setAttribute(Qt.WA_TransparentForMouseEvents)
 
-        # In multi-monitor setup, showFullScreen usually covers one screen.
-        # Ideally we cover virtual geometry.
-        # For simple v2, start with FullScreen on primary or current.
-        self.showFullScreen()
-
         self.points = []
+        self._keys = set() # (x, y, group) currently drawn
+        self._paths = {}   # group -> QPainterPath
+        self._styles = {}  # group -> (QPen, QBrush)
+        self._dirty = QRegion()
+        self._full = False
+        self._selected = set() # (x, y) of selected points
+        self._selectable = False
+        self._select_pen = QPen(QColor(255, 255, 255, 230))
+        self._select_pen.setWidth(2)
+
+        screen = QGuiApplication.primaryScreen()
+        # All monitors, not just the one showFullScreen would pick
+        self._origin = screen.virtualGeometry().topLeft()
+        self.setGeometry(screen.virtualGeometry())
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(max(1, int(1000 / (screen.refreshRate() or 60))))
+        self._timer.timeout.connect(self._flush)
+
+    def _style(self, group):
+        style = self._styles.get(group)
+        if style is None:
+            r, g, b = GROUP_COLORS.get(group, OTHER_COLOR)
+            pen = QPen(QColor(r, g, b, 200))
+            pen.setWidth(2)
+            style = self._styles[group] = (pen, QBrush(QColor(r, g, b, 50)))
+        return style
+
+    def _point_rect(self, x, y):
+        return QRect(x - self._origin.x() - MARGIN, y - self._origin.y() - MARGIN, 2 * MARGIN, 2 * MARGIN)
 
     def update_points(self, points):
         self.points = points
+        keys = {(int(p["x"]), int(p["y"]), p.get("group", 0)) for p in points}
+        changed = keys ^ self._keys
+        self._keys = keys
+        if not changed:
+            return
+
+        if self._full or len(changed) > FULL_REPAINT_AT:
+            self._full = True
+        else:
+            for x, y, _ in changed:
+                self._dirty += self._point_rect(x, y)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def set_selection(self, points):
+        keys = {(int(p["x"]), int(p["y"])) for p in points}
+        changed = keys ^ self._selected
+        self._selected = keys
+        if not changed:
+            return
+        if self._full or len(changed) > FULL_REPAINT_AT:
+            self._full = True
+        else:
+            for x, y in changed:
+                self._dirty += self._point_rect(x, y)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def set_selectable(self, on):
+        if on == self._selectable:
+            return
+        self._selectable = on
+        self.setAttribute(Qt.WA_TransparentForMouseEvents, not on)
+        if on:
+            self.setCursor(Qt.CrossCursor)
+        else:
+            self.unsetCursor()
         self.update()
 
+    def mousePressEvent(self, event):
+        if not self._selectable:
+            return
+        if event.button() == Qt.RightButton:
+            self.set_selectable(False)
+            self.select_finished.emit()
+            return
+        pos = event.globalPosition().toPoint()
+        self.point_clicked.emit(pos.x(), pos.y(), bool(event.modifiers() & Qt.ControlModifier))
+
+    def _flush(self):
+        ox, oy = self._origin.x(), self._origin.y()
+        paths = {}
+        for x, y, group in self._keys:
+            path = paths.get(group)
+            if path is None:
+                path = paths[group] = QPainterPath()
+                # Overlapping circles fill as a union instead of cancelling out
+                path.setFillRule(Qt.WindingFill)
+            path.addEllipse(x - ox - RADIUS, y - oy - RADIUS, 2 * RADIUS, 2 * RADIUS)
+        self._paths = paths
+
+        if self._full:
+            self.update()
+        else:
+            self.update(self._dirty)
+        self._dirty = QRegion()
+        self._full = False
+
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
+        area = QRectF(event.rect())
 
-        for p in self.points:
-            x, y = p["x"], p["y"]
-            group = p.get("group", 0)
-
-            # Simple color coding based on group
-            if group == 0:
-                color = QColor(0, 255, 0, 200) # Green
-            elif group == 1:
-                color = QColor(0, 0, 255, 200) # Blue
-            elif group == 2:
-                color = QColor(255, 0, 0, 200) # Red
-            else:
-                color = QColor(255, 255, 0, 200) # Yellow
-
-            pen = QPen(color)
-            pen.setWidth(2)
+        if self._selectable:
+            # Fully transparent pixels let clicks through on some platforms;
+            # a barely visible wash keeps the whole desktop clickable
+            painter.fillRect(event.rect(), QColor(0, 0, 0, 1))
+
+        for group, path in self._paths.items():
+            if not path.boundingRect().adjusted(-2, -2, 2, 2).intersects(area):
+                continue
+            pen, brush = self._style(group)
             painter.setPen(pen)
-            color.setAlpha(50)
-            painter.setBrush(QBrush(color))
+            painter.setBrush(brush)
+            painter.drawPath(path)
 
-            painter.drawEllipse(x - 10, y - 10, 20, 20)
+        if self._selected:
+            ox, oy = self._origin.x(), self._origin.y()
+            painter.setPen(self._select_pen)
+            painter.setBrush(Qt.NoBrush)
+            for x, y in self._selected:
+                if area.intersects(QRectF(self._point_rect(x, y))):
+                    painter.drawEllipse(x - ox - SELECT_RADIUS, y - oy - SELECT_RADIUS, 2 * SELECT_RADIUS, 2 * SELECT_RADIUS)
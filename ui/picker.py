@@ -1,8 +1,7 @@
 # picker.py
-import threading
-from pynput import mouse
 from PySide6.QtCore import QObject, Signal
 from core.logging_setup import get_logger
+from core.input_hub import get_hub
 
 log = get_logger("picker")
 
@@ -10,18 +9,43 @@ class PointPicker(QObject):
     point_picked = Signal(int, int)
     finished = Signal()
 
+    def __init__(self, continuous=False):
+        super().__init__()
+        # Continuous: every left click is a point until right click or Enter
+        # (not Esc: that's the default kill key and would close the app)
+        self.continuous = continuous
+        self.count = 0
+        self._tokens = []
+
     def start(self):
-        def worker():
-            log.info("Point picker started")
+        log.info("Point picker started (%s)", "continuous" if self.continuous else "single")
+        hub = get_hub()
+        self._tokens = [hub.subscribe("mouse_click", self._on_click)]
+        if self.continuous:
+            self._tokens.append(hub.subscribe("key_press", self._on_key))
 
-            def on_click(x, y, button, pressed):
-                if pressed:
-                    log.info(f"Point picked at ({x}, {y})")
-                    self.point_picked.emit(x, y)
-                    self.finished.emit()
-                    return False
+    def stop(self):
+        if not self._tokens:
+            return
+        hub = get_hub()
+        for token in self._tokens:
+            hub.unsubscribe(token)
+        self._tokens = []
+        log.info("Point picker done, %d point(s)", self.count)
+        self.finished.emit()
 
-            with mouse.Listener(on_click=on_click) as listener:
-                listener.join()
+    def _on_click(self, x, y, button, pressed):
+        if not pressed or not self._tokens:
+            return
+        if self.continuous and getattr(button, "name", str(button)).endswith("right"):
+            self.stop()
+            return
+        self.count += 1
+        log.debug("Point picked at (%d, %d)", x, y)
+        self.point_picked.emit(x, y)
+        if not self.continuous:
+            self.stop()
 
-        threading.Thread(target=worker, daemon=True).start()
+    def _on_key(self, key):
+        if getattr(key, "name", None) == "enter":
+            self.stop()
@@ -1,34 +1,96 @@
 import json
 from PySide6.QtCore import QAbstractListModel, Qt, QModelIndex, QMimeData
+from core.spatial import GridIndex, close_duplicates
+
+FIELDS = ("x", "y", "type", "delay", "label", "group")
+_FIELD_SET = frozenset(FIELDS)
+# Past this many separate runs a removal resets the model instead
+MAX_RANGED = 64
+# Spatial index cell; hit tests up to this radius stay within 3x3 cells
+INDEX_CELL = 16
+
+class Point:
+    # One row. Slots keep 100k points small; the list text is built once per
+    # edit instead of on every paint.
+    __slots__ = FIELDS + ("extra", "text")
+
+    def __init__(self, x=0, y=0, type="left", delay=0, label="", group=0, extra=None):
+        self.x = x
+        self.y = y
+        self.type = type
+        self.delay = delay
+        self.label = label
+        self.group = group
+        self.extra = extra # unknown keys from older/newer profiles, kept as-is
+        self.text = None
+
+    @classmethod
+    def from_dict(cls, d):
+        if isinstance(d, Point):
+            return d.copy()
+        extra = None
+        if not d.keys() <= _FIELD_SET:
+            extra = {k: v for k, v in d.items() if k not in _FIELD_SET}
+        return cls(d.get("x", 0), d.get("y", 0), d.get("type", "left"), d.get("delay", 0),
+                   d.get("label", ""), d.get("group", 0), extra)
+
+    def to_dict(self):
+        d = {"x": self.x, "y": self.y, "type": self.type, "delay": self.delay,
+             "label": self.label, "group": self.group}
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+    def copy(self):
+        return Point(self.x, self.y, self.type, self.delay, self.label, self.group,
+                     dict(self.extra) if self.extra else None)
+
+    def display(self):
+        if self.text is None:
+            if self.label:
+                self.text = f"{self.x}, {self.y} - {self.label}"
+            else:
+                self.text = f"{self.x}, {self.y} ({self.type})"
+        return self.text
+
+def _ranges(rows):
+    # Sorted unique rows -> [(first, last), ...] of contiguous runs
+    out = []
+    for r in sorted(set(rows)):
+        if out and r == out[-1][1] + 1:
+            out[-1][1] = r
+        else:
+            out.append([r, r])
+    return out
 
 class PointModel(QAbstractListModel):
     def __init__(self, points=None):
         super().__init__()
-        self._points = points or []
+        self._points = [Point.from_dict(p) for p in points or []]
+        self._dicts = None # cached get_points() result, dropped on any edit
+        self._index = None # GridIndex by row, rebuilt on the first query after an edit
+
+    def _touch(self):
+        self._dicts = None
+        self._index = None
 
     def rowCount(self, parent=QModelIndex()):
         return len(self._points)
 
     def data(self, index, role=Qt.DisplayRole):
-        if not index.isValid() or not (0 <= index.row() < len(self._points)):
+        row = index.row()
+        if not index.isValid() or not (0 <= row < len(self._points)):
             return None
 
-        point = self._points[index.row()]
-        # Safeguard against corrupted data
-        if not isinstance(point, dict):
-            return str(point)
-
+        point = self._points[row]
         if role == Qt.DisplayRole:
-            label = point.get("label", "")
-            if label:
-                return f"{point.get('x',0)}, {point.get('y',0)} - {label}"
-            return f"{point.get('x',0)}, {point.get('y',0)} ({point.get('type','left')})"
+            return point.display()
 
         elif role == Qt.EditRole:
-            return f"{point.get('x',0)},{point.get('y',0)}"
+            return f"{point.x},{point.y}"
 
         elif role == Qt.UserRole:
-            return point
+            return point.to_dict()
 
         return None
 
@@ -42,11 +104,7 @@ class PointModel(QAbstractListModel):
             if len(parts) >= 2:
                 x = int(parts[0].strip())
                 y = int(parts[1].strip())
-
-                self._points[index.row()]['x'] = x
-                self._points[index.row()]['y'] = y
-
-                self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole, Qt.UserRole])
+                self.update_points([index.row()], x=x, y=y)
                 return True
         except ValueError:
             pass
@@ -65,9 +123,7 @@ class PointModel(QAbstractListModel):
 
     def mimeData(self, indexes):
         mime = QMimeData()
-        data = []
-        for idx in indexes:
-             data.append(self._points[idx.row()])
+        data = [self._points[idx.row()].to_dict() for idx in sorted(indexes, key=lambda i: i.row())]
         mime.setData('application/x-point-list', json.dumps(data).encode('utf-8'))
         return mime
 
@@ -79,43 +135,111 @@ class PointModel(QAbstractListModel):
             row = len(self._points)
 
         encoded = data.data('application/x-point-list')
-        points = json.loads(encoded.data().decode('utf-8'))
-
-        self.beginInsertRows(QModelIndex(), row, row + len(points) - 1)
-        for p in points:
-            self._points.insert(row, p)
-            row += 1
-        self.endInsertRows()
+        self.insert_points(row, json.loads(encoded.data().decode('utf-8')))
         return True
 
     def removeRows(self, row, count, parent=QModelIndex()):
+        if count <= 0 or row < 0 or row + count > len(self._points):
+            return False
         self.beginRemoveRows(parent, row, row + count - 1)
-        for _ in range(count):
-            del self._points[row]
+        del self._points[row:row + count]
+        self._touch()
         self.endRemoveRows()
         return True
 
     # Helper methods
     def set_points(self, points):
         self.beginResetModel()
-        self._points = points
+        self._points = [Point.from_dict(p) for p in points]
+        self._touch()
         self.endResetModel()
 
     def get_points(self):
-        return self._points
+        # Plain dicts for the engine, overlay and profile JSON; rebuilt only after an edit
+        if self._dicts is None:
+            self._dicts = [p.to_dict() for p in self._points]
+        return self._dicts
 
     def add_point(self, x, y):
-        self.beginInsertRows(QModelIndex(), len(self._points), len(self._points))
-        self._points.append({
-             "x": x, "y": y, "type": "left", "delay": 0, "label": "", "group": 0
-        })
+        self.insert_points(len(self._points), [Point(x, y)])
+
+    def insert_points(self, row, points):
+        # One rowsInserted for the whole batch
+        points = [Point.from_dict(p) for p in points]
+        if not points:
+            return
+        row = max(0, min(row, len(self._points)))
+        self.beginInsertRows(QModelIndex(), row, row + len(points) - 1)
+        self._points[row:row] = points
+        self._touch()
         self.endInsertRows()
 
+    def append_points(self, points):
+        self.insert_points(len(self._points), points)
+
+    def remove_rows(self, rows):
+        # One rowsRemoved per contiguous run, last run first so indexes stay valid
+        n = len(self._points)
+        runs = _ranges(r for r in rows if 0 <= r < n)
+        if len(runs) > MAX_RANGED:
+            # Scattered selection: one rebuild beats thousands of signals
+            drop = {r for r in rows if 0 <= r < n}
+            self.beginResetModel()
+            self._points = [p for i, p in enumerate(self._points) if i not in drop]
+            self._touch()
+            self.endResetModel()
+            return
+        for first, last in reversed(runs):
+            self.removeRows(first, last - first + 1)
+
+    def update_points(self, rows, **fields):
+        # Sets the same fields on every row, one dataChanged per contiguous run
+        bad = set(fields) - set(FIELDS)
+        if bad:
+            raise ValueError(f"Unknown point fields: {', '.join(sorted(bad))}")
+        n = len(self._points)
+        runs = _ranges(r for r in rows if 0 <= r < n)
+        for first, last in runs:
+            for p in self._points[first:last + 1]:
+                for k, v in fields.items():
+                    setattr(p, k, v)
+                p.text = None
+        if runs:
+            self._touch()
+        for first, last in runs:
+            self.dataChanged.emit(self.index(first), self.index(last), [Qt.DisplayRole, Qt.EditRole, Qt.UserRole])
+
+    def duplicate_rows(self, rows, dx=10, dy=10):
+        # Copies go after the last selected row, offset so they don't hide the originals
+        n = len(self._points)
+        rows = sorted(set(r for r in rows if 0 <= r < n))
+        if not rows:
+            return
+        copies = []
+        for r in rows:
+            p = self._points[r].copy()
+            p.x += dx
+            p.y += dy
+            copies.append(p)
+        self.insert_points(rows[-1] + 1, copies)
+
     def remove_at(self, row):
         self.removeRows(row, 1)
 
     def set_group(self, row, group_id):
-        if 0 <= row < len(self._points):
-            self._points[row]['group'] = group_id
-            idx = self.index(row)
-            self.dataChanged.emit(idx, idx, [Qt.DisplayRole, Qt.UserRole])
+        self.update_points([row], group=group_id)
+
+    def spatial_index(self):
+        if self._index is None:
+            self._index = GridIndex(INDEX_CELL)
+            self._index.rebuild((p.x, p.y) for p in self._points)
+        return self._index
+
+    def nearest_row(self, x, y, max_dist=INDEX_CELL):
+        return self.spatial_index().nearest(int(x), int(y), max_dist)
+
+    def merge_close(self, radius):
+        # Drops points within `radius` px of an earlier one; returns how many
+        rows = close_duplicates(((p.x, p.y) for p in self._points), radius)
+        self.remove_rows(rows)
+        return len(rows)